@@ -0,0 +1,36 @@
+# app/application/interfaces/best_seller_tracker_interface.py
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional, Tuple
+from domain.entities.sale import Sale
+
+
+class BestSellerTrackerInterface(ABC):
+    @abstractmethod
+    def record(self, sale: Sale) -> None:
+        """
+        Учитывает продажу в скользящих окнах лидеров продаж.
+
+        :param sale: Записанная продажа.
+        """
+        pass
+
+    @abstractmethod
+    def get_top(
+            self,
+            window: str,
+            limit: int,
+            category_id: Optional[str] = None,
+            now: Optional[datetime] = None,
+    ) -> List[Tuple[str, int, bool]]:
+        """
+        Получает самые продаваемые продукты за окно времени.
+
+        :param window: Окно: 'hour' или 'day'.
+        :param limit: Количество продуктов в ответе.
+        :param category_id: Идентификатор категории для фильтрации (необязательно).
+        :param now: Момент, от которого отсчитывается окно; по умолчанию - текущее время.
+        :return: Список (product_id, количество, признак точного значения) по убыванию количества.
+        """
+        pass
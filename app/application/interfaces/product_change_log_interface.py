@@ -0,0 +1,41 @@
+# app/application/interfaces/product_change_log_interface.py
+
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from domain.entities.product import Product
+from domain.entities.product_change import ProductChange
+
+
+class ProductChangeLogInterface(ABC):
+    @abstractmethod
+    def append(self, product_id: str, operation: str, product: Optional[Product] = None) -> ProductChange:
+        """
+        Добавляет изменение продукта в журнал и присваивает ему порядковый номер.
+
+        :param product_id: Идентификатор измененного продукта.
+        :param operation: Тип изменения: 'upsert' или 'delete'.
+        :param product: Состояние продукта после изменения (для 'upsert').
+        :return: Записанное изменение.
+        """
+        pass
+
+    @abstractmethod
+    def get_changes_since(self, since: int, limit: Optional[int] = None) -> List[ProductChange]:
+        """
+        Получает изменения с порядковым номером больше since.
+
+        :param since: Последний порядковый номер, известный потребителю.
+        :param limit: Максимальное количество изменений в ответе.
+        :return: Список изменений в порядке их записи.
+        :raises ChangeLogCompactedException: Если часть изменений после since уже вытеснена из журнала.
+        """
+        pass
+
+    @abstractmethod
+    def get_latest_sequence(self) -> int:
+        """
+        Получает порядковый номер последнего записанного изменения.
+
+        :return: Порядковый номер или 0, если журнал пуст.
+        """
+        pass
@@ -0,0 +1,46 @@
+# app/application/interfaces/product_event_broker_interface.py
+
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+from domain.entities.product_change import ProductChange
+
+
+class ProductEventSubscriptionInterface(ABC):
+    @abstractmethod
+    async def get_batch(self, timeout: Optional[float] = None) -> Tuple[List[ProductChange], bool]:
+        """
+        Ожидает и забирает накопленные изменения подписчика.
+
+        :param timeout: Максимальное время ожидания в секундах; None - ждать бесконечно.
+        :return: Список изменений (по одному на продукт) и флаг необходимости ресинхронизации.
+        """
+        pass
+
+
+class ProductEventBrokerInterface(ABC):
+    @abstractmethod
+    def subscribe(self) -> ProductEventSubscriptionInterface:
+        """
+        Создает нового подписчика на изменения продуктов.
+
+        :return: Подписка с собственной ограниченной очередью.
+        """
+        pass
+
+    @abstractmethod
+    def unsubscribe(self, subscription: ProductEventSubscriptionInterface) -> None:
+        """
+        Удаляет подписчика.
+
+        :param subscription: Подписка, полученная через subscribe.
+        """
+        pass
+
+    @abstractmethod
+    def publish(self, change: ProductChange) -> None:
+        """
+        Рассылает изменение продукта всем подписчикам.
+
+        :param change: Изменение из журнала изменений каталога.
+        """
+        pass
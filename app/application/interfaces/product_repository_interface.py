@@ -1,8 +1,9 @@
 # app/application/interfaces/product_repository_interface.py
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from domain.entities.product import Product
+from domain.values.catalog_snapshot import CatalogSnapshot
 
 class ProductRepositoryInterface(ABC):
     @abstractmethod
@@ -26,11 +27,37 @@ class ProductRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def update(self, product: Product) -> None:
+    def get_many(self, product_ids: List[str]) -> List[Product]:
         """
-        Обновляет информацию о продукте в репозитории.
+        Получает продукты по списку идентификаторов за одно обращение к хранилищу.
+
+        :param product_ids: Идентификаторы продуктов.
+        :return: Найденные продукты в порядке запроса; отсутствующие идентификаторы пропускаются.
+        """
+        pass
+
+    @abstractmethod
+    def update(self, product: Product, expected_version: Optional[int] = None) -> Product:
+        """
+        Обновляет информацию о продукте в репозитории (compare-and-swap по версии).
+        Запись выполняется, только если сохраненная версия продукта совпадает с ожидаемой,
+        после чего версия увеличивается на единицу.
 
         :param product: Экземпляр продукта с обновленными данными.
+        :param expected_version: Ожидаемая версия; по умолчанию - версия, с которой продукт был прочитан.
+        :return: Обновленный продукт.
+        :raises ProductVersionConflictException: Если продукт был изменен после чтения.
+        """
+        pass
+
+    @abstractmethod
+    def update_many(self, products: List[Product]) -> List[Product]:
+        """
+        Сохраняет пакет продуктов одной операцией, для каждого — compare-and-swap по версии,
+        с которой он был прочитан. Продукты, измененные или удаленные после чтения, пропускаются.
+
+        :param products: Продукты с обновленными данными.
+        :return: Успешно сохраненные продукты с увеличенными версиями.
         """
         pass
 
@@ -52,6 +79,88 @@ class ProductRepositoryInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_snapshot(self) -> CatalogSnapshot:
+        """
+        Получает неизменяемый снимок всего каталога на текущую версию.
+        Продукты снимка - опубликованные версии, их нельзя изменять (для изменения нужна копия).
+
+        :return: Снимок каталога.
+        """
+        pass
+
+    @abstractmethod
+    def find_available(
+            self,
+            category_id: Optional[str] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            on_promotion: Optional[bool] = None,
+            price_bucket: Optional[str] = None,
+            sort_by: Optional[str] = None,
+            descending: bool = False,
+            category_ids: Optional[List[str]] = None,
+            include_out_of_stock: bool = False,
+    ) -> List[Product]:
+        """
+        Получает продукты в наличии с фильтрацией и сортировкой.
+
+        :param category_id: Идентификатор категории (необязательно).
+        :param min_price: Минимальная цена со скидкой (необязательно).
+        :param max_price: Максимальная цена со скидкой (необязательно).
+        :param on_promotion: Только продукты со скидкой (True) или без неё (False) (необязательно).
+        :param price_bucket: Ценовой диапазон, например "10-50" (необязательно).
+        :param sort_by: Поле сортировки: price, price_after_discount, name или created_at.
+        :param descending: Сортировать по убыванию.
+        :param category_ids: Любая из перечисленных категорий, например поддерево (необязательно).
+        :param include_out_of_stock: Включать продукты, которых нет в наличии.
+        :return: Список продуктов.
+        :raises ValueError: Если поле сортировки или ценовой диапазон неизвестны.
+        """
+        pass
+
+    @abstractmethod
+    def get_facets(
+            self,
+            category_id: Optional[str] = None,
+            on_promotion: Optional[bool] = None,
+            price_bucket: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Считает продукты в наличии по значениям фильтров (фасетам).
+
+        Для каждого фасета учитываются все фильтры, кроме его собственного.
+
+        :param category_id: Идентификатор категории (необязательно).
+        :param on_promotion: Фильтр по наличию скидки (необязательно).
+        :param price_bucket: Ценовой диапазон (необязательно).
+        :return: Словарь с ключами total, category_id, on_promotion и price_bucket.
+        :raises ValueError: Если ценовой диапазон неизвестен.
+        """
+        pass
+
+    @abstractmethod
+    def get_available_counts(self) -> Dict[str, int]:
+        """
+        Возвращает количество продуктов в наличии по категориям.
+
+        Счётчики поддерживаются при каждом изменении продукта, поэтому чтение не перебирает каталог.
+
+        :return: Словарь идентификатор категории -> количество продуктов в наличии.
+        """
+        pass
+
+    @abstractmethod
+    def search(self, query: str, limit: int) -> List[Product]:
+        """
+        Ищет продукты в наличии по словам (или началам слов) из названия.
+
+        :param query: Поисковый запрос.
+        :param limit: Максимальное количество результатов.
+        :return: Список продуктов, отсортированный по релевантности.
+        """
+        pass
+
     @abstractmethod
     def get_by_category(self, category_id: str) -> List[Product]:
         """
@@ -0,0 +1,68 @@
+# app/application/interfaces/promotion_repository_interface.py
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+from domain.entities.promotion import Promotion
+
+
+class PromotionRepositoryInterface(ABC):
+    @abstractmethod
+    def add(self, promotion: Promotion) -> Promotion:
+        """
+        Добавляет акцию и ставит её начало в очередь планировщика.
+
+        :param promotion: Экземпляр акции для добавления.
+        :return: Добавленная акция.
+        """
+        pass
+
+    @abstractmethod
+    def get_by_id(self, promotion_id: str) -> Promotion:
+        """
+        Получает акцию по ее идентификатору.
+
+        :param promotion_id: Идентификатор акции.
+        :return: Найденная акция.
+        :raises PromotionNotFoundException: Если акция не найдена.
+        """
+        pass
+
+    @abstractmethod
+    def update(self, promotion: Promotion) -> None:
+        """
+        Сохраняет акцию и ставит в очередь её следующий переход (начало или окончание), если он есть.
+
+        :param promotion: Экземпляр акции с обновленными данными.
+        :raises PromotionNotFoundException: Если акция не найдена.
+        """
+        pass
+
+    @abstractmethod
+    def get_all(self) -> List[Promotion]:
+        """
+        Получает все акции.
+
+        :return: Список акций.
+        """
+        pass
+
+    @abstractmethod
+    def pop_due(self, now: datetime) -> List[Promotion]:
+        """
+        Извлекает из очереди акции, которые к моменту now нужно включить или завершить,
+        в порядке времени перехода.
+
+        :param now: Текущее время.
+        :return: Список акций.
+        """
+        pass
+
+    @abstractmethod
+    def get_next_transition_at(self) -> Optional[datetime]:
+        """
+        Возвращает время ближайшего перехода в очереди.
+
+        :return: Время или None, если очередь пуста.
+        """
+        pass
@@ -1,7 +1,8 @@
 # app/application/interfaces/reservation_repository_interface.py
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 from domain.entities.reservation import Reservation
 
 
@@ -71,3 +72,35 @@ class ReservationRepositoryInterface(ABC):
         :return: Список активных резервирований.
         """
         pass
+
+    @abstractmethod
+    def get_active_by_product_id(self, product_id: str) -> List[Reservation]:
+        """
+        Получает активные резервирования продукта из индекса, без перебора всех резервирований.
+
+        :param product_id: Идентификатор продукта.
+        :return: Список активных резервирований.
+        """
+        pass
+
+    @abstractmethod
+    def get_reserved_quantities(self, product_ids: List[str]) -> Dict[str, int]:
+        """
+        Получает суммарное зарезервированное количество по продуктам.
+        Суммы поддерживаются при каждой записи резервирования, чтение не перебирает резервирования.
+
+        :param product_ids: Идентификаторы продуктов.
+        :return: Словарь product_id -> зарезервированное количество (0 для продуктов без активных резервирований).
+        """
+        pass
+
+    @abstractmethod
+    def purge_closed_before(self, cutoff: datetime, limit: int) -> int:
+        """
+        Удаляет отмененные и завершенные резервирования, закрытые не позднее cutoff.
+
+        :param cutoff: Граница по времени закрытия резервирования.
+        :param limit: Максимальное количество удаляемых резервирований.
+        :return: Количество удаленных резервирований.
+        """
+        pass
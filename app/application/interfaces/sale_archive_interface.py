@@ -0,0 +1,44 @@
+# app/application/interfaces/sale_archive_interface.py
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+from domain.entities.sale import Sale
+
+
+class SaleArchiveInterface(ABC):
+    @property
+    @abstractmethod
+    def enabled(self) -> bool:
+        """
+        Признак того, что архив настроен и продажи перед сворачиванием в дневные итоги сохраняются на диск.
+        """
+        pass
+
+    @abstractmethod
+    async def write(self, sales: List[Sale]) -> None:
+        """
+        Сохраняет продажи в архив.
+
+        :param sales: Список продаж.
+        """
+        pass
+
+    @abstractmethod
+    async def read(
+            self,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
+            category_id: Optional[str] = None,
+            product_id: Optional[str] = None,
+    ) -> List[Sale]:
+        """
+        Читает архивные продажи, пропуская блоки, которые не могут содержать подходящих продаж.
+
+        :param start_date: Начальная дата диапазона (необязательно).
+        :param end_date: Конечная дата диапазона (необязательно).
+        :param category_id: Идентификатор категории для фильтрации (необязательно).
+        :param product_id: Идентификатор продукта для фильтрации (необязательно).
+        :return: Список продаж.
+        """
+        pass
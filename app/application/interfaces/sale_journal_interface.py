@@ -0,0 +1,59 @@
+# app/application/interfaces/sale_journal_interface.py
+
+from abc import ABC, abstractmethod
+from typing import List
+from domain.entities.sale import Sale
+
+
+class SaleJournalInterface(ABC):
+    @property
+    @abstractmethod
+    def enabled(self) -> bool:
+        """
+        Признак того, что журнал настроен и продажи записываются в репозиторий отложенно (write-behind).
+        """
+        pass
+
+    @abstractmethod
+    async def append(self, sales: List[Sale]) -> None:
+        """
+        Надежно добавляет продажи в конец журнала; возвращается после того, как записи сохранены на диск.
+
+        :param sales: Список продаж.
+        """
+        pass
+
+    @abstractmethod
+    def peek(self, limit: int) -> List[Sale]:
+        """
+        Получает самые старые продажи, еще не перенесенные в репозиторий, не удаляя их из журнала.
+
+        :param limit: Максимальное количество продаж.
+        :return: Список продаж в порядке записи.
+        """
+        pass
+
+    @abstractmethod
+    def acknowledge(self, count: int) -> None:
+        """
+        Отмечает первые count продаж журнала перенесенными в репозиторий.
+
+        :param count: Количество перенесенных продаж (не больше, чем вернул peek).
+        """
+        pass
+
+    @abstractmethod
+    def get_pending_count(self) -> int:
+        """
+        Получает количество продаж, еще не перенесенных в репозиторий.
+
+        :return: Количество продаж.
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Закрывает файлы журнала.
+        """
+        pass
@@ -2,8 +2,10 @@
 
 from abc import ABC, abstractmethod
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 from domain.entities.sale import Sale
+from domain.entities.sale_rollup import SaleRollup
+from domain.values.sale_totals import SaleTotals
 
 
 class SaleRepositoryInterface(ABC):
@@ -17,6 +19,16 @@ class SaleRepositoryInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def add_many(self, sales: List[Sale]) -> List[Sale]:
+        """
+        Добавляет несколько продаж одной пакетной записью.
+
+        :param sales: Список продаж для добавления.
+        :return: Добавленные продажи.
+        """
+        pass
+
     @abstractmethod
     def get_by_id(self, sale_id: str) -> Optional[Sale]:
         """
@@ -56,12 +68,86 @@ class SaleRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def get_sales_between_dates(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> List[Sale]:
+    def get_sales_between_dates(
+            self,
+            start_date: Optional[datetime],
+            end_date: Optional[datetime],
+            category_id: Optional[str] = None,
+    ) -> List[Sale]:
         """
         Получает продажи в заданном диапазоне дат.
 
         :param start_date: Начальная дата диапазона.
         :param end_date: Конечная дата диапазона.
+        :param category_id: Идентификатор категории продукта на момент продажи (необязательно).
         :return: Список продаж в указанном диапазоне.
         """
         pass
+
+    @abstractmethod
+    async def get_sales_totals(
+            self,
+            start_date: Optional[datetime],
+            end_date: Optional[datetime],
+            category_id: Optional[str] = None,
+    ) -> SaleTotals:
+        """
+        Получает суммарные количество, выручку и число продаж в заданном диапазоне дат.
+
+        :param start_date: Начальная дата диапазона.
+        :param end_date: Конечная дата диапазона.
+        :param category_id: Идентификатор категории продукта на момент продажи (необязательно).
+        :return: Итоги продаж.
+        """
+        pass
+
+    @abstractmethod
+    async def get_sales_before(self, cutoff: datetime, limit: int) -> List[Sale]:
+        """
+        Получает самые старые продажи, совершенные не позднее cutoff.
+
+        :param cutoff: Граница по дате продажи.
+        :param limit: Максимальное количество продаж.
+        :return: Список продаж по возрастанию даты.
+        """
+        pass
+
+    @abstractmethod
+    async def compact(self, sales: List[Sale]) -> None:
+        """
+        Сворачивает продажи в дневные итоги по продуктам и удаляет сами продажи из памяти.
+        Если архив включен, продажи сначала сохраняются в него и остаются доступны в отчетах.
+
+        :param sales: Продажи, полученные из get_sales_before.
+        """
+        pass
+
+    @abstractmethod
+    async def compact_partitions_before(self, cutoff: datetime) -> int:
+        """
+        Сворачивает в дневные итоги целые партиции продаж, закончившиеся не позднее cutoff, и удаляет
+        их целиком, без удаления продаж по одной. Если архив включен, продажи сначала сохраняются в него.
+
+        :param cutoff: Граница по дате продажи.
+        :return: Количество свернутых продаж.
+        """
+        pass
+
+    @abstractmethod
+    async def get_daily_rollups(
+            self,
+            start_date: Optional[date],
+            end_date: Optional[date],
+            product_id: Optional[str] = None,
+            category_id: Optional[str] = None,
+    ) -> List[SaleRollup]:
+        """
+        Получает дневные итоги свернутых продаж в диапазоне дней.
+
+        :param start_date: Первый день диапазона (включительно).
+        :param end_date: Последний день диапазона (включительно).
+        :param product_id: Идентификатор продукта для фильтрации (необязательно).
+        :param category_id: Идентификатор категории для фильтрации (необязательно).
+        :return: Список итогов по возрастанию дня.
+        """
+        pass
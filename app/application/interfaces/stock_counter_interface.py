@@ -0,0 +1,78 @@
+# app/application/interfaces/stock_counter_interface.py
+
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+
+class StockCounterInterface(ABC):
+    @abstractmethod
+    def enable(self, product_id: str, stock: int, shards: int) -> None:
+        """
+        Переводит остаток продукта в шардированные счетчики (или меняет число шардов).
+
+        :param product_id: Идентификатор продукта.
+        :param stock: Текущий остаток, распределяемый между шардами.
+        :param shards: Количество шардов.
+        """
+        pass
+
+    @abstractmethod
+    def disable(self, product_id: str) -> Optional[int]:
+        """
+        Убирает шардированные счетчики продукта.
+
+        :param product_id: Идентификатор продукта.
+        :return: Суммарный остаток по шардам или None, если продукт не был шардирован.
+        """
+        pass
+
+    @abstractmethod
+    def get_total(self, product_id: str) -> Optional[int]:
+        """
+        Получает суммарный остаток продукта по всем шардам.
+
+        :param product_id: Идентификатор продукта.
+        :return: Остаток или None, если продукт не шардирован.
+        """
+        pass
+
+    @abstractmethod
+    def get_sharded_product_ids(self) -> List[str]:
+        """
+        Получает идентификаторы всех шардированных продуктов.
+
+        :return: Список идентификаторов.
+        """
+        pass
+
+    @abstractmethod
+    def get_shard_count(self, product_id: str) -> int:
+        """
+        Получает количество шардов продукта.
+
+        :param product_id: Идентификатор продукта.
+        :return: Количество шардов; 0, если продукт не шардирован.
+        """
+        pass
+
+    @abstractmethod
+    def take(self, product_id: str, quantity: int) -> bool:
+        """
+        Списывает quantity единиц с одного из шардов; если в выбранном шарде не хватает остатка,
+        шарды перебалансируются.
+
+        :param product_id: Идентификатор шардированного продукта.
+        :param quantity: Списываемое количество.
+        :return: False, если суммарного остатка не хватает (ничего не списано).
+        """
+        pass
+
+    @abstractmethod
+    def put(self, product_id: str, quantity: int) -> None:
+        """
+        Возвращает quantity единиц в один из шардов.
+
+        :param product_id: Идентификатор шардированного продукта.
+        :param quantity: Возвращаемое количество.
+        """
+        pass
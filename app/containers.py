@@ -1,5 +1,7 @@
 # app/containers.py
 
+import os
+from datetime import timedelta
 from functools import lru_cache
 from punq import Container, Scope
 
@@ -7,16 +9,32 @@ from application.interfaces.product_repository_interface import ProductRepositor
 from application.interfaces.category_repository_interface import CategoryRepositoryInterface
 from application.interfaces.reservation_repository_interface import ReservationRepositoryInterface
 from application.interfaces.sale_repository_interface import SaleRepositoryInterface
+from application.interfaces.product_change_log_interface import ProductChangeLogInterface
+from application.interfaces.product_event_broker_interface import ProductEventBrokerInterface
+from application.interfaces.best_seller_tracker_interface import BestSellerTrackerInterface
+from application.interfaces.promotion_repository_interface import PromotionRepositoryInterface
+from application.interfaces.stock_counter_interface import StockCounterInterface
+from application.interfaces.sale_journal_interface import SaleJournalInterface
+from application.interfaces.sale_archive_interface import SaleArchiveInterface
 
 from domain.services.product_service import ProductService
 from domain.services.category_service import CategoryService
 from domain.services.reservation_service import ReservationService
 from domain.services.sale_service import SaleService
+from domain.services.promotion_service import PromotionService
+from domain.services.retention_service import RetentionService, RetentionPolicy
 
 from infrastructure.repositories.in_memory.in_memory_product_repository import InMemoryProductRepository
 from infrastructure.repositories.in_memory.in_memory_category_repository import InMemoryCategoryRepository
 from infrastructure.repositories.in_memory.in_memory_reservation_repository import InMemoryReservationRepository
 from infrastructure.repositories.in_memory.in_memory_sale_repository import InMemorySaleRepository
+from infrastructure.repositories.in_memory.in_memory_product_change_log import InMemoryProductChangeLog
+from infrastructure.events.in_memory_product_event_broker import InMemoryProductEventBroker
+from infrastructure.analytics.in_memory_best_seller_tracker import InMemoryBestSellerTracker
+from infrastructure.repositories.in_memory.in_memory_promotion_repository import InMemoryPromotionRepository
+from infrastructure.stock.in_memory_sharded_stock_counter import InMemoryShardedStockCounter
+from infrastructure.journal.file_sale_journal import FileSaleJournal
+from infrastructure.archive.columnar_sale_archive import ColumnarSaleArchive
 
 @lru_cache(1)
 def init_container() -> Container:
@@ -30,26 +48,60 @@ def init_container() -> Container:
     container.register(CategoryRepositoryInterface, InMemoryCategoryRepository, scope=Scope.singleton)
     container.register(ReservationRepositoryInterface, InMemoryReservationRepository, scope=Scope.singleton)
     container.register(SaleRepositoryInterface, InMemorySaleRepository, scope=Scope.singleton)
+    container.register(ProductChangeLogInterface, InMemoryProductChangeLog, scope=Scope.singleton)
+    container.register(ProductEventBrokerInterface, InMemoryProductEventBroker, scope=Scope.singleton)
+    container.register(BestSellerTrackerInterface, InMemoryBestSellerTracker, scope=Scope.singleton)
+    container.register(PromotionRepositoryInterface, InMemoryPromotionRepository, scope=Scope.singleton)
+    container.register(StockCounterInterface, InMemoryShardedStockCounter, scope=Scope.singleton)
+    # если задан SALE_JOURNAL_PATH, продажи сначала пишутся в локальный журнал и переносятся в репозиторий в фоне
+    container.register(SaleJournalInterface, instance=FileSaleJournal(os.environ.get("SALE_JOURNAL_PATH")))
+    # сроки хранения закрытых резервирований и отдельных продаж; продажи сворачиваются в дневные итоги,
+    # только если задан SALE_RETENTION_DAYS. Если задан SALE_ARCHIVE_DIR, продажи перед сворачиванием
+    # сохраняются в колоночный архив и остаются доступны в отчетах, иначе остаются только в итогах
+    container.register(SaleArchiveInterface, instance=ColumnarSaleArchive(os.environ.get("SALE_ARCHIVE_DIR")))
+    sale_retention_days = os.environ.get("SALE_RETENTION_DAYS")
+    container.register(RetentionPolicy, instance=RetentionPolicy(
+        reservation_grace_period=timedelta(hours=float(os.environ.get("RESERVATION_RETENTION_HOURS", 24))),
+        sale_retention_period=timedelta(days=float(sale_retention_days)) if sale_retention_days else None,
+    ))
 
     # Регистрация сервисов с их зависимостями через интерфейсы
     container.register(ProductService,
                        product_repository=ProductRepositoryInterface,
                        reservation_service=ReservationService,
                        sale_service=SaleService,
+                       change_log=ProductChangeLogInterface,
+                       event_broker=ProductEventBrokerInterface,
+                       category_service=CategoryService,
+                       stock_counter=StockCounterInterface,
                        scope=Scope.singleton)
 
     container.register(CategoryService,
                        category_repository=CategoryRepositoryInterface,
+                       product_repository=ProductRepositoryInterface,
                        scope=Scope.singleton)
 
     container.register(ReservationService,
                        reservation_repository=ReservationRepositoryInterface,
-                       product_repository=ProductRepositoryInterface,
+                       sale_service=SaleService,
                        scope=Scope.singleton)
 
     container.register(SaleService,
                        sale_repository=SaleRepositoryInterface,
                        product_repository=ProductRepositoryInterface,
+                       best_seller_tracker=BestSellerTrackerInterface,
+                       sale_journal=SaleJournalInterface,
+                       scope=Scope.singleton)
+
+    container.register(PromotionService,
+                       promotion_repository=PromotionRepositoryInterface,
+                       product_service=ProductService,
+                       scope=Scope.singleton)
+
+    container.register(RetentionService,
+                       reservation_repository=ReservationRepositoryInterface,
+                       sale_repository=SaleRepositoryInterface,
+                       policy=RetentionPolicy,
                        scope=Scope.singleton)
 
     return container
@@ -1,8 +1,13 @@
 from abc import ABC
 from dataclasses import dataclass, field
+from typing import FrozenSet
 import uuid
 from datetime import datetime
 
+# attributes that are not part of the entity state tracked for changes
+UNTRACKED_FIELDS = frozenset({'version', '_dirty_fields'})
+_MISSING = object()
+
 
 @dataclass(eq=False)
 class BaseEntity(ABC):
@@ -14,6 +19,50 @@ class BaseEntity(ABC):
         default_factory=datetime.now,
         kw_only=True
     )
+    # incremented by the repository on every successful update, used for optimistic concurrency
+    version: int = field(
+        default=0,
+        kw_only=True
+    )
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen'):
+            raise AttributeError(
+                f"{type(self).__name__} {self.oid} is a published version and cannot be modified, copy it first"
+            )
+        # assignments made by __init__ create the attribute and are not changes; later assignments
+        # mark the field dirty only if the value actually differs, so repositories can skip no-op writes
+        current = self.__dict__.get(name, _MISSING)
+        if current is not _MISSING and name not in UNTRACKED_FIELDS and current != value:
+            # a new frozenset on every change keeps copies made with copy.copy independent
+            self.__dict__['_dirty_fields'] = self.dirty_fields | {name}
+        object.__setattr__(self, name, value)
+
+    @property
+    def dirty_fields(self) -> FrozenSet[str]:
+        """Fields changed since the entity was created or last saved."""
+        return self.__dict__.get('_dirty_fields', frozenset())
+
+    def mark_clean(self) -> None:
+        """Called by repositories once the current state is persisted."""
+        self.__dict__['_dirty_fields'] = frozenset()
+
+    def freeze(self) -> None:
+        """
+        Called by repositories on the version they publish to readers: it is shared by all reads,
+        so it must never change. copy.copy() returns a modifiable copy.
+        """
+        self.__dict__['_frozen'] = True
+
+    @property
+    def is_frozen(self) -> bool:
+        return self.__dict__.get('_frozen', False)
+
+    def __copy__(self) -> "BaseEntity":
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone.__dict__.pop('_frozen', None)
+        return clone
 
     def __hash__(self) -> int:
         return hash(self.oid)
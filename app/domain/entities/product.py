@@ -15,6 +15,9 @@ class Product(BaseEntity):
     price: Price
     stock: Quantity
     discount: Optional[Discount] = Discount(0.0)
+    # set by the promotion scheduler while a scheduled promotion runs, overrides the own discount
+    promotion_id: Optional[str] = None
+    promotion_discount: Optional[Discount] = None
 
     @property
     def price_value(self) -> float:
@@ -36,6 +39,12 @@ class Product(BaseEntity):
         """Set a discount without altering price directly."""
         self.discount = Discount(discount_percentage)
 
+    def get_effective_discount(self) -> float:
+        """The discount of the running scheduled promotion if any, otherwise the product's own one."""
+        if self.promotion_discount is not None:
+            return self.promotion_discount.value
+        return self.discount_value
+
     def get_price_after_discount(self) -> float:
-        return round(self.price.value * (1 - self.discount.value / 100), 2)
+        return round(self.price.value * (1 - self.get_effective_discount() / 100), 2)
 
@@ -0,0 +1,22 @@
+# app/domain/entities/product_change.py
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from .product import Product
+
+
+@dataclass(frozen=True)
+class ProductChange:
+    """
+    A single entry of the catalog change feed.
+
+    Possible values for operation: upsert, delete.
+    `sequence` is the position of the change in the feed, consumers use it as a cursor.
+    """
+    sequence: int
+    product_id: str
+    operation: str  # can be 'upsert' or 'delete'
+    product: Optional[Product] = None
+    changed_at: datetime = field(default_factory=datetime.now)
@@ -0,0 +1,42 @@
+# app/domain/entities/promotion.py
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+from .base_entity import BaseEntity
+
+
+@dataclass
+class Promotion(BaseEntity):
+    """
+    A discount that the promotion scheduler applies to products between starts_at and ends_at.
+
+    Targets are the listed products plus, if category_id is set, every product of the category
+    subtree at activation time; the resolved ids are kept in product_ids to end the promotion.
+
+    Possible values for status: scheduled, active, finished, cancelled
+    """
+    discount_percentage: float
+    starts_at: datetime
+    ends_at: datetime
+    product_ids: List[str] = field(default_factory=list)
+    category_id: Optional[str] = None
+    status: str = "scheduled"
+
+    @property
+    def next_transition_at(self) -> Optional[datetime]:
+        """When the scheduler has to act on the promotion next, None once it is over."""
+        if self.status == "scheduled":
+            return self.starts_at
+        if self.status == "active":
+            return self.ends_at
+        return None
+
+    def activate(self):
+        self.status = "active"
+
+    def finish(self):
+        self.status = "finished"
+
+    def cancel(self):
+        self.status = "cancelled"
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Optional
 from .base_entity import BaseEntity
 
 @dataclass
@@ -7,12 +8,26 @@ class Reservation(BaseEntity):
     """
     The Reservation entity is used to track the reservation of items.
 
-    Possible values for status: reserved, cancelled
+    Possible values for status: reserved, cancelled, completed (checked out into a sale)
     """
     product_id: str
     quantity: int
-    status: str = "reserved"   # can be 'reserved' or 'cancelled'
+    status: str = "reserved"   # can be 'reserved', 'cancelled' or 'completed'
     reserved_at: datetime = field(default_factory=datetime.now)
+    # when the reservation was cancelled or completed, closed reservations are purged after a grace period
+    closed_at: Optional[datetime] = None
+
+    def is_active(self) -> bool:
+        return self.status == "reserved"
 
     def cancel(self):
         self.status = "cancelled"
+        self.closed_at = datetime.now()
+
+    def complete(self):
+        self.status = "completed"
+        self.closed_at = datetime.now()
+
+    def reopen(self):
+        self.status = "reserved"
+        self.closed_at = None
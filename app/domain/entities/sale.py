@@ -1,10 +1,19 @@
 from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Optional
 from .base_entity import BaseEntity
 import uuid
 
 @dataclass
 class Sale(BaseEntity):
+    """
+    The Sale entity records a sold quantity of a product.
+
+    category_id and unit_price are copied from the product at the time of sale,
+    so reports do not need to look the product up again.
+    """
     product_id: uuid.UUID
     quantity: int
     sale_date: datetime = field(default_factory=datetime.now)
+    category_id: Optional[str] = None
+    unit_price: Optional[float] = None  # price after discount at the time of sale
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+from .sale import Sale
+
+
+@dataclass
+class SaleRollup:
+    """
+    Daily total of one product's sales. Sales older than the retention period are folded
+    into rollups and removed, so long-range reports keep working on a bounded amount of data.
+    """
+    day: date
+    product_id: str
+    category_id: Optional[str] = None
+    quantity: int = 0
+    revenue: float = 0.0  # sum of quantity * unit_price of the sales that had a price
+    sales_count: int = 0
+
+    def add(self, sale: Sale) -> None:
+        self.quantity += sale.quantity
+        self.sales_count += 1
+        if sale.unit_price is not None:
+            self.revenue = round(self.revenue + sale.quantity * sale.unit_price, 2)
+        if self.category_id is None:
+            self.category_id = sale.category_id
@@ -35,3 +35,34 @@ class InsufficientStockException(ApplicationException):
         return (f"Insufficient stock for product {self.product_id}. "
                 f"Requested {self.requested_quantity}, but only {self.available_stock} available.")
 
+
+@dataclass(eq=False)
+class ChangeLogCompactedException(ApplicationException):
+    since: int
+    oldest_available: int
+
+    @property
+    def message(self):
+        return (f"Changes after version {self.since} are no longer available "
+                f"(oldest available version is {self.oldest_available}). Full resync required.")
+
+
+@dataclass(eq=False)
+class ProductVersionConflictException(ApplicationException):
+    product_id: str
+    expected_version: int
+    actual_version: int
+
+    @property
+    def message(self):
+        return (f"Product {self.product_id} was modified concurrently. "
+                f"Expected version {self.expected_version}, but current version is {self.actual_version}.")
+
+
+@dataclass(eq=False)
+class InvalidStockQuantityException(ApplicationException):
+    quantity: int
+
+    @property
+    def message(self):
+        return f"Invalid quantity {self.quantity}. Must be a positive integer."
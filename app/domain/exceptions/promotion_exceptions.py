@@ -0,0 +1,45 @@
+# app/domain/exceptions/promotion_exceptions.py
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List
+from domain.exceptions.base_exception import ApplicationException
+
+
+@dataclass(eq=False)
+class PromotionNotFoundException(ApplicationException):
+    promotion_id: str
+
+    @property
+    def message(self):
+        return f"Promotion with ID {self.promotion_id} not found."
+
+
+@dataclass(eq=False)
+class InvalidPromotionPeriodException(ApplicationException):
+    starts_at: datetime
+    ends_at: datetime
+
+    @property
+    def message(self):
+        return f"Promotion must end after it starts (starts at {self.starts_at}, ends at {self.ends_at})."
+
+
+@dataclass(eq=False)
+class PromotionAlreadyEndedException(ApplicationException):
+    promotion_id: str
+    status: str
+
+    @property
+    def message(self):
+        return f"Promotion with ID {self.promotion_id} is already {self.status}."
+
+
+@dataclass(eq=False)
+class PromotionProductsNotUpdatedException(ApplicationException):
+    promotion_id: str
+    product_ids: List[str]
+
+    @property
+    def message(self):
+        return f"Products {', '.join(self.product_ids)} were not updated for promotion with ID {self.promotion_id}."
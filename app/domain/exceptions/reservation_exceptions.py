@@ -24,3 +24,13 @@ class CannotCancelReservationException(ApplicationException):
         return f"Cannot cancel reservation {self.reservation_id} with status '{self.status}'."
 
 
+@dataclass(eq=False)
+class CannotCheckoutReservationException(ApplicationException):
+    reservation_id: uuid.UUID
+    status: str
+
+    @property
+    def message(self):
+        return f"Cannot check out reservation {self.reservation_id} with status '{self.status}'."
+
+
@@ -12,3 +12,12 @@ class SaleNotFoundException(ApplicationException):
     @property
     def message(self):
         return f"Sale with ID {self.sale_id} not found."
+
+
+@dataclass(eq=False)
+class InvalidSalesReportPeriodException(ApplicationException):
+    reason: str
+
+    @property
+    def message(self):
+        return f"Invalid sales report period: {self.reason}."
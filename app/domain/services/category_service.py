@@ -1,7 +1,8 @@
 # domain/services/category_service.py
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 from domain.entities.category import Category
 from infrastructure.repositories.in_memory.in_memory_category_repository import CategoryRepositoryInterface
+from application.interfaces.product_repository_interface import ProductRepositoryInterface
 from presentation.schemas.category_schema import CategoryCreateRequest, CategoryUpdateRequest
 from infrastructure.converters.category_converters import (
     convert_create_request_to_category,
@@ -11,11 +12,13 @@ from domain.exceptions.category_exceptions import CategoryNotFoundException
 
 
 class CategoryService:
-    def __init__(self, category_repository: CategoryRepositoryInterface):
+    def __init__(self, category_repository: CategoryRepositoryInterface, product_repository: ProductRepositoryInterface):
         """
         Initializes the CategoryService with a repository interface.
+        The product repository provides the available-product counters for category navigation.
         """
         self.category_repository = category_repository
+        self.product_repository = product_repository
 
     async def create_category(self, category: Union[CategoryCreateRequest| Category]) -> Category:
         """
@@ -59,3 +62,57 @@ class CategoryService:
         Returns a list of all categories stored in the repository.
         """
         return await self.category_repository.get_all()
+
+    async def get_available_product_counts(self, categories: List[Category]) -> Dict[str, Tuple[int, int]]:
+        """
+        Returns (own, subtree) counts of available products for each category.
+        Own counts are kept up to date by the product repository on every stock change,
+        subtree counts are summed bottom-up over the category tree without touching products.
+        """
+        own_counts = await self.product_repository.get_available_counts()
+        children = self._group_children(categories)
+
+        subtree_counts: Dict[str, int] = {}
+        visited = set()
+        for category in categories:
+            # iterative post-order walk, a category is summed after all of its children
+            stack = [(category.oid, False)]
+            while stack:
+                category_id, children_done = stack.pop()
+                if children_done:
+                    subtree_counts[category_id] = own_counts.get(category_id, 0) + sum(
+                        subtree_counts.get(child_id, 0) for child_id in children.get(category_id, ())
+                    )
+                    continue
+                if category_id in visited:
+                    continue
+                visited.add(category_id)
+                stack.append((category_id, True))
+                stack.extend((child_id, False) for child_id in children.get(category_id, ()))
+
+        return {
+            category.oid: (own_counts.get(category.oid, 0), subtree_counts[category.oid])
+            for category in categories
+        }
+
+    async def get_subtree_ids(self, category_id: str) -> List[str]:
+        """
+        Returns the category id followed by the ids of all its subcategories, at any depth.
+        """
+        children = self._group_children(await self.category_repository.get_all())
+        subtree_ids = [category_id]
+        seen = {category_id}
+        for subtree_id in subtree_ids:
+            for child_id in children.get(subtree_id, ()):
+                if child_id not in seen:
+                    seen.add(child_id)
+                    subtree_ids.append(child_id)
+        return subtree_ids
+
+    @staticmethod
+    def _group_children(categories: List[Category]) -> Dict[str, List[str]]:
+        children: Dict[str, List[str]] = {}
+        for category in categories:
+            if category.parent_category_id:
+                children.setdefault(str(category.parent_category_id), []).append(category.oid)
+        return children
@@ -1,27 +1,74 @@
 # app/domain/services/product_service.py
 
-from typing import List, Optional, Union
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+import asyncio
+import logging
 import uuid
 
 from fastapi import Depends, HTTPException
 from pydantic import ValidationError
 
 from domain.entities.product import Product
+from domain.entities.promotion import Promotion
 from domain.values.price import Price
 from domain.values.discount import Discount
 from domain.values.quantity import Quantity
 from application.interfaces.product_repository_interface import ProductRepositoryInterface
+from application.interfaces.product_change_log_interface import ProductChangeLogInterface
+from application.interfaces.product_event_broker_interface import (
+    ProductEventBrokerInterface,
+    ProductEventSubscriptionInterface,
+)
+from application.interfaces.stock_counter_interface import StockCounterInterface
+from domain.exceptions.base_exception import ApplicationException
 from domain.exceptions.product_exceptions import (
     ProductNotFoundException,
     InvalidDiscountException,
     InsufficientStockException,
+    ChangeLogCompactedException,
+    ProductVersionConflictException,
+    InvalidStockQuantityException,
 )
 from domain.services.reservation_service import ReservationService
 from domain.services.sale_service import SaleService
+from domain.services.category_service import CategoryService
 from domain.entities.reservation import Reservation
 from domain.entities.sale import Sale
-from infrastructure.converters.product_converters import convert_product_to_dto, convert_dto_to_product
-from presentation.schemas.product_schema import ProductCreateRequest, ProductUpdateRequest, ProductResponse
+from infrastructure.converters.product_converters import (
+    convert_product_to_dto,
+    convert_dto_to_product,
+    convert_change_to_response,
+    convert_update_request_to_product,
+    convert_products_to_responses,
+)
+from presentation.schemas.sale_schema import SaleCreateRequest
+from presentation.schemas.product_schema import (
+    ProductCreateRequest,
+    ProductUpdateRequest,
+    ProductResponse,
+    ProductChangesResponse,
+    ProductBatchResponse,
+    ProductFacetsResponse,
+    ProductBulkSelection,
+    ProductBulkUpdateResponse,
+    ProductStockAdjustment,
+)
+
+logger = logging.getLogger(__name__)
+
+# сколько раз операция перечитывает продукт, если его параллельно изменил другой запрос
+MAX_UPDATE_ATTEMPTS = 5
+
+# сколько продуктов массовая операция сохраняет за одну пакетную запись, между пакетами управление отдается event loop
+BULK_UPDATE_CHUNK_SIZE = 500
+
+# сколько секунд копятся резервирования и продажи одного продукта, чтобы списать их остаток одной записью;
+# 0 отключает групповое списание
+STOCK_BATCH_WINDOW = 0.002
+
+# как часто остаток шардированных продуктов записывается в продукт: на столько может отставать остаток
+# в списке продуктов, индексах сортировки и фасетов, журнале изменений и SSE-потоке
+SHARDED_STOCK_PUBLISH_INTERVAL_SECONDS = 1.0
 
 
 class ProductService:
@@ -30,10 +77,21 @@ class ProductService:
         product_repository: ProductRepositoryInterface,
         reservation_service: ReservationService,
         sale_service: SaleService,
+        change_log: ProductChangeLogInterface,
+        event_broker: ProductEventBrokerInterface,
+        category_service: CategoryService,
+        stock_counter: StockCounterInterface,
     ):
         self.product_repository = product_repository
         self.reservation_service = reservation_service
         self.sale_service = sale_service
+        self.change_log = change_log
+        self.event_broker = event_broker
+        self.category_service = category_service
+        self.stock_counter = stock_counter
+        # product_id -> ожидающие группового списания запросы (операция, количество, future) в порядке поступления
+        self._pending_stock_requests: Dict[str, List[Tuple[str, int, asyncio.Future]]] = {}
+        self._stock_flush_tasks: Set[asyncio.Task] = set()
 
     async def create_product(self, product_data: Union[ProductCreateRequest, Product]) -> Product:
         """
@@ -42,16 +100,17 @@ class ProductService:
         product = self._process_product_input(product_data)
 
         created_product = await self.product_repository.add(product)
+        self._record_change(created_product)
         return convert_product_to_dto(created_product)
 
     async def update_price(self, product_id: str, new_price: Price) -> Product:
         """
         Обновляет цену существующего продукта.
         """
-        product = await self.get_product_by_id(product_id)
-        product.price = new_price
-        await self.product_repository.update(product)
-        return product
+        def set_price(product: Product) -> None:
+            product.price = new_price
+
+        return await self._modify_product(product_id, set_price)
 
     async def start_promotion(
             self,
@@ -64,40 +123,136 @@ class ProductService:
         if not (0 <= discount_percentage <= 100):
             raise InvalidDiscountException(discount_percentage=discount_percentage)
 
-        product = await self.product_repository.get_by_id(product_id)
-        if not isinstance(product, Product):
-            raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found.")
+        product = await self._modify_product(
+            product_id, lambda product: product.apply_discount(discount_percentage)
+        )
+        return convert_product_to_dto(product)
 
-        product.apply_discount(discount_percentage)
-        self.product_repository.update(product)
+    async def bulk_start_promotion(
+            self,
+            discount_percentage: float,
+            selection: ProductBulkSelection,
+    ) -> ProductBulkUpdateResponse:
+        """
+        Применяет скидку ко всем продуктам, подходящим под фильтры selection (категория с подкатегориями,
+        цена, скидка, ценовой диапазон), включая отсутствующие на складе.
+        """
+        if not (0 <= discount_percentage <= 100):
+            raise InvalidDiscountException(discount_percentage=discount_percentage)
 
-        return convert_product_to_dto(product)
+        product_ids = await self._select_products(selection)
+        return await self._modify_products(product_ids, lambda product: product.apply_discount(discount_percentage))
 
-    async def reserve_product(self, product_id: str, quantity: int) -> None:
+    async def bulk_update_price(
+            self,
+            price_multiplier: float,
+            selection: ProductBulkSelection,
+    ) -> ProductBulkUpdateResponse:
         """
-        Резервирует определенное количество товара.
+        Умножает цену всех продуктов, подходящих под фильтры selection, на price_multiplier
+        (с округлением до центов).
         """
+        if price_multiplier <= 0:
+            raise ValueError("Price multiplier must be positive.")
 
-        product = await self.product_repository.get_by_id(product_id)
-        if product.stock.value < quantity:
-            raise InsufficientStockException(
-                product_id=product_id,
-                requested_quantity=quantity,
-                available_stock=product.stock.value,
+        def reprice(product: Product) -> None:
+            product.price = Price(round(product.price_value * price_multiplier, 2))
+
+        product_ids = await self._select_products(selection)
+        return await self._modify_products(product_ids, reprice)
+
+    async def apply_scheduled_promotion(
+            self,
+            promotion: Promotion,
+            active_promotions: Sequence[Promotion] = (),
+    ) -> ProductBulkUpdateResponse:
+        """
+        Включает запланированную акцию: пакетно записывает её скидку в продукты акции и во все продукты
+        её категории с подкатегориями. Найденные продукты сохраняются в promotion.product_ids,
+        чтобы по окончании снять акцию именно с них. На продукте действует акция, начавшаяся позже всех:
+        продукты, на которых уже идет более поздняя акция из active_promotions, не меняются.
+        """
+        product_ids = list(promotion.product_ids)
+        if promotion.category_id:
+            product_ids += await self._select_products(ProductBulkSelection(category_id=promotion.category_id))
+        promotion.product_ids = list(dict.fromkeys(product_ids))
+        promotion_discount = Discount(promotion.discount_percentage)
+        later_promotion_ids = {
+            other.oid for other in active_promotions
+            if other.status == "active" and other.starts_at > promotion.starts_at
+        }
+
+        def start(product: Product) -> None:
+            if product.promotion_id in later_promotion_ids:
+                return
+            product.promotion_id = promotion.oid
+            product.promotion_discount = promotion_discount
+
+        return await self._modify_products(promotion.product_ids, start)
+
+    async def remove_scheduled_promotion(
+            self,
+            promotion: Promotion,
+            active_promotions: Sequence[Promotion] = (),
+    ) -> ProductBulkUpdateResponse:
+        """
+        Снимает акцию с её продуктов. Продукты, на которые уже действует более поздняя акция, не меняются.
+        Если продукт входит в другие еще идущие акции (active_promotions), на нем остается та из них,
+        что началась позже всех, иначе скидка акции снимается.
+        """
+        covering = [
+            (other, set(other.product_ids)) for other in active_promotions
+            if other.oid != promotion.oid and other.status == "active"
+        ]
+
+        def end(product: Product) -> None:
+            if product.promotion_id != promotion.oid:
+                return
+            replacement = max(
+                (other for other, product_ids in covering if product.oid in product_ids),
+                key=lambda other: other.starts_at,
+                default=None,
             )
-        product.stock = Quantity(product.stock.value - quantity)
-        await self.product_repository.update(product)
-        await self.reservation_service.create_reservation(product_id, quantity)
+            product.promotion_id = replacement.oid if replacement else None
+            product.promotion_discount = Discount(replacement.discount_percentage) if replacement else None
+
+        return await self._modify_products(promotion.product_ids, end)
+
+    async def adjust_stock(self, adjustments: List[ProductStockAdjustment]) -> ProductBulkUpdateResponse:
+        """
+        Массово обновляет остатки (синхронизация со складом). quantity — новый остаток (mode="absolute")
+        или его изменение (mode="delta"); строки одного продукта применяются по порядку.
+        Строки, не меняющие текущий остаток, не дают измененных полей и пропускаются без записи; продукты, которых нет или
+        остаток которых стал бы отрицательным, считаются неуспешными.
+        """
+        operations: Dict[str, List[Tuple[str, int]]] = {}
+        for adjustment in adjustments:
+            operations.setdefault(adjustment.product_id, []).append((adjustment.mode, adjustment.quantity))
+
+        def adjust(product: Product) -> None:
+            stock = product.stock_value
+            for mode, quantity in operations[product.oid]:
+                stock = quantity if mode == "absolute" else stock + quantity
+            if stock < 0:
+                raise ValueError(f"Stock of product {product.oid} cannot become negative ({stock}).")
+            product.stock = Quantity(stock)
+
+        return await self._modify_products(list(operations), adjust)
+
+    async def reserve_product(self, product_id: str, quantity: int) -> None:
+        """
+        Резервирует определенное количество товара.
+        """
+        await self._process_stock_request(product_id, "reserve", quantity)
 
     async def cancel_reservation(self, reservation_id: str) -> None:
         """
-        Отменяет резервирование товара.
+        Отменяет резервирование товара и возвращает остаток.
+        Резервирование отменяется до возврата остатка, поэтому уже оформленное в продажу
+        или отмененное резервирование не вернет остаток повторно.
         """
-        reservation = await self.reservation_service.get_reservation_by_id(reservation_id)
-        product = await self.get_product_by_id(reservation.product_id)
-        product.stock = Quantity(product.stock.value + reservation.quantity)
-        await self.product_repository.update(product)
-        await self.reservation_service.cancel_reservation(reservation_id)
+        reservation = await self.reservation_service.cancel_reservation(reservation_id)
+        await self._return_stock(reservation.product_id, reservation.quantity)
 
     async def sell_product(self, product_id: str, quantity: int) -> None:
         """
@@ -106,50 +261,534 @@ class ProductService:
         if isinstance(product_id, uuid.UUID):
             product_id = str(product_id)
 
+        await self._process_stock_request(product_id, "sell", quantity)
+
+    async def enable_sharded_stock(self, product_id: str, shards: int) -> ProductResponse:
+        """
+        Переводит остаток продукта в shards независимых счетчиков (режим для товаров флеш-распродаж).
+        Резервирование и продажа такого продукта списывают остаток со случайного шарда без записи продукта,
+        поэтому параллельные продажи одного товара не конфликтуют по версии. Повторный вызов меняет число шардов.
+        """
         product = await self.product_repository.get_by_id(product_id)
-        if product.stock.value < quantity:
-            raise InsufficientStockException(
-                product_id=product_id,
-                requested_quantity=quantity,
-                available_stock=product.stock.value,
-            )
-        product.stock = Quantity(product.stock.value - quantity)
-        await self.product_repository.update(product)
-        await self.sale_service.record_sale(product_id, quantity)
-
-    async def update_product(self, product_id: str, product_update: ProductUpdateRequest) -> Product:
-        product = await self.get_product_by_id(product_id)
-        update_data = product_update.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(product, key, value)
-        updated_product = await self.product_repository.update(product)
+        self.stock_counter.enable(product_id, product.stock.value, shards)
+        self._load_sharded_stock(product)
+        return convert_product_to_dto(product)
+
+    async def disable_sharded_stock(self, product_id: str) -> ProductResponse:
+        """
+        Собирает остаток из шардов обратно в продукт и возвращает его к обычному списанию.
+        """
+        stock = self.stock_counter.disable(product_id)
+        if stock is None:
+            return await self.get_product_by_id(product_id)
+
+        def restore_stock(product: Product) -> None:
+            product.stock = Quantity(stock)
+
+        return convert_product_to_dto(await self._modify_product(product_id, restore_stock))
+
+    async def publish_sharded_stock(self) -> int:
+        """
+        Записывает в шардированные продукты их текущий остаток из счетчиков. Продажи таких продуктов не пишут
+        продукт, поэтому без этого список продуктов, индексы и журнал изменений видели бы остаток на момент
+        включения шардирования. Продукты, остаток которых не менялся, не записываются.
+        Возвращает количество записанных продуктов.
+        """
+        product_ids = self.stock_counter.get_sharded_product_ids()
+        if not product_ids:
+            return 0
+        # _modify_products подставляет остаток из счетчиков, изменение остатка и есть вся запись
+        result = await self._modify_products(product_ids, lambda product: None)
+        return result.updated
+
+    async def run_sharded_stock_publisher(
+            self,
+            interval_seconds: float = SHARDED_STOCK_PUBLISH_INTERVAL_SECONDS,
+    ) -> None:
+        """
+        Фоновый цикл, запускаемый при старте приложения: раз в interval_seconds публикует остаток шардированных продуктов.
+        """
+        while True:
+            try:
+                await self.publish_sharded_stock()
+            except Exception:
+                logger.exception("Failed to publish sharded stock")
+            await asyncio.sleep(interval_seconds)
+
+    async def update_product(
+            self,
+            product_id: str,
+            product_update: ProductUpdateRequest,
+            expected_version: Optional[int] = None,
+    ) -> Product:
+        """
+        Обновляет поля продукта.
+        Если передан expected_version (заголовок If-Match), обновление выполняется только
+        для этой версии продукта, иначе изменения применяются к актуальной версии.
+        """
+        def apply_update(product: Product) -> None:
+            convert_update_request_to_product(product_update, product)
+
+        updated_product = await self._modify_product(product_id, apply_update, expected_version)
         return convert_product_to_dto(updated_product)
 
-    async def get_available_products(self, category_id: Optional[str] = None) -> List[Product]:
+    async def get_available_products(
+            self,
+            category_id: Optional[Union[str, uuid.UUID]] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            sort_by: Optional[str] = None,
+            descending: bool = False,
+            on_promotion: Optional[bool] = None,
+            price_bucket: Optional[str] = None,
+    ) -> List[Product]:
         """
         Получает список доступных продуктов, где stock > 0.
-        Если указан category_id, фильтрует по категории.
+        Если указан category_id, фильтрует по категории; min_price/max_price ограничивают цену со скидкой,
+        on_promotion и price_bucket — наличие скидки и ценовой диапазон.
+        Фильтры объединяются на битмап-индексах репозитория, сортировка — по упорядоченным индексам.
+        """
+        return await self.product_repository.find_available(
+            category_id=str(category_id) if category_id else None,
+            min_price=min_price,
+            max_price=max_price,
+            on_promotion=on_promotion,
+            price_bucket=price_bucket,
+            sort_by=sort_by,
+            descending=descending,
+        )
+
+    async def get_product_facets(
+            self,
+            category_id: Optional[Union[str, uuid.UUID]] = None,
+            on_promotion: Optional[bool] = None,
+            price_bucket: Optional[str] = None,
+    ) -> ProductFacetsResponse:
+        """
+        Считает доступные продукты по категориям, ценовым диапазонам и наличию скидки.
+        Каждый фасет учитывает все выбранные фильтры, кроме своего собственного.
         """
-        products = await self.product_repository.get_all()
-        available_products = [p for p in products if p.stock_value > 0]
-        if category_id:
-            available_products = [p for p in available_products if p.category_id == category_id]
-        return available_products
+        facets = await self.product_repository.get_facets(
+            category_id=str(category_id) if category_id else None,
+            on_promotion=on_promotion,
+            price_bucket=price_bucket,
+        )
+        promotion_counts = facets["on_promotion"]
+        return ProductFacetsResponse(
+            total=facets["total"],
+            categories=facets["category_id"],
+            price_buckets=facets["price_bucket"],
+            on_promotion=promotion_counts.get(True, 0),
+            regular=promotion_counts.get(False, 0),
+        )
+
+    async def search_products(self, query: str, limit: int = 20) -> List[Product]:
+        """
+        Ищет доступные продукты по названию через инвертированный индекс репозитория.
+        """
+        return await self.product_repository.search(query, limit)
 
     async def delete_product(self, product_id: str) -> None:
         """
         Удаляет продукт из системы.
         """
         await self.product_repository.delete(product_id)
+        self.stock_counter.disable(product_id)
+        self.event_broker.publish(self.change_log.append(product_id, "delete"))
 
     async def get_product_by_id(self, product_id: str) -> Product:
         """
-        Получает продукт по его идентификатору.
+        Получает продукт по его идентификатору вместе с зарезервированным количеством.
         """
         product = await self.product_repository.get_by_id(product_id)
         if not product:
             raise ProductNotFoundException(product_id=product_id)
-        return convert_product_to_dto(product)
+        self._load_sharded_stock(product)
+        reserved_quantities = await self.reservation_service.get_reserved_quantities([product_id])
+        return convert_product_to_dto(product, reserved_quantities[product_id])
+
+    async def get_products_by_ids(self, product_ids: List[str]) -> ProductBatchResponse:
+        """
+        Получает несколько продуктов за один запрос к репозиторию.
+        Ненайденные идентификаторы возвращаются списком вместо ProductNotFoundException.
+        """
+        products = await self.product_repository.get_many(product_ids)
+        for product in products:
+            self._load_sharded_stock(product)
+        found_ids = {str(product.oid) for product in products}
+        reserved_quantities = await self.reservation_service.get_reserved_quantities(list(found_ids))
+        return ProductBatchResponse(
+            items=convert_products_to_responses(products, reserved_quantities),
+            missing_ids=[product_id for product_id in dict.fromkeys(product_ids) if product_id not in found_ids],
+        )
+
+    async def get_changes_since(self, since: int, limit: Optional[int] = None) -> ProductChangesResponse:
+        """
+        Получает изменения каталога после версии since.
+        Если эти изменения уже вытеснены из журнала, возвращает сигнал полной ресинхронизации.
+        """
+        try:
+            changes = self.change_log.get_changes_since(since, limit)
+        except ChangeLogCompactedException:
+            return ProductChangesResponse(version=self.change_log.get_latest_sequence(), resync_required=True)
+        return ProductChangesResponse(
+            version=changes[-1].sequence if changes else since,
+            changes=[convert_change_to_response(change) for change in changes],
+        )
+
+    def subscribe_to_changes(self) -> ProductEventSubscriptionInterface:
+        """
+        Подписывает клиента на поток изменений остатков и цен продуктов.
+        """
+        return self.event_broker.subscribe()
+
+    def unsubscribe_from_changes(self, subscription: ProductEventSubscriptionInterface) -> None:
+        """
+        Отписывает клиента от потока изменений.
+        """
+        self.event_broker.unsubscribe(subscription)
+
+    async def _modify_product(
+            self,
+            product_id: str,
+            mutate: Callable[[Product], None],
+            expected_version: Optional[int] = None,
+    ) -> Product:
+        """
+        Читает продукт, применяет к нему mutate и сохраняет через compare-and-swap по версии.
+        При конфликте с параллельной записью операция повторяется на свежей версии продукта
+        (не более MAX_UPDATE_ATTEMPTS раз); если вызывающий ожидает конкретную версию, конфликт не повторяется.
+        Если mutate ничего не изменил (нет измененных полей), запись и событие изменения пропускаются.
+        Остаток шардированного продукта перед mutate берется из счетчиков, а его изменение переносится в счетчики.
+        """
+        for attempt in range(1, MAX_UPDATE_ATTEMPTS + 1):
+            product = await self.product_repository.get_by_id(product_id)
+            if expected_version is not None and product.version != expected_version:
+                raise ProductVersionConflictException(
+                    product_id=product_id,
+                    expected_version=expected_version,
+                    actual_version=product.version,
+                )
+            sharded_stock = self._load_sharded_stock(product)
+            mutate(product)
+            stock_delta = self._save_sharded_stock(product, sharded_stock)
+            if not product.dirty_fields:
+                return product
+            try:
+                await self.product_repository.update(product)
+            except ProductVersionConflictException:
+                self._revert_sharded_stock(product_id, stock_delta)
+                if expected_version is not None or attempt == MAX_UPDATE_ATTEMPTS:
+                    raise
+                continue
+            self._record_change(product)
+            return product
+
+    async def _select_products(self, selection: ProductBulkSelection) -> List[str]:
+        """
+        Возвращает идентификаторы продуктов, подходящих под фильтры массовой операции.
+        """
+        category_ids = None
+        if selection.category_id:
+            category_id = str(selection.category_id)
+            category_ids = (
+                await self.category_service.get_subtree_ids(category_id)
+                if selection.include_subcategories else [category_id]
+            )
+        products = await self.product_repository.find_available(
+            min_price=selection.min_price,
+            max_price=selection.max_price,
+            on_promotion=selection.on_promotion,
+            price_bucket=selection.price_bucket,
+            category_ids=category_ids,
+            include_out_of_stock=True,
+        )
+        return [product.oid for product in products]
+
+    async def _modify_products(
+            self,
+            product_ids: List[str],
+            mutate: Callable[[Product], Optional[bool]],
+    ) -> ProductBulkUpdateResponse:
+        """
+        Применяет mutate к продуктам пакетами по BULK_UPDATE_CHUNK_SIZE: каждый пакет читается и сохраняется
+        одной операцией репозитория. Продукты, измененные параллельно, перечитываются и повторяются
+        (не более MAX_UPDATE_ATTEMPTS раз).
+        Продукты, в которых mutate ничего не изменил (или вернул False), пропускаются без записи; ApplicationException
+        или ValueError из mutate, как и отсутствие продукта, помечают неуспешным только этот продукт.
+        """
+        updated = 0
+        skipped = 0
+        errors: Dict[str, str] = {}
+        for start in range(0, len(product_ids), BULK_UPDATE_CHUNK_SIZE):
+            pending_ids = product_ids[start:start + BULK_UPDATE_CHUNK_SIZE]
+            for _ in range(MAX_UPDATE_ATTEMPTS):
+                products = await self.product_repository.get_many(pending_ids)
+                if len(products) < len(pending_ids):
+                    found_ids = {product.oid for product in products}
+                    for product_id in pending_ids:
+                        if product_id not in found_ids:
+                            errors[product_id] = ProductNotFoundException(product_id=product_id).message
+
+                changed = []
+                stock_deltas: Dict[str, int] = {}
+                for product in products:
+                    try:
+                        sharded_stock = self._load_sharded_stock(product)
+                        if mutate(product) is False:
+                            skipped += 1
+                            continue
+                        stock_deltas[product.oid] = self._save_sharded_stock(product, sharded_stock)
+                        if not product.dirty_fields:
+                            skipped += 1
+                            continue
+                    except ApplicationException as e:
+                        errors[product.oid] = e.message
+                        continue
+                    except ValueError as e:
+                        errors[product.oid] = str(e)
+                        continue
+                    changed.append(product)
+
+                written = await self.product_repository.update_many(changed)
+                for product in written:
+                    self._record_change(product)
+                updated += len(written)
+                written_ids = {product.oid for product in written}
+                pending_ids = [product.oid for product in changed if product.oid not in written_ids]
+                for product_id in pending_ids:
+                    self._revert_sharded_stock(product_id, stock_deltas[product_id])
+                if not pending_ids:
+                    break
+            for product_id in pending_ids:
+                errors[product_id] = f"Product {product_id} kept changing concurrently, retry the request."
+            # уступаем event loop, чтобы массовая операция не блокировала остальные запросы
+            await asyncio.sleep(0)
+        return ProductBulkUpdateResponse(
+            matched=len(product_ids),
+            updated=updated,
+            skipped=skipped,
+            failed_ids=list(errors),
+            errors=errors,
+        )
+
+    async def _process_stock_request(self, product_id: str, operation: str, quantity: int) -> None:
+        """
+        Списывает остаток и создает резерв (operation="reserve") или продажу (operation="sell").
+        Запросы к обычному продукту, пришедшие в течение STOCK_BATCH_WINDOW, списываются одной записью продукта
+        (см. _flush_stock_requests); шардированные продукты и так не конфликтуют и обрабатываются сразу.
+        Если продажу или резерв не удалось сохранить, списанный остаток возвращается.
+        """
+        if quantity <= 0:
+            raise InvalidStockQuantityException(quantity=quantity)
+        if STOCK_BATCH_WINDOW > 0 and self.stock_counter.get_total(product_id) is None:
+            future = asyncio.get_running_loop().create_future()
+            pending = self._pending_stock_requests.get(product_id)
+            if pending is None:
+                pending = self._pending_stock_requests[product_id] = []
+                task = asyncio.create_task(self._flush_stock_requests(product_id))
+                self._stock_flush_tasks.add(task)
+                task.add_done_callback(self._stock_flush_tasks.discard)
+            pending.append((operation, quantity, future))
+            await future
+            return
+
+        record = self._build_stock_record(product_id, operation, quantity)
+        product = await self._withdraw_stock(product_id, quantity)
+        try:
+            if operation == "sell":
+                await self.sale_service.record_sale(record, product)
+            else:
+                await self.reservation_service.create_reservation(record)
+        except Exception:
+            await self._return_stock(product_id, quantity)
+            raise
+
+    async def _flush_stock_requests(self, product_id: str) -> None:
+        """
+        Групповое списание: через STOCK_BATCH_WINDOW забирает накопленные запросы продукта, списывает их
+        одной записью в порядке поступления (запрос, которому не хватило остатка, отклоняется, следующие
+        за ним меньшие запросы еще могут пройти) и сохраняет продажи одной пакетной записью.
+        Продажи и резервы собираются и проверяются до списания, поэтому некорректный запрос отклоняется
+        только сам; остаток запросов, которые не удалось сохранить, возвращается одной записью.
+        Каждый запрос получает свой результат или исключение через future.
+        """
+        await asyncio.sleep(STOCK_BATCH_WINDOW)
+        requests = []
+        for operation, quantity, future in self._pending_stock_requests.pop(product_id):
+            try:
+                requests.append((operation, quantity, future, self._build_stock_record(product_id, operation, quantity)))
+            except ValueError as e:
+                future.set_exception(e)
+        if not requests:
+            return
+        rejected: Dict[int, int] = {}
+
+        def take_in_order(product: Product) -> None:
+            rejected.clear()
+            stock = product.stock.value
+            for index, (_, quantity, _, _) in enumerate(requests):
+                if quantity > stock:
+                    rejected[index] = stock
+                else:
+                    stock -= quantity
+            product.stock = Quantity(stock)
+
+        try:
+            product = await self._modify_product(product_id, take_in_order)
+        except Exception as e:
+            for _, _, future, _ in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        sales, reservations = [], []
+        for index, (operation, quantity, future, record) in enumerate(requests):
+            if index in rejected:
+                if not future.done():
+                    future.set_exception(InsufficientStockException(
+                        product_id=product_id,
+                        requested_quantity=quantity,
+                        available_stock=rejected[index],
+                    ))
+            elif operation == "sell":
+                sales.append((quantity, future, record))
+            else:
+                reservations.append((quantity, future, record))
+
+        failed_quantity = 0
+        if sales:
+            try:
+                await self.sale_service.record_sales([record for _, _, record in sales], product)
+            except Exception as e:
+                # продажи пакета сохраняются одной записью, и ошибка записи относится ко всем
+                failed_quantity += sum(quantity for quantity, _, _ in sales)
+                for _, future, _ in sales:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for _, future, _ in sales:
+                    if not future.done():
+                        future.set_result(None)
+        for quantity, future, record in reservations:
+            try:
+                await self.reservation_service.create_reservation(record)
+            except Exception as e:
+                failed_quantity += quantity
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(None)
+        if failed_quantity:
+            try:
+                await self._return_stock(product_id, failed_quantity)
+            except Exception:
+                logger.exception("Failed to return %d units of stock to product %s", failed_quantity, product_id)
+
+    @staticmethod
+    def _build_stock_record(product_id: str, operation: str, quantity: int) -> Union[SaleCreateRequest, dict]:
+        """
+        Собирает продажу или данные резерва для запроса списания до того, как остаток будет списан.
+        """
+        if operation == "sell":
+            return SaleCreateRequest(product_id=product_id, quantity=quantity)
+        return {"product_id": product_id, "quantity": quantity}
+
+    async def _return_stock(self, product_id: str, quantity: int) -> None:
+        """
+        Возвращает quantity единиц в остаток продукта (отмена резерва или несохраненная продажа).
+        """
+        def return_stock(product: Product) -> None:
+            product.stock = Quantity(product.stock.value + quantity)
+
+        await self._modify_product(product_id, return_stock)
+
+    async def _withdraw_stock(self, product_id: str, quantity: int) -> Product:
+        """
+        Списывает quantity единиц товара при резервировании или продаже.
+        Остаток шардированного продукта списывается в счетчиках без записи продукта; продукт сохраняется,
+        только когда товар закончился, чтобы он сразу пропал из выдачи доступных. Промежуточный остаток
+        записывается фоново (publish_sharded_stock).
+        """
+        stock = self.stock_counter.get_total(product_id)
+        if stock is not None:
+            product = await self.product_repository.get_by_id(product_id)
+            # шардирование могло быть выключено, пока продукт читался
+            stock = self.stock_counter.get_total(product_id)
+        if stock is None:
+            return await self._modify_product(product_id, self._take_stock(quantity))
+        if not self.stock_counter.take(product_id, quantity):
+            raise InsufficientStockException(
+                product_id=product_id,
+                requested_quantity=quantity,
+                available_stock=stock,
+            )
+        if stock == quantity:
+            return await self._modify_product(product_id, lambda product: None)
+        return product
+
+    def _load_sharded_stock(self, product: Product) -> Optional[int]:
+        """
+        Подставляет в продукт актуальный остаток из шардированных счетчиков.
+        Возвращает этот остаток или None, если продукт не шардирован.
+        """
+        stock = self.stock_counter.get_total(product.oid)
+        if stock is not None:
+            product.stock = Quantity(stock)
+        return stock
+
+    def _save_sharded_stock(self, product: Product, sharded_stock: Optional[int]) -> int:
+        """
+        Переносит в шардированные счетчики изменение остатка, сделанное операцией над продуктом.
+        Возвращает перенесенную разницу, чтобы откатить ее, если запись продукта не удалась.
+        """
+        if sharded_stock is None:
+            return 0
+        delta = product.stock.value - sharded_stock
+        if delta > 0:
+            self.stock_counter.put(product.oid, delta)
+        elif delta < 0 and not self.stock_counter.take(product.oid, -delta):
+            # пока операция выполнялась, остаток раскупили
+            raise InsufficientStockException(
+                product_id=product.oid,
+                requested_quantity=-delta,
+                available_stock=self.stock_counter.get_total(product.oid),
+            )
+        return delta
+
+    def _revert_sharded_stock(self, product_id: str, delta: int) -> None:
+        """
+        Откатывает перенесенное в счетчики изменение остатка несохраненного продукта.
+        """
+        if not delta or self.stock_counter.get_total(product_id) is None:
+            return
+        if delta > 0:
+            self.stock_counter.take(product_id, delta)
+        else:
+            self.stock_counter.put(product_id, -delta)
+
+    @staticmethod
+    def _take_stock(quantity: int) -> Callable[[Product], None]:
+        """
+        Возвращает операцию списания quantity единиц товара с проверкой остатка.
+        """
+        def take(product: Product) -> None:
+            if product.stock.value < quantity:
+                raise InsufficientStockException(
+                    product_id=str(product.oid),
+                    requested_quantity=quantity,
+                    available_stock=product.stock.value,
+                )
+            product.stock = Quantity(product.stock.value - quantity)
+
+        return take
+
+    def _record_change(self, product: Product) -> None:
+        """
+        Записывает новое состояние продукта в журнал изменений каталога и рассылает его подписчикам.
+        """
+        self.event_broker.publish(self.change_log.append(str(product.oid), "upsert", product))
 
     def _process_product_input(self, product_data: Union[ProductCreateRequest, Product, ProductUpdateRequest, dict]) -> \
     Union[Product, ProductUpdateRequest]:
@@ -0,0 +1,138 @@
+# app/domain/services/promotion_service.py
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from domain.entities.promotion import Promotion
+from application.interfaces.promotion_repository_interface import PromotionRepositoryInterface
+from domain.exceptions.product_exceptions import ProductNotFoundException
+from domain.exceptions.promotion_exceptions import (
+    InvalidPromotionPeriodException,
+    PromotionAlreadyEndedException,
+    PromotionProductsNotUpdatedException,
+)
+from domain.services.product_service import ProductService
+from infrastructure.converters.promotion_converters import convert_create_request_to_promotion
+from presentation.schemas.product_schema import ProductBulkUpdateResponse
+from presentation.schemas.promotion_schema import PromotionCreateRequest
+
+logger = logging.getLogger(__name__)
+
+# upper bound for the scheduler sleep, so promotions created meanwhile start at most this late
+PROMOTION_SCHEDULER_MAX_SLEEP_SECONDS = 1.0
+
+
+class PromotionService:
+    def __init__(self, promotion_repository: PromotionRepositoryInterface, product_service: ProductService):
+        self.promotion_repository = promotion_repository
+        self.product_service = product_service
+
+    async def create_promotion(self, create_request: PromotionCreateRequest) -> Promotion:
+        """
+        Schedules a promotion. Listed products must exist; a promotion whose start is already
+        due is activated right away instead of waiting for the next scheduler tick.
+        """
+        promotion = convert_create_request_to_promotion(create_request)
+        if promotion.ends_at <= promotion.starts_at:
+            raise InvalidPromotionPeriodException(starts_at=promotion.starts_at, ends_at=promotion.ends_at)
+        if promotion.product_ids:
+            batch = await self.product_service.get_products_by_ids(promotion.product_ids)
+            if batch.missing_ids:
+                raise ProductNotFoundException(product_id=batch.missing_ids[0])
+
+        await self.promotion_repository.add(promotion)
+        if promotion.starts_at <= datetime.now():
+            await self.process_due_promotions()
+        return promotion
+
+    async def cancel_promotion(self, promotion_id: str) -> Promotion:
+        """
+        Cancels a scheduled or running promotion; a running one is removed from its products.
+        If some products could not be updated, the promotion stays active (and ends on schedule)
+        and the error is raised, so cancelling can be retried; removing is idempotent.
+        """
+        promotion = await self.promotion_repository.get_by_id(promotion_id)
+        if promotion.status not in ("scheduled", "active"):
+            raise PromotionAlreadyEndedException(promotion_id=promotion_id, status=promotion.status)
+        if promotion.status == "active":
+            result = await self.product_service.remove_scheduled_promotion(promotion, await self._get_active_promotions())
+            try:
+                await self._raise_for_failed_products(promotion, result)
+            finally:
+                await self.promotion_repository.update(promotion)
+        promotion.cancel()
+        await self.promotion_repository.update(promotion)
+        return promotion
+
+    async def get_promotion_by_id(self, promotion_id: str) -> Promotion:
+        return await self.promotion_repository.get_by_id(promotion_id)
+
+    async def get_all_promotions(self) -> List[Promotion]:
+        return await self.promotion_repository.get_all()
+
+    async def process_due_promotions(self, now: Optional[datetime] = None) -> int:
+        """
+        Activates promotions whose start has come and finishes those whose end has come,
+        taking them from the time-ordered queue. Product changes are written in batches.
+        A promotion whose whole period passed while nobody was processing it is finished
+        without being applied. A promotion that fails, or leaves existing products not updated
+        (e.g. after repeated version conflicts), keeps its status and is queued again, so the next
+        tick retries it; applying and removing are idempotent. When a promotion ends, its products
+        fall back to the latest started promotion still running on them.
+        Returns the number of processed promotions.
+        """
+        now = now or datetime.now()
+        promotions = await self.promotion_repository.pop_due(now)
+        for promotion in promotions:
+            try:
+                active_promotions = await self._get_active_promotions()
+                if promotion.status == "scheduled" and promotion.ends_at > now:
+                    result = await self.product_service.apply_scheduled_promotion(promotion, active_promotions)
+                    await self._raise_for_failed_products(promotion, result)
+                    promotion.activate()
+                else:
+                    if promotion.status == "active":
+                        result = await self.product_service.remove_scheduled_promotion(promotion, active_promotions)
+                        await self._raise_for_failed_products(promotion, result)
+                    promotion.finish()
+            except Exception:
+                logger.exception("Failed to process promotion %s", promotion.oid)
+            finally:
+                await self.promotion_repository.update(promotion)
+        return len(promotions)
+
+    async def _get_active_promotions(self) -> List[Promotion]:
+        return [promotion for promotion in await self.promotion_repository.get_all() if promotion.status == "active"]
+
+    async def _raise_for_failed_products(self, promotion: Promotion, result: ProductBulkUpdateResponse) -> None:
+        """
+        Products deleted meanwhile are dropped from the promotion; any other failure is raised
+        so the promotion keeps its status and is retried.
+        """
+        if not result.failed_ids:
+            return
+        batch = await self.product_service.get_products_by_ids(result.failed_ids)
+        if batch.missing_ids:
+            missing_ids = set(batch.missing_ids)
+            promotion.product_ids = [product_id for product_id in promotion.product_ids if product_id not in missing_ids]
+        failed_ids = [product_id for product_id in result.failed_ids if product_id not in batch.missing_ids]
+        if failed_ids:
+            raise PromotionProductsNotUpdatedException(promotion_id=promotion.oid, product_ids=failed_ids)
+
+    async def run_scheduler(self, max_sleep_seconds: float = PROMOTION_SCHEDULER_MAX_SLEEP_SECONDS) -> None:
+        """
+        Background loop started from the application lifespan: processes due promotions and
+        sleeps until the next transition in the queue (at most max_sleep_seconds).
+        """
+        while True:
+            try:
+                await self.process_due_promotions()
+            except Exception:
+                logger.exception("Failed to process due promotions")
+            next_transition_at = await self.promotion_repository.get_next_transition_at()
+            delay = max_sleep_seconds
+            if next_transition_at is not None:
+                delay = min(max((next_transition_at - datetime.now()).total_seconds(), 0.0), max_sleep_seconds)
+            await asyncio.sleep(delay)
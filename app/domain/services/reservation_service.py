@@ -1,16 +1,23 @@
 # app/domain/services/reservation_service.py
 
-from typing import List
+from typing import Dict, List
 from domain.entities.reservation import Reservation
 from application.interfaces.reservation_repository_interface import ReservationRepositoryInterface
-from domain.exceptions.reservation_exceptions import ReservationNotFoundException
+from domain.exceptions.reservation_exceptions import (
+    ReservationNotFoundException,
+    CannotCancelReservationException,
+    CannotCheckoutReservationException,
+)
+from domain.services.sale_service import SaleService
+from presentation.schemas.sale_schema import SaleResponse
 from infrastructure.converters.reservation_converters import convert_reservation_to_response, \
     convert_reservations_to_responses
 
 
 class ReservationService:
-    def __init__(self, reservation_repository: ReservationRepositoryInterface):
+    def __init__(self, reservation_repository: ReservationRepositoryInterface, sale_service: SaleService):
         self.reservation_repository = reservation_repository
+        self.sale_service = sale_service
 
     async def create_reservation(self, reservation: dict) -> Reservation:
         """
@@ -26,10 +33,37 @@ class ReservationService:
         saved_reservation = await self.reservation_repository.add(reservation_instance)
         return convert_reservation_to_response(saved_reservation)
 
-    async def cancel_reservation(self, reservation_id: str) -> None:
+    async def cancel_reservation(self, reservation_id: str) -> Reservation:
+        """
+        Cancels an active reservation and returns it as a DTO. The status is switched before
+        anything is awaited, so a reservation cannot be both cancelled and checked out.
+        """
         reservation = self.reservation_repository.get_by_id(reservation_id)
+        if not reservation.is_active():
+            raise CannotCancelReservationException(reservation_id=reservation_id, status=reservation.status)
         reservation.cancel()
         self.reservation_repository.update(reservation)
+        return convert_reservation_to_response(reservation)
+
+    async def checkout_reservation(self, reservation_id: str) -> SaleResponse:
+        """
+        Converts an active reservation into a sale. The stock was already taken by the reservation,
+        so the product stock is not checked or changed again. If the sale cannot be recorded,
+        the reservation becomes active again.
+        """
+        reservation = self.reservation_repository.get_by_id(reservation_id)
+        if not reservation.is_active():
+            raise CannotCheckoutReservationException(reservation_id=reservation_id, status=reservation.status)
+        reservation.complete()
+        self.reservation_repository.update(reservation)
+        try:
+            return await self.sale_service.record_sale(
+                {"product_id": reservation.product_id, "quantity": reservation.quantity}
+            )
+        except Exception:
+            reservation.reopen()
+            self.reservation_repository.update(reservation)
+            raise
 
     async def get_reservation_by_id(self, reservation_id: str) -> Reservation:
         reservation = self.reservation_repository.get_by_id(reservation_id)
@@ -40,3 +74,14 @@ class ReservationService:
     async def get_reservations_by_product(self, product_id: str) -> List[Reservation]:
         reservations = await self.reservation_repository.get_by_product_id(product_id)
         return convert_reservations_to_responses(reservations)
+
+    async def get_active_reservations_by_product(self, product_id: str) -> List[Reservation]:
+        reservations = self.reservation_repository.get_active_by_product_id(product_id)
+        return convert_reservations_to_responses(reservations)
+
+    async def get_reserved_quantities(self, product_ids: List[str]) -> Dict[str, int]:
+        """
+        Returns the quantity held by active reservations for every product, read from totals
+        maintained by the repository on every reservation write.
+        """
+        return self.reservation_repository.get_reserved_quantities(product_ids)
@@ -0,0 +1,83 @@
+# app/domain/services/retention_service.py
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from application.interfaces.reservation_repository_interface import ReservationRepositoryInterface
+from application.interfaces.sale_repository_interface import SaleRepositoryInterface
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    How long closed reservations and individual sales are kept in memory.
+    Sale compaction is opt-in: without sale_retention_period sales are never compacted, because
+    compacted sales leave the sales report unless the sale archive is enabled.
+    Work is done in batches of batch_size with the event loop released between them.
+    """
+    reservation_grace_period: timedelta = timedelta(hours=24)
+    sale_retention_period: Optional[timedelta] = None
+    batch_size: int = 1000
+    interval_seconds: float = 60.0
+
+
+class RetentionService:
+    def __init__(
+            self,
+            reservation_repository: ReservationRepositoryInterface,
+            sale_repository: SaleRepositoryInterface,
+            policy: RetentionPolicy,
+    ):
+        self.reservation_repository = reservation_repository
+        self.sale_repository = sale_repository
+        self.policy = policy
+
+    async def apply_retention(self, now: Optional[datetime] = None) -> Tuple[int, int]:
+        """
+        Purges reservations that were cancelled or completed before the grace period and folds
+        sales older than the retention period (if one is set) into daily per-product rollups; with the archive
+        enabled the repository keeps them on disk, so they remain visible in sales reports.
+        Returns the number of purged reservations and compacted sales.
+        """
+        now = now or datetime.now()
+        purged = 0
+        reservation_cutoff = now - self.policy.reservation_grace_period
+        while True:
+            batch = self.reservation_repository.purge_closed_before(reservation_cutoff, self.policy.batch_size)
+            purged += batch
+            # yield to the event loop between batches, retention must not stall requests
+            await asyncio.sleep(0)
+            if batch < self.policy.batch_size:
+                break
+
+        compacted = 0
+        if self.policy.sale_retention_period is None:
+            return purged, compacted
+        sale_cutoff = now - self.policy.sale_retention_period
+        # partitions entirely behind the cutoff are dropped whole, the rest is compacted in batches
+        compacted += await self.sale_repository.compact_partitions_before(sale_cutoff)
+        await asyncio.sleep(0)
+        while True:
+            sales = await self.sale_repository.get_sales_before(sale_cutoff, self.policy.batch_size)
+            if not sales:
+                break
+            await self.sale_repository.compact(sales)
+            compacted += len(sales)
+            await asyncio.sleep(0)
+        return purged, compacted
+
+    async def run_retention_worker(self) -> None:
+        """
+        Background loop started from the application lifespan, applies retention every policy.interval_seconds.
+        """
+        while True:
+            try:
+                await self.apply_retention()
+            except Exception:
+                logger.exception("Failed to apply retention")
+            await asyncio.sleep(self.policy.interval_seconds)
@@ -1,39 +1,292 @@
-from typing import List, Optional, Union
-from datetime import datetime
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+from datetime import date, datetime, timedelta
+import asyncio
+import logging
+import time
+from domain.entities.product import Product
 from domain.entities.sale import Sale
+from domain.values.sale_period import SALE_PERIOD_GRANULARITIES, get_period_start, get_period_end, to_local_time
+from domain.values.sale_totals import SaleTotals
 from application.interfaces.sale_repository_interface import SaleRepositoryInterface
-from domain.exceptions.sale_exceptions import SaleNotFoundException
-from presentation.schemas.sale_schema import SaleCreateRequest, SaleResponse
-from infrastructure.converters.sale_converters import convert_sale_to_response
+from application.interfaces.product_repository_interface import ProductRepositoryInterface
+from application.interfaces.best_seller_tracker_interface import BestSellerTrackerInterface
+from application.interfaces.sale_journal_interface import SaleJournalInterface
+from domain.exceptions.sale_exceptions import SaleNotFoundException, InvalidSalesReportPeriodException
+from domain.exceptions.product_exceptions import ProductNotFoundException
+from presentation.schemas.sale_schema import (
+    SaleCreateRequest,
+    SaleResponse,
+    BestSellerResponse,
+    SaleDailyRollupResponse,
+    SaleSummaryResponse,
+)
+from infrastructure.converters.sale_converters import (
+    convert_sale_to_response,
+    convert_sales_to_partial_responses,
+    convert_rollups_to_responses,
+    convert_totals_to_summary,
+    convert_totals_to_bucket,
+)
+
+logger = logging.getLogger(__name__)
+
+# how many journaled sales the background worker writes to the repository at once
+SALE_JOURNAL_BATCH_SIZE = 500
+# pause of the journal worker between drains; it doubles after every failed drain up to the maximum
+SALE_JOURNAL_DRAIN_INTERVAL_SECONDS = 0.05
+SALE_JOURNAL_MAX_RETRY_SECONDS = 5.0
+# totals of summary buckets that are over do not change and are cached for a day (bounded in size);
+# the bucket that is still open is recomputed on every request
+SALES_SUMMARY_CACHE_SECONDS = 24 * 60 * 60
+SALES_SUMMARY_CACHE_SIZE = 10000
+SALES_SUMMARY_MAX_BUCKETS = 1000
+BUCKET_END_OFFSET = timedelta(microseconds=1)
+# a period counts as closed only this long after it ended (and with no journaled sales pending),
+# so sales recorded right at its end reach the repository before the report is cached
+SALES_REPORT_CLOSE_GRACE = timedelta(minutes=5)
 
 
 class SaleService:
-    def __init__(self, sale_repository: SaleRepositoryInterface):
+    def __init__(
+            self,
+            sale_repository: SaleRepositoryInterface,
+            product_repository: ProductRepositoryInterface,
+            best_seller_tracker: BestSellerTrackerInterface,
+            sale_journal: SaleJournalInterface,
+    ):
         self.sale_repository = sale_repository
+        self.product_repository = product_repository
+        self.best_seller_tracker = best_seller_tracker
+        self.sale_journal = sale_journal
+        # (first moment, last moment, category_id) -> (totals, expiry) of closed summary buckets, least recent first
+        self._closed_bucket_totals: OrderedDict = OrderedDict()
+        # the latest last moment of a cached bucket, sales dated after it cannot invalidate anything
+        self._closed_bucket_totals_until: Optional[datetime] = None
 
-    async def record_sale(self, sale_data: Union[dict, SaleCreateRequest]) -> SaleResponse:
+    async def record_sale(
+            self,
+            sale_data: Union[dict, SaleCreateRequest],
+            product: Optional[Product] = None,
+    ) -> SaleResponse:
+        """
+        Records a sale. The product's category and price after discount are copied onto
+        the sale; callers that already hold the product pass it to skip the lookup.
+        With the sale journal enabled the sale is only appended to the journal and reaches
+        the repository (and reports) when the background worker drains it.
+        """
         if isinstance(sale_data, dict):
             sale_data = SaleCreateRequest(**sale_data)
         elif not isinstance(sale_data, SaleCreateRequest):
             raise ValueError("Invalid data provided for creating a sale")
 
-        sale_instance = Sale(
-            product_id=sale_data.product_id,
-            quantity=sale_data.quantity
-        )
-        saved_sale = await self.sale_repository.add(sale_instance)
+        if product is None:
+            try:
+                product = await self.product_repository.get_by_id(sale_data.product_id)
+            except ProductNotFoundException:
+                # sales of products unknown to the catalog are still recorded, just without category
+                product = None
+
+        sale = self._create_sale(sale_data, product)
+        if self.sale_journal.enabled:
+            await self.sale_journal.append([sale])
+            return convert_sale_to_response(sale)
+        saved_sale = await self.sale_repository.add(sale)
+        self.best_seller_tracker.record(saved_sale)
+        self._forget_closed_bucket_totals([saved_sale])
         return convert_sale_to_response(saved_sale)
 
+    async def record_sales(self, sales_data: List[SaleCreateRequest], product: Product) -> List[SaleResponse]:
+        """
+        Records several sales of one product with a single batch write to the repository.
+        """
+        sales = [self._create_sale(sale_data, product) for sale_data in sales_data]
+        if self.sale_journal.enabled:
+            await self.sale_journal.append(sales)
+            return [convert_sale_to_response(sale) for sale in sales]
+        saved_sales = await self.sale_repository.add_many(sales)
+        for sale in saved_sales:
+            self.best_seller_tracker.record(sale)
+        self._forget_closed_bucket_totals(saved_sales)
+        return [convert_sale_to_response(sale) for sale in saved_sales]
+
+    async def drain_sale_journal(self, batch_size: int = SALE_JOURNAL_BATCH_SIZE) -> int:
+        """
+        Moves journaled sales to the repository in batches of batch_size, acknowledging each batch
+        only after it is written. Returns the number of moved sales.
+        """
+        drained = 0
+        while True:
+            sales = self.sale_journal.peek(batch_size)
+            if not sales:
+                return drained
+            saved_sales = await self.sale_repository.add_many(sales)
+            self.sale_journal.acknowledge(len(sales))
+            for sale in saved_sales:
+                self.best_seller_tracker.record(sale)
+            self._forget_closed_bucket_totals(saved_sales)
+            drained += len(sales)
+
+    async def run_sale_journal_worker(
+            self,
+            interval_seconds: float = SALE_JOURNAL_DRAIN_INTERVAL_SECONDS,
+            max_retry_seconds: float = SALE_JOURNAL_MAX_RETRY_SECONDS,
+    ) -> None:
+        """
+        Background loop started from the application lifespan when the sale journal is enabled.
+        A failed drain keeps the sales in the journal and is retried with exponential backoff.
+        """
+        delay = interval_seconds
+        while True:
+            try:
+                await self.drain_sale_journal()
+                delay = interval_seconds
+            except Exception:
+                logger.exception("Failed to drain the sale journal, %d sales pending",
+                                 self.sale_journal.get_pending_count())
+                delay = min(delay * 2, max_retry_seconds)
+            await asyncio.sleep(delay)
+
     async def get_sales_report(
             self, start_date: Optional[datetime] = None,
             end_date: Optional[datetime] = None,
-            category_id: Optional[str] = None
-    ) -> List[SaleResponse]:
-        sales = await self.sale_repository.get_sales_between_dates(start_date, end_date)
-        if category_id:
-            sales = [sale for sale in sales if sale.category_id == category_id]
+            category_id: Optional[str] = None,
+            fields: Optional[List[str]] = None,
+    ) -> Union[List[SaleResponse], List[Dict[str, Any]]]:
+        """
+        Returns sales in the given period. If `fields` is given, every sale is converted
+        to a dict with only these fields instead of a full SaleResponse.
+        """
+        start_date, end_date = to_local_time(start_date), to_local_time(end_date)
+        sales = await self.sale_repository.get_sales_between_dates(start_date, end_date, category_id)
+        if fields:
+            return convert_sales_to_partial_responses(sales, fields)
         return [convert_sale_to_response(sale) for sale in sales]
 
+    async def get_sales_summary(
+            self,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
+            category_id: Optional[str] = None,
+            granularity: Optional[str] = None,
+    ) -> SaleSummaryResponse:
+        """
+        Returns total quantity, revenue and number of sales in the given period, and with
+        `granularity` ("day" or "month") also per calendar bucket. Buckets that are over are
+        served from a cache; only the bucket still open is recomputed on every request.
+        Totals of closed month partitions fully inside the period are cached by the repository.
+        """
+        start_date, end_date = to_local_time(start_date), to_local_time(end_date)
+        now = datetime.now()
+        if granularity is None:
+            totals = await self.sale_repository.get_sales_totals(start_date, end_date, category_id)
+            closed = self.is_period_closed(end_date, now)
+            return convert_totals_to_summary(totals, start_date, end_date, category_id, closed)
+
+        if granularity not in SALE_PERIOD_GRANULARITIES:
+            raise InvalidSalesReportPeriodException(reason=f"granularity must be one of {SALE_PERIOD_GRANULARITIES}")
+        if start_date is None:
+            raise InvalidSalesReportPeriodException(reason="start_date is required with granularity")
+        last_moment = end_date or now
+        if last_moment < start_date:
+            raise InvalidSalesReportPeriodException(reason="end_date is before start_date")
+
+        totals = SaleTotals()
+        buckets = []
+        bucket_start = get_period_start(start_date, granularity)
+        while bucket_start <= last_moment:
+            if len(buckets) == SALES_SUMMARY_MAX_BUCKETS:
+                raise InvalidSalesReportPeriodException(reason=f"more than {SALES_SUMMARY_MAX_BUCKETS} buckets")
+            bucket_end = get_period_end(bucket_start, granularity)
+            first, last = max(start_date, bucket_start), min(last_moment, bucket_end - BUCKET_END_OFFSET)
+            closed = self.is_period_closed(last, now)
+            bucket_totals = await self._get_bucket_totals(first, last, category_id, closed)
+            totals.merge(bucket_totals)
+            buckets.append(convert_totals_to_bucket(bucket_totals, first, last, closed))
+            bucket_start = bucket_end
+        closed = all(bucket.closed for bucket in buckets)
+        return convert_totals_to_summary(totals, start_date, end_date, category_id, closed, granularity, buckets)
+
+    def is_period_closed(self, end_date: Optional[datetime], now: Optional[datetime] = None) -> bool:
+        """
+        True if no more sales can arrive for a period ending at end_date: it ended more than
+        SALES_REPORT_CLOSE_GRACE ago and the sale journal has nothing left to drain.
+        """
+        end_date = to_local_time(end_date)
+        if end_date is None or end_date >= (now or datetime.now()) - SALES_REPORT_CLOSE_GRACE:
+            return False
+        return not (self.sale_journal.enabled and self.sale_journal.get_pending_count())
+
+    async def _get_bucket_totals(
+            self,
+            first: datetime,
+            last: datetime,
+            category_id: Optional[str],
+            closed: bool,
+    ) -> SaleTotals:
+        if not closed:
+            return await self.sale_repository.get_sales_totals(first, last, category_id)
+        key = (first, last, category_id)
+        cached = self._closed_bucket_totals.get(key)
+        if cached is not None and cached[1] > time.monotonic():
+            self._closed_bucket_totals.move_to_end(key)
+            return cached[0]
+        totals = await self.sale_repository.get_sales_totals(first, last, category_id)
+        self._closed_bucket_totals[key] = (totals, time.monotonic() + SALES_SUMMARY_CACHE_SECONDS)
+        self._closed_bucket_totals.move_to_end(key)
+        if len(self._closed_bucket_totals) > SALES_SUMMARY_CACHE_SIZE:
+            self._closed_bucket_totals.popitem(last=False)
+        if self._closed_bucket_totals_until is None or last > self._closed_bucket_totals_until:
+            self._closed_bucket_totals_until = last
+        return totals
+
+    def _forget_closed_bucket_totals(self, sales: List[Sale]) -> None:
+        """
+        Drops cached buckets a late sale (e.g. a journaled one drained after its bucket was closed)
+        falls into. New sales are dated after every cached bucket, so this is normally one comparison.
+        """
+        if self._closed_bucket_totals_until is None:
+            return
+        late_sales = [sale for sale in sales if sale.sale_date <= self._closed_bucket_totals_until]
+        if not late_sales:
+            return
+        for key in list(self._closed_bucket_totals):
+            first, last, category_id = key
+            if any(
+                first <= sale.sale_date <= last and category_id in (None, sale.category_id)
+                for sale in late_sales
+            ):
+                del self._closed_bucket_totals[key]
+
+    async def get_daily_sales(
+            self,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None,
+            product_id: Optional[str] = None,
+            category_id: Optional[str] = None,
+    ) -> List[SaleDailyRollupResponse]:
+        """
+        Returns daily per-product totals of sales that were compacted by the retention worker.
+        """
+        rollups = await self.sale_repository.get_daily_rollups(start_date, end_date, product_id, category_id)
+        return convert_rollups_to_responses(rollups)
+
+    async def get_best_sellers(
+            self,
+            window: str = "hour",
+            limit: int = 10,
+            category_id: Optional[str] = None,
+    ) -> List[BestSellerResponse]:
+        """
+        Returns the best selling products of the last hour or day, read from counters
+        maintained by record_sale instead of scanning the sales.
+        """
+        top = self.best_seller_tracker.get_top(window, limit, category_id)
+        return [
+            BestSellerResponse(product_id=product_id, quantity=quantity, exact=exact)
+            for product_id, quantity, exact in top
+        ]
+
     async def get_sales_by_product(self, product_id: str) -> List[SaleResponse]:
         sales = await self.sale_repository.get_by_product_id(product_id)
         return [convert_sale_to_response(sale) for sale in sales]
@@ -43,3 +296,12 @@ class SaleService:
         if sale is None:
             raise SaleNotFoundException(f"Sale with id {sale_id} not found.")
         return convert_sale_to_response(sale)
+
+    @staticmethod
+    def _create_sale(sale_data: SaleCreateRequest, product: Optional[Product]) -> Sale:
+        return Sale(
+            product_id=sale_data.product_id,
+            quantity=sale_data.quantity,
+            category_id=product.category_id if product is not None else None,
+            unit_price=product.get_price_after_discount() if product is not None else None,
+        )
@@ -0,0 +1,19 @@
+# domain/values/catalog_snapshot.py
+from dataclasses import dataclass
+from typing import Mapping
+
+from ..entities.product import Product
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Immutable view of the whole catalog at one version. Writers never change it: they publish
+    new product versions and the next snapshot picks them up, so a reader iterating a snapshot
+    needs no lock and always sees a consistent catalog.
+    """
+    version: int
+    products: Mapping[str, Product]
+
+    def __len__(self) -> int:
+        return len(self.products)
@@ -11,8 +11,9 @@ class Quantity(BaseValueObject[int]):
         self.validate()
 
     def validate(self):
-        if self.value <= 0:
-            raise ValueError(f"Quantity must be a positive integer. Not {self.value}")
+        # zero is a valid stock level: selling or reserving the last unit leaves the product out of stock
+        if self.value < 0:
+            raise ValueError(f"Quantity must be a non-negative integer. Not {self.value}")
 
     def as_generic_type(self):
         return str(self.value)
\ No newline at end of file
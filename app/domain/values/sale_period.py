@@ -0,0 +1,31 @@
+# domain/values/sale_period.py
+from datetime import datetime, timedelta
+from typing import Optional
+
+# calendar periods sales are partitioned and reported by
+SALE_PERIOD_GRANULARITIES = ("day", "month")
+
+
+def get_period_start(moment: datetime, granularity: str) -> datetime:
+    """Start of the calendar day or month containing the moment."""
+    if granularity == "day":
+        return datetime(moment.year, moment.month, moment.day)
+    if granularity == "month":
+        return datetime(moment.year, moment.month, 1)
+    raise ValueError(f"Unknown period granularity {granularity!r}, expected one of {SALE_PERIOD_GRANULARITIES}")
+
+
+def get_period_end(start: datetime, granularity: str) -> datetime:
+    """Start of the period following the one starting at start."""
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def to_local_time(moment: Optional[datetime]) -> Optional[datetime]:
+    """Sale dates are naive local datetimes, a moment with a UTC offset is converted to one."""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
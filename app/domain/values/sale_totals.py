@@ -0,0 +1,25 @@
+# domain/values/sale_totals.py
+from dataclasses import dataclass
+
+from ..entities.sale import Sale
+
+
+@dataclass
+class SaleTotals:
+    """
+    Quantity, revenue and number of sales of a set of sales, accumulated with add() and merge().
+    """
+    quantity: int = 0
+    revenue: float = 0.0  # sum of quantity * unit_price of the sales that had a price
+    sales_count: int = 0
+
+    def add(self, sale: Sale) -> None:
+        self.quantity += sale.quantity
+        self.sales_count += 1
+        if sale.unit_price is not None:
+            self.revenue = round(self.revenue + sale.quantity * sale.unit_price, 2)
+
+    def merge(self, other: "SaleTotals") -> None:
+        self.quantity += other.quantity
+        self.sales_count += other.sales_count
+        self.revenue = round(self.revenue + other.revenue, 2)
@@ -0,0 +1,137 @@
+# app/infrastructure/analytics/in_memory_best_seller_tracker.py
+
+import heapq
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from domain.entities.sale import Sale
+from application.interfaces.best_seller_tracker_interface import BestSellerTrackerInterface
+
+
+class SpaceSavingCounter:
+    """
+    Bounded heavy-hitter counter (space-saving algorithm).
+
+    Keeps at most `capacity` products. When a new product arrives and the counter is full,
+    the product with the smallest count is evicted and the newcomer inherits its count as an
+    error bound. Products that were never affected by an eviction have exact counts, which
+    in practice is the head of the distribution. The minimum is found through a lazy heap,
+    so an update costs O(log capacity).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.has_evicted = False
+        self._heap: List[Tuple[int, str]] = []
+
+    def add(self, key: str, amount: int) -> None:
+        if key in self.counts:
+            self.counts[key] += amount
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = amount
+            self.errors[key] = 0
+        else:
+            evicted_count, evicted_key = self._pop_min()
+            self.has_evicted = True
+            del self.counts[evicted_key]
+            del self.errors[evicted_key]
+            self.counts[key] = evicted_count + amount
+            self.errors[key] = evicted_count
+        heapq.heappush(self._heap, (self.counts[key], key))
+        if len(self._heap) > 4 * self.capacity:
+            # drop stale entries left behind by increments
+            self._heap = [(count, key) for key, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[int, str]:
+        while True:
+            count, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                return count, key
+
+
+class SlidingWindow:
+    """
+    Ring of `size` buckets, each covering `bucket_seconds`. A bucket is lazily reset when
+    it is reused for a newer time slot, so old sales fall out of the window without a sweep.
+    """
+
+    def __init__(self, size: int, bucket_seconds: int, capacity: int):
+        self.size = size
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.slots: List[Optional[int]] = [None] * size
+        self.overall: List[Optional[SpaceSavingCounter]] = [None] * size
+        self.by_category: List[Dict[str, SpaceSavingCounter]] = [{} for _ in range(size)]
+
+    def record(self, sale: Sale) -> None:
+        slot = int(sale.sale_date.timestamp()) // self.bucket_seconds
+        index = slot % self.size
+        if self.slots[index] != slot:
+            if self.slots[index] is not None and self.slots[index] > slot:
+                return  # older than the whole window
+            self.slots[index] = slot
+            self.overall[index] = SpaceSavingCounter(self.capacity)
+            self.by_category[index] = {}
+
+        self.overall[index].add(sale.product_id, sale.quantity)
+        if sale.category_id is not None:
+            counter = self.by_category[index].get(sale.category_id)
+            if counter is None:
+                counter = self.by_category[index][sale.category_id] = SpaceSavingCounter(self.capacity)
+            counter.add(sale.product_id, sale.quantity)
+
+    def top(self, limit: int, category_id: Optional[str], now: datetime) -> List[Tuple[str, int, bool]]:
+        current_slot = int(now.timestamp()) // self.bucket_seconds
+        totals = defaultdict(int)
+        errors = defaultdict(int)
+        # a product missing from a bucket that evicted something may have been counted there before
+        evicting_buckets = 0
+        seen_in_evicting_buckets = defaultdict(int)
+        for index, slot in enumerate(self.slots):
+            if slot is None or not current_slot - self.size < slot <= current_slot:
+                continue
+            counter = self.overall[index] if category_id is None else self.by_category[index].get(category_id)
+            if counter is None:
+                continue
+            evicting_buckets += counter.has_evicted
+            for key, count in counter.counts.items():
+                totals[key] += count
+                errors[key] += counter.errors[key]
+                seen_in_evicting_buckets[key] += counter.has_evicted
+
+        head = heapq.nlargest(limit, totals.items(), key=lambda item: item[1])
+        return [
+            (key, count, errors[key] == 0 and seen_in_evicting_buckets[key] == evicting_buckets)
+            for key, count in head
+        ]
+
+
+class InMemoryBestSellerTracker(BestSellerTrackerInterface):
+    """
+    Best sellers over the last hour (60 one-minute buckets) and the last day
+    (24 one-hour buckets), overall and per category, in bounded memory.
+    """
+
+    def __init__(self, capacity_per_bucket: int = 1_000):
+        self.windows = {
+            "hour": SlidingWindow(size=60, bucket_seconds=60, capacity=capacity_per_bucket),
+            "day": SlidingWindow(size=24, bucket_seconds=3600, capacity=capacity_per_bucket),
+        }
+
+    def record(self, sale: Sale) -> None:
+        for window in self.windows.values():
+            window.record(sale)
+
+    def get_top(
+            self,
+            window: str,
+            limit: int,
+            category_id: Optional[str] = None,
+            now: Optional[datetime] = None,
+    ) -> List[Tuple[str, int, bool]]:
+        if window not in self.windows:
+            raise ValueError(f"Unknown window '{window}'. Expected one of: {', '.join(self.windows)}")
+        return self.windows[window].top(limit, category_id, now or datetime.now())
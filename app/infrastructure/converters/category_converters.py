@@ -1,5 +1,5 @@
 # infrastructure/converters/category_converters.py
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from domain.entities.category import Category
 from presentation.schemas.category_schema import (
     CategoryResponse,
@@ -9,13 +9,21 @@ from presentation.schemas.category_schema import (
 from uuid import UUID
 
 
-def convert_categories_to_responses(categories: List[Category]) -> List[CategoryResponse]:
+def convert_categories_to_responses(
+        categories: List[Category],
+        counts: Optional[Dict[str, Tuple[int, int]]] = None,
+) -> List[CategoryResponse]:
+    """
+    counts: optional category id -> (available products, available products in the subtree).
+    """
     return [
         CategoryResponse(
             id=category.oid,
             name=category.name,
             parent_category_id=UUID(category.parent_category_id) if category.parent_category_id else None,
-            created_at=category.created_at
+            created_at=category.created_at,
+            available_products=counts[category.oid][0] if counts else None,
+            subtree_available_products=counts[category.oid][1] if counts else None,
         )
         for category in categories
     ]
@@ -1,18 +1,21 @@
 # app/infrastructure/converters/product_converters.py
-from typing import List
+from typing import Any, Dict, List, Optional
 from domain.entities.product import Product
+from domain.entities.product_change import ProductChange
 from domain.values.discount import Discount
 from domain.values.price import Price
 from domain.values.quantity import Quantity
-from presentation.schemas.product_schema import ProductResponse, ProductCreateRequest
+from presentation.schemas.product_schema import (
+    ProductResponse,
+    ProductCreateRequest,
+    ProductUpdateRequest,
+    ProductChangeResponse,
+)
 
 
-def convert_product_to_dto(product: Product) -> ProductResponse:
+def convert_product_to_dto(product: Product, reserved_quantity: Optional[int] = None) -> ProductResponse:
     """Converts a Product domain entity to a ProductResponse DTO."""
-    discount_value = (
-        getattr(product.discount, 'value', product.discount)
-        if product.discount is not None else 0.0
-    )
+    discount_value = product.get_effective_discount()
 
     return ProductResponse(
         id=str(product.oid),
@@ -26,7 +29,10 @@ def convert_product_to_dto(product: Product) -> ProductResponse:
         price_after_discount=(
             product.get_price_after_discount() if discount_value > 0 else getattr(product, 'price_value',
                                                                                   getattr(product, 'price', None))
-        )
+        ),
+        version=product.version,
+        promotion_id=product.promotion_id,
+        reserved_quantity=reserved_quantity,
     )
 
 def convert_dto_to_product(product_data: ProductCreateRequest) -> Product:
@@ -51,6 +57,68 @@ def convert_dto_to_product(product_data: ProductCreateRequest) -> Product:
         discount=Discount(value=discount_value)  # Передаем числовое значение
     )
 
-def convert_products_to_responses(products: List[Product]) -> List[ProductResponse]:
+def convert_update_request_to_product(update_request: ProductUpdateRequest, existing_product: Product) -> Product:
+    """
+    Applies the fields that are set in the update request to an existing product,
+    wrapping raw values into the corresponding value objects.
+    """
+    value_objects = {'price': Price, 'stock': Quantity, 'discount': Discount}
+
+    for attribute, value in update_request.dict(exclude_unset=True).items():
+        if value is None:
+            continue
+        if attribute in value_objects:
+            value = value_objects[attribute](value)
+        elif attribute == 'category_id':
+            value = str(value)
+        setattr(existing_product, attribute, value)
+
+    return existing_product
+
+def convert_products_to_responses(
+        products: List[Product],
+        reserved_quantities: Optional[Dict[str, int]] = None,
+) -> List[ProductResponse]:
     """Преобразует список сущностей Product в список Pydantic-схем ProductResponse."""
-    return [convert_product_to_dto(product) for product in products]
+    if reserved_quantities is None:
+        return [convert_product_to_dto(product) for product in products]
+    return [convert_product_to_dto(product, reserved_quantities.get(product.oid)) for product in products]
+
+
+# Getters for every field of ProductResponse, used for sparse fieldsets
+PRODUCT_FIELD_GETTERS = {
+    'id': lambda product: str(product.oid),
+    'name': lambda product: product.name,
+    'category_id': lambda product: product.category_id,
+    'price': lambda product: product.price_value,
+    'stock': lambda product: product.stock_value,
+    'discount': lambda product: product.discount_value,
+    'description': lambda product: getattr(product, 'description', ""),
+    'created_at': lambda product: product.created_at,
+    'price_after_discount': lambda product: product.get_price_after_discount(),
+    'version': lambda product: product.version,
+    'promotion_id': lambda product: product.promotion_id,
+}
+
+
+def convert_products_to_partial_responses(products: List[Product], fields: List[str]) -> List[Dict[str, Any]]:
+    """
+    Преобразует список продуктов в словари только с запрошенными полями.
+    Остальные поля (в том числе вычисляемая цена со скидкой) не вычисляются.
+    """
+    unknown_fields = [field for field in fields if field not in PRODUCT_FIELD_GETTERS]
+    if unknown_fields:
+        raise ValueError(f"Unknown product fields: {', '.join(unknown_fields)}")
+
+    getters = [(field, PRODUCT_FIELD_GETTERS[field]) for field in fields]
+    return [{field: get(product) for field, get in getters} for product in products]
+
+def convert_change_to_response(change: ProductChange) -> ProductChangeResponse:
+    """Преобразует запись журнала изменений в Pydantic-схему ProductChangeResponse."""
+    return ProductChangeResponse(
+        version=change.sequence,
+        product_id=change.product_id,
+        operation=change.operation,
+        product=convert_product_to_dto(change.product) if change.product is not None else None,
+        changed_at=change.changed_at,
+    )
@@ -0,0 +1,40 @@
+# infrastructure/converters/promotion_converters.py
+
+from datetime import datetime
+from typing import List
+from domain.entities.promotion import Promotion
+from presentation.schemas.promotion_schema import PromotionCreateRequest, PromotionResponse
+
+
+def to_local_naive(value: datetime) -> datetime:
+    """Entities keep naive local times (datetime.now()), so aware request times are converted."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+def convert_create_request_to_promotion(create_request: PromotionCreateRequest) -> Promotion:
+    return Promotion(
+        discount_percentage=create_request.discount_percentage,
+        starts_at=to_local_naive(create_request.starts_at),
+        ends_at=to_local_naive(create_request.ends_at),
+        product_ids=list(dict.fromkeys(create_request.product_ids)),
+        category_id=str(create_request.category_id) if create_request.category_id else None,
+    )
+
+
+def convert_promotion_to_response(promotion: Promotion) -> PromotionResponse:
+    return PromotionResponse(
+        id=promotion.oid,
+        discount_percentage=promotion.discount_percentage,
+        starts_at=promotion.starts_at,
+        ends_at=promotion.ends_at,
+        product_ids=promotion.product_ids,
+        category_id=promotion.category_id,
+        status=promotion.status,
+        created_at=promotion.created_at,
+    )
+
+
+def convert_promotions_to_responses(promotions: List[Promotion]) -> List[PromotionResponse]:
+    return [convert_promotion_to_response(promotion) for promotion in promotions]
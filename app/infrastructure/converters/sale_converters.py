@@ -1,8 +1,16 @@
 # infrastructure/converters/sale_converters.py
 
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from domain.entities.sale import Sale
-from presentation.schemas.sale_schema import SaleResponse
+from domain.entities.sale_rollup import SaleRollup
+from domain.values.sale_totals import SaleTotals
+from presentation.schemas.sale_schema import (
+    SaleResponse,
+    SaleDailyRollupResponse,
+    SaleSummaryResponse,
+    SaleSummaryBucketResponse,
+)
 
 
 def convert_sales_to_responses(sales: List[Sale]) -> List[SaleResponse]:
@@ -11,7 +19,9 @@ def convert_sales_to_responses(sales: List[Sale]) -> List[SaleResponse]:
             id=sale.oid,
             product_id=sale.product_id,
             quantity=sale.quantity,
-            sale_date=sale.sale_date
+            sale_date=sale.sale_date,
+            category_id=sale.category_id,
+            unit_price=sale.unit_price
         )
         for sale in sales
     ]
@@ -22,5 +32,104 @@ def convert_sale_to_response(sale: Sale) -> SaleResponse:
         id=sale.oid,
         product_id=sale.product_id,
         quantity=sale.quantity,
-        sale_date=sale.sale_date
+        sale_date=sale.sale_date,
+        category_id=sale.category_id,
+        unit_price=sale.unit_price
+    )
+
+
+def convert_rollups_to_responses(rollups: List[SaleRollup]) -> List[SaleDailyRollupResponse]:
+    return [
+        SaleDailyRollupResponse(
+            day=rollup.day,
+            product_id=rollup.product_id,
+            category_id=rollup.category_id,
+            quantity=rollup.quantity,
+            revenue=rollup.revenue,
+            sales_count=rollup.sales_count,
+        )
+        for rollup in rollups
+    ]
+
+
+def convert_totals_to_summary(
+        totals: SaleTotals,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        category_id: Optional[str],
+        closed: bool,
+        granularity: Optional[str] = None,
+        buckets: Optional[List[SaleSummaryBucketResponse]] = None,
+) -> SaleSummaryResponse:
+    return SaleSummaryResponse(
+        start_date=start_date,
+        end_date=end_date,
+        category_id=category_id,
+        granularity=granularity,
+        quantity=totals.quantity,
+        revenue=totals.revenue,
+        sales_count=totals.sales_count,
+        closed=closed,
+        buckets=buckets or [],
+    )
+
+
+def convert_totals_to_bucket(
+        totals: SaleTotals,
+        start_date: datetime,
+        end_date: datetime,
+        closed: bool,
+) -> SaleSummaryBucketResponse:
+    return SaleSummaryBucketResponse(
+        start_date=start_date,
+        end_date=end_date,
+        quantity=totals.quantity,
+        revenue=totals.revenue,
+        sales_count=totals.sales_count,
+        closed=closed,
+    )
+
+
+# Getters for every field of SaleResponse, used for sparse fieldsets
+SALE_FIELD_GETTERS = {
+    'id': lambda sale: sale.oid,
+    'product_id': lambda sale: sale.product_id,
+    'quantity': lambda sale: sale.quantity,
+    'sale_date': lambda sale: sale.sale_date,
+    'category_id': lambda sale: sale.category_id,
+    'unit_price': lambda sale: sale.unit_price,
+}
+
+
+def convert_sales_to_partial_responses(sales: List[Sale], fields: List[str]) -> List[Dict[str, Any]]:
+    unknown_fields = [field for field in fields if field not in SALE_FIELD_GETTERS]
+    if unknown_fields:
+        raise ValueError(f"Unknown sale fields: {', '.join(unknown_fields)}")
+
+    getters = [(field, SALE_FIELD_GETTERS[field]) for field in fields]
+    return [{field: get(sale) for field, get in getters} for sale in sales]
+
+
+def convert_sale_to_record(sale: Sale) -> Dict[str, Any]:
+    """Plain JSON-serializable dict of a sale, used by the sale journal."""
+    return {
+        'id': sale.oid,
+        'product_id': str(sale.product_id),
+        'quantity': sale.quantity,
+        'sale_date': sale.sale_date.isoformat(),
+        'category_id': sale.category_id,
+        'unit_price': sale.unit_price,
+        'created_at': sale.created_at.isoformat(),
+    }
+
+
+def convert_record_to_sale(record: Dict[str, Any]) -> Sale:
+    return Sale(
+        oid=record['id'],
+        product_id=record['product_id'],
+        quantity=record['quantity'],
+        sale_date=datetime.fromisoformat(record['sale_date']),
+        category_id=record['category_id'],
+        unit_price=record['unit_price'],
+        created_at=datetime.fromisoformat(record['created_at']),
     )
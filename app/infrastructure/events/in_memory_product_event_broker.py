@@ -0,0 +1,66 @@
+# app/infrastructure/events/in_memory_product_event_broker.py
+
+import asyncio
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from domain.entities.product_change import ProductChange
+from application.interfaces.product_event_broker_interface import (
+    ProductEventBrokerInterface,
+    ProductEventSubscriptionInterface,
+)
+
+
+class InMemoryProductEventSubscription(ProductEventSubscriptionInterface):
+    """
+    Per-subscriber bounded queue. Pending changes are coalesced by product, so a slow
+    consumer only gets the latest state of each product. If the number of distinct
+    pending products exceeds `max_pending`, the queue is dropped and the consumer is
+    told to resync instead of buffering without bound.
+    """
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self.pending = OrderedDict()
+        self.resync_required = False
+        self._ready = asyncio.Event()
+
+    def push(self, change: ProductChange) -> None:
+        if change.product_id in self.pending:
+            self.pending[change.product_id] = change
+        elif len(self.pending) >= self.max_pending:
+            self.pending.clear()
+            self.resync_required = True
+        else:
+            self.pending[change.product_id] = change
+        self._ready.set()
+
+    async def get_batch(self, timeout: Optional[float] = None) -> Tuple[List[ProductChange], bool]:
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return [], False
+
+        batch = list(self.pending.values())
+        resync_required = self.resync_required
+        self.pending.clear()
+        self.resync_required = False
+        self._ready.clear()
+        return batch, resync_required
+
+
+class InMemoryProductEventBroker(ProductEventBrokerInterface):
+    def __init__(self, max_pending_per_subscriber: int = 1_000):
+        self.max_pending_per_subscriber = max_pending_per_subscriber
+        self.subscriptions = set()
+
+    def subscribe(self) -> InMemoryProductEventSubscription:
+        subscription = InMemoryProductEventSubscription(self.max_pending_per_subscriber)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: InMemoryProductEventSubscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    def publish(self, change: ProductChange) -> None:
+        for subscription in self.subscriptions:
+            subscription.push(change)
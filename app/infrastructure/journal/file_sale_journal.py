@@ -0,0 +1,133 @@
+# app/infrastructure/journal/file_sale_journal.py
+
+import asyncio
+import json
+import os
+from collections import deque
+from typing import BinaryIO, Deque, List, Optional, Tuple
+from domain.entities.sale import Sale
+from application.interfaces.sale_journal_interface import SaleJournalInterface
+from infrastructure.converters.sale_converters import convert_sale_to_record, convert_record_to_sale
+
+# the journal file is truncated once everything is drained and it has grown past this size
+JOURNAL_COMPACTION_BYTES = 1024 * 1024
+
+
+class FileSaleJournal(SaleJournalInterface):
+    """
+    Append-only file of sales (one JSON record per line) waiting to be written to the sale repository.
+
+    append() returns only after its records are fsynced, but concurrent appends share one fsync:
+    while a sync runs in a worker thread, new records are written to the file and the next sync
+    covers all of them. The byte offset of the drained part is kept in `<path>.offset`, so after a
+    restart the records behind it are loaded again. A crash between draining and saving the offset
+    replays a few sales; the repository stores sales by id, so replaying them is harmless. Without
+    a path the journal is disabled and sales are written to the repository directly.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.offset_path = f"{path}.offset" if path else None
+        self._file: Optional[BinaryIO] = None
+        # not yet drained sales with the file offset right after each of them
+        self._pending: Deque[Tuple[Sale, int]] = deque()
+        self._drained_offset = 0
+        self._written_offset = 0
+        self._synced_offset = 0
+        self._sync_task: Optional[asyncio.Task] = None
+        # appends waiting for their fsync; the file is not truncated under them, their offsets would go stale
+        self._waiting_appends = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    async def append(self, sales: List[Sale]) -> None:
+        file = self._open()
+        for sale in sales:
+            line = (json.dumps(convert_sale_to_record(sale)) + "\n").encode()
+            file.write(line)
+            self._written_offset += len(line)
+            self._pending.append((sale, self._written_offset))
+        file.flush()
+        target_offset = self._written_offset
+        self._waiting_appends += 1
+        try:
+            while self._synced_offset < target_offset:
+                if self._sync_task is None:
+                    self._sync_task = asyncio.create_task(self._sync())
+                await asyncio.shield(self._sync_task)
+        finally:
+            self._waiting_appends -= 1
+
+    def peek(self, limit: int) -> List[Sale]:
+        self._open()
+        return [sale for sale, _ in list(self._pending)[:limit]]
+
+    def acknowledge(self, count: int) -> None:
+        if not count:
+            return
+        for _ in range(count):
+            _, self._drained_offset = self._pending.popleft()
+        if (
+                not self._pending
+                and self._sync_task is None
+                and not self._waiting_appends
+                and self._drained_offset >= JOURNAL_COMPACTION_BYTES
+        ):
+            self._file.truncate(0)
+            self._file.seek(0)
+            self._drained_offset = self._written_offset = self._synced_offset = 0
+        self._save_drained_offset()
+
+    def get_pending_count(self) -> int:
+        self._open()
+        return len(self._pending)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def _sync(self) -> None:
+        offset = self._written_offset
+        try:
+            await asyncio.to_thread(os.fsync, self._file.fileno())
+            self._synced_offset = max(self._synced_offset, offset)
+        finally:
+            self._sync_task = None
+
+    def _open(self) -> BinaryIO:
+        """
+        Opens the journal on first use and loads the records written after the drained offset.
+        A torn last line left by a crash in the middle of a write is cut off.
+        """
+        if self._file is not None:
+            return self._file
+        if not self.enabled:
+            raise RuntimeError("The sale journal is disabled, no path is configured.")
+        if os.path.exists(self.offset_path):
+            with open(self.offset_path) as offset_file:
+                self._drained_offset = int(offset_file.read() or 0)
+        self._file = open(self.path, "a+b")
+        self._file.seek(0, os.SEEK_END)
+        size = self._file.tell()
+        self._drained_offset = min(self._drained_offset, size)
+        self._file.seek(self._drained_offset)
+        offset = self._drained_offset
+        for line in self._file:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            self._pending.append((convert_record_to_sale(json.loads(line)), offset))
+        if offset < size:
+            self._file.truncate(offset)
+        self._file.seek(offset)
+        self._written_offset = self._synced_offset = offset
+        return self._file
+
+    def _save_drained_offset(self) -> None:
+        temporary_path = f"{self.offset_path}.tmp"
+        with open(temporary_path, "w") as offset_file:
+            offset_file.write(str(self._drained_offset))
+        os.replace(temporary_path, self.offset_path)
@@ -0,0 +1,47 @@
+# app/infrastructure/repositories/in_memory/in_memory_product_change_log.py
+
+import copy
+from collections import deque
+from itertools import islice
+from typing import List, Optional
+from domain.entities.product import Product
+from domain.entities.product_change import ProductChange
+from application.interfaces.product_change_log_interface import ProductChangeLogInterface
+from domain.exceptions.product_exceptions import ChangeLogCompactedException
+
+
+class InMemoryProductChangeLog(ProductChangeLogInterface):
+    """
+    Bounded in-memory change feed. Only the last `max_entries` changes are kept,
+    consumers that fall behind the retained window have to resync from the full listing.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.changes = deque(maxlen=max_entries)
+        self.latest_sequence = 0
+
+    def append(self, product_id: str, operation: str, product: Optional[Product] = None) -> ProductChange:
+        self.latest_sequence += 1
+        change = ProductChange(
+            sequence=self.latest_sequence,
+            product_id=product_id,
+            operation=operation,
+            # snapshot, so that later in-place edits do not leak into already published changes
+            product=copy.copy(product) if product is not None else None,
+        )
+        self.changes.append(change)
+        return change
+
+    def get_changes_since(self, since: int, limit: Optional[int] = None) -> List[ProductChange]:
+        oldest_available = self.changes[0].sequence if self.changes else self.latest_sequence + 1
+        # since > latest means the consumer saw a previous incarnation of the log (e.g. before restart)
+        if since < oldest_available - 1 or since > self.latest_sequence:
+            raise ChangeLogCompactedException(since=since, oldest_available=oldest_available)
+
+        # sequences are contiguous, so the first wanted change sits at a known offset
+        start = since - oldest_available + 1
+        end = len(self.changes) if limit is None else min(len(self.changes), start + limit)
+        return list(islice(self.changes, start, end))
+
+    def get_latest_sequence(self) -> int:
+        return self.latest_sequence
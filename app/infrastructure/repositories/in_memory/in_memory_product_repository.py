@@ -1,50 +1,271 @@
 # app/infrastructure/repositories/in_memory/in_memory_product_repository.py
+import bisect
+import copy
+import heapq
 import uuid
-from typing import List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional
 from domain.entities.product import Product
 from application.interfaces.product_repository_interface import ProductRepositoryInterface
-from domain.exceptions.product_exceptions import ProductNotFoundException
+from domain.exceptions.product_exceptions import ProductNotFoundException, ProductVersionConflictException
 from domain.values.price import Price
 from domain.values.quantity import Quantity
+from domain.values.catalog_snapshot import CatalogSnapshot
 from infrastructure.converters.product_converters import convert_dto_to_product, convert_product_to_dto, \
     convert_products_to_responses
+from infrastructure.repositories.in_memory.indexes import BitmapIndex, InvertedIndex, SortedIndex
+
+# Keys of the ordered indexes, listings can be filtered by price range and sorted by any of them
+SORT_KEYS = {
+    'price': lambda product: product.price_value,
+    'price_after_discount': lambda product: product.get_price_after_discount(),
+    'name': lambda product: product.name.lower(),
+    'created_at': lambda product: product.created_at,
+}
+
+# Upper bounds of the price buckets (price after discount) used for listing filters and facets
+PRICE_BUCKET_BOUNDS = (10, 50, 100, 500, 1000)
+PRICE_BUCKETS = tuple(
+    f"{low}-{high}" for low, high in zip((0,) + PRICE_BUCKET_BOUNDS, PRICE_BUCKET_BOUNDS)
+) + (f"{PRICE_BUCKET_BOUNDS[-1]}+",)
+
+# Sorting k matches beats walking the whole ordered index while k is below n / SORT_SCAN_RATIO
+SORT_SCAN_RATIO = 8
+
+
+def get_price_bucket(price: float) -> str:
+    """Returns the label of the half-open price bucket [low, high) the price belongs to."""
+    return PRICE_BUCKETS[bisect.bisect_right(PRICE_BUCKET_BOUNDS, price)]
+
+
+def get_bitmap_values(product: Product) -> Dict[str, Any]:
+    return {
+        'category_id': product.category_id,
+        'in_stock': product.stock_value > 0,
+        'on_promotion': product.get_effective_discount() > 0,
+        'price_bucket': get_price_bucket(product.get_price_after_discount()),
+    }
 
 
 class InMemoryProductRepository(ProductRepositoryInterface):
     """
     In-memory implementation of the ProductRepositoryInterface for testing purposes.
+
+    Writers get private copies from `get_by_id`/`get_many` and publish them through `update`,
+    which only succeeds if nobody else updated the product in between (optimistic concurrency).
+
+    Stored products are copy-on-write: every write stores a new frozen version instead of changing
+    the stored one, so listings hand out stored versions without copying and a reader never sees
+    a half-applied write. Full-catalog reads go through a `CatalogSnapshot`, built lazily once per
+    catalog version and shared by all readers until the next write.
     """
 
     def __init__(self):
         self.products = {}
+        self.name_index = InvertedIndex()
+        self.sorted_indexes = {sort_key: SortedIndex() for sort_key in SORT_KEYS}
+        self.bitmap_index = BitmapIndex()
+        # category id -> number of products in stock, maintained on every write
+        self.available_counts: Dict[str, int] = {}
+        # incremented on every add, update and delete
+        self.catalog_version = 0
+        self._snapshot = CatalogSnapshot(version=0, products=MappingProxyType({}))
 
     async def add(self, product: Product) -> Product:
-        self.products[product.oid] = product
+        product.mark_clean()
+        self.products[product.oid] = self._publish(product)
+        self.name_index.add(product.oid, product.name)
+        for sort_key, index in self.sorted_indexes.items():
+            index.add(product.oid, SORT_KEYS[sort_key](product))
+        self.bitmap_index.add(product.oid, get_bitmap_values(product))
+        self._count_available(product, 1)
         return product
 
     async def get_by_id(self, product_id: str) -> Optional[Product]:
         product = self.products.get(product_id)
         if not product:
             raise ProductNotFoundException(product_id=product_id)
-        return product
+        return copy.copy(product)
+
+    async def get_many(self, product_ids: List[str]) -> List[Product]:
+        products = (self.products.get(product_id) for product_id in dict.fromkeys(product_ids))
+        return [copy.copy(product) for product in products if product is not None]
+
+    async def update(self, product: Product, expected_version: Optional[int] = None) -> Product:
+        return self._write(product, expected_version)
 
+    async def update_many(self, products: List[Product]) -> List[Product]:
+        written = []
+        for product in products:
+            try:
+                written.append(self._write(product))
+            except (ProductNotFoundException, ProductVersionConflictException):
+                continue
+        return written
 
-    async def update(self, product: Product) -> Product:
+    def _write(self, product: Product, expected_version: Optional[int] = None) -> Product:
         product_id = str(product.oid) if isinstance(product.oid, uuid.UUID) else product.oid
 
         if product_id not in self.products:
             raise ProductNotFoundException(product_id)
 
-        self.products[product_id] = product
+        stored = self.products[product_id]
+        stored_version = stored.version
+        if expected_version is None:
+            expected_version = product.version
+        if stored_version != expected_version:
+            raise ProductVersionConflictException(
+                product_id=product_id,
+                expected_version=expected_version,
+                actual_version=stored_version,
+            )
+
+        product.version = stored_version + 1
+        product.mark_clean()
+        self.products[product_id] = self._publish(product)
+        if product.name != stored.name:
+            self.name_index.remove(product_id)
+            self.name_index.add(product_id, product.name)
+        for sort_key, index in self.sorted_indexes.items():
+            index.update(product_id, SORT_KEYS[sort_key](product))
+        self.bitmap_index.update(product_id, get_bitmap_values(product))
+        self._count_available(stored, -1)
+        self._count_available(product, 1)
         return product
 
     async def delete(self, product_id: str) -> None:
         if product_id not in self.products:
             raise ProductNotFoundException(product_id)
+        self._count_available(self.products[product_id], -1)
         del self.products[product_id]
+        self.catalog_version += 1
+        self.name_index.remove(product_id)
+        for index in self.sorted_indexes.values():
+            index.remove(product_id)
+        self.bitmap_index.remove(product_id)
 
     async def get_all(self) -> List[Product]:
-        return list(self.products.values())
+        return list(self.get_snapshot().products.values())
+
+    def get_snapshot(self) -> CatalogSnapshot:
+        if self._snapshot.version != self.catalog_version:
+            # dict() copies the mapping in one step, stored versions themselves are shared
+            self._snapshot = CatalogSnapshot(
+                version=self.catalog_version,
+                products=MappingProxyType(dict(self.products)),
+            )
+        return self._snapshot
+
+    def _publish(self, product: Product) -> Product:
+        """
+        Returns the frozen version of the product to store, the caller keeps its own modifiable object.
+        """
+        self.catalog_version += 1
+        published = copy.copy(product)
+        published.freeze()
+        return published
+
+    async def find_available(
+            self,
+            category_id: Optional[str] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            on_promotion: Optional[bool] = None,
+            price_bucket: Optional[str] = None,
+            sort_by: Optional[str] = None,
+            descending: bool = False,
+            category_ids: Optional[List[str]] = None,
+            include_out_of_stock: bool = False,
+    ) -> List[Product]:
+        if sort_by is not None and sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort field '{sort_by}'. Expected one of: {', '.join(SORT_KEYS)}")
+
+        predicates = self._get_predicates(category_id, on_promotion, price_bucket)
+        if include_out_of_stock:
+            del predicates['in_stock']
+        matches = self.bitmap_index.match(predicates)
+        if category_ids is not None:
+            matches &= self.bitmap_index.any_of('category_id', category_ids)
+        product_ids = self.bitmap_index.to_document_ids(matches)
+
+        if min_price is not None or max_price is not None:
+            matching_ids = set(product_ids)
+            product_ids = [
+                product_id for product_id in self.sorted_indexes['price_after_discount'].range(
+                    min_price, max_price, descending=descending and sort_by in (None, 'price_after_discount')
+                )
+                if product_id in matching_ids
+            ]
+            if sort_by not in (None, 'price_after_discount'):
+                # the price range came ordered by price, re-sort only the k matches
+                sort_keys = self.sorted_indexes[sort_by].keys
+                product_ids.sort(key=lambda product_id: (sort_keys[product_id], product_id), reverse=descending)
+        elif sort_by is not None:
+            sorted_index = self.sorted_indexes[sort_by]
+            if len(product_ids) * SORT_SCAN_RATIO < len(self.products):
+                product_ids.sort(key=lambda product_id: (sorted_index.keys[product_id], product_id), reverse=descending)
+            else:
+                matching_ids = set(product_ids)
+                product_ids = [
+                    product_id for product_id in sorted_index.range(descending=descending)
+                    if product_id in matching_ids
+                ]
+
+        return [self.products[product_id] for product_id in product_ids]
+
+    async def get_facets(
+            self,
+            category_id: Optional[str] = None,
+            on_promotion: Optional[bool] = None,
+            price_bucket: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        predicates = self._get_predicates(category_id, on_promotion, price_bucket)
+        facets = {'total': self.bitmap_index.match(predicates).bit_count()}
+        for attribute in ('category_id', 'on_promotion', 'price_bucket'):
+            # a facet counts values under all the other filters, so selecting one value keeps its siblings visible
+            other_predicates = {key: value for key, value in predicates.items() if key != attribute}
+            facets[attribute] = self.bitmap_index.counts(attribute, self.bitmap_index.match(other_predicates))
+        return facets
+
+    @staticmethod
+    def _get_predicates(
+            category_id: Optional[str],
+            on_promotion: Optional[bool],
+            price_bucket: Optional[str],
+    ) -> Dict[str, Any]:
+        if price_bucket is not None and price_bucket not in PRICE_BUCKETS:
+            raise ValueError(f"Unknown price bucket '{price_bucket}'. Expected one of: {', '.join(PRICE_BUCKETS)}")
+        predicates = {'in_stock': True}
+        if category_id is not None:
+            predicates['category_id'] = category_id
+        if on_promotion is not None:
+            predicates['on_promotion'] = on_promotion
+        if price_bucket is not None:
+            predicates['price_bucket'] = price_bucket
+        return predicates
+
+    async def get_available_counts(self) -> Dict[str, int]:
+        return dict(self.available_counts)
+
+    def _count_available(self, product: Product, delta: int) -> None:
+        if product.stock_value <= 0:
+            return
+        count = self.available_counts.get(product.category_id, 0) + delta
+        if count:
+            self.available_counts[product.category_id] = count
+        else:
+            del self.available_counts[product.category_id]
+
+    async def search(self, query: str, limit: int) -> List[Product]:
+        scores = self.name_index.search(query)
+        matches = (
+            self.products[product_id] for product_id in scores
+            if self.products[product_id].stock_value > 0
+        )
+        # higher score first, then shorter (closer) names
+        return heapq.nsmallest(
+            limit, matches, key=lambda product: (-scores[product.oid], len(product.name), product.name)
+        )
 
     async def get_by_category(self, category_id: str) -> List[Product]:
-        return [product for product in self.products.values() if product.category_id == category_id]
+        return [product for product in self.get_snapshot().products.values() if product.category_id == category_id]
@@ -0,0 +1,63 @@
+# app/infrastructure/repositories/in_memory/in_memory_promotion_repository.py
+
+import heapq
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from domain.entities.promotion import Promotion
+from application.interfaces.promotion_repository_interface import PromotionRepositoryInterface
+from domain.exceptions.promotion_exceptions import PromotionNotFoundException
+
+
+class InMemoryPromotionRepository(PromotionRepositoryInterface):
+    """
+    Promotions plus a min-heap of (transition time, promotion id) consumed by the scheduler.
+
+    Heap entries are never removed from the middle: when a promotion moves on or is cancelled
+    its old entry no longer matches `next_transition_at` and is dropped when it reaches the top.
+    """
+
+    def __init__(self):
+        self.promotions: Dict[str, Promotion] = {}
+        self.schedule: List[Tuple[datetime, str]] = []
+
+    async def add(self, promotion: Promotion) -> Promotion:
+        self.promotions[promotion.oid] = promotion
+        self._schedule(promotion)
+        return promotion
+
+    async def get_by_id(self, promotion_id: str) -> Promotion:
+        promotion = self.promotions.get(promotion_id)
+        if not promotion:
+            raise PromotionNotFoundException(promotion_id=promotion_id)
+        return promotion
+
+    async def update(self, promotion: Promotion) -> None:
+        if promotion.oid not in self.promotions:
+            raise PromotionNotFoundException(promotion_id=promotion.oid)
+        self.promotions[promotion.oid] = promotion
+        self._schedule(promotion)
+
+    async def get_all(self) -> List[Promotion]:
+        return list(self.promotions.values())
+
+    async def pop_due(self, now: datetime) -> List[Promotion]:
+        due = {}
+        while self.schedule and self.schedule[0][0] <= now:
+            transition_at, promotion_id = heapq.heappop(self.schedule)
+            if self._is_current(transition_at, promotion_id):
+                due[promotion_id] = self.promotions[promotion_id]
+        return list(due.values())
+
+    async def get_next_transition_at(self) -> Optional[datetime]:
+        # drop stale entries so the scheduler does not wake up for them
+        while self.schedule and not self._is_current(*self.schedule[0]):
+            heapq.heappop(self.schedule)
+        return self.schedule[0][0] if self.schedule else None
+
+    def _schedule(self, promotion: Promotion) -> None:
+        if promotion.next_transition_at is not None:
+            heapq.heappush(self.schedule, (promotion.next_transition_at, promotion.oid))
+
+    def _is_current(self, transition_at: datetime, promotion_id: str) -> bool:
+        promotion = self.promotions.get(promotion_id)
+        return promotion is not None and promotion.next_transition_at == transition_at
@@ -1,6 +1,7 @@
 # app/infrastructure/repositories/in_memory/in_memory_reservation_repository.py
 
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 from domain.entities.reservation import Reservation
 from application.interfaces.reservation_repository_interface import ReservationRepositoryInterface
 from domain.exceptions.reservation_exceptions import ReservationNotFoundException
@@ -9,9 +10,19 @@ from domain.exceptions.reservation_exceptions import ReservationNotFoundExceptio
 class InMemoryReservationRepository(ReservationRepositoryInterface):
     def __init__(self):
         self.reservations = {}
+        # product_id -> {reservation_id: reservation} of active reservations, and the reserved total per product;
+        # both are maintained on every write, so reads of a product's reservations do not scan all of them
+        self.active_by_product: Dict[str, Dict[str, Reservation]] = {}
+        self.reserved_totals: Dict[str, int] = {}
+        # quantity each active reservation contributes to its product's total
+        self.indexed_quantities: Dict[str, int] = {}
+        # ids of cancelled and completed reservations in closing order (a dict is an ordered set with O(1) removal),
+        # purging takes the expired ones from its head
+        self.closed_ids: Dict[str, None] = {}
 
     async def add(self, reservation: Reservation) -> Reservation:
         self.reservations[reservation.oid] = reservation
+        self._reindex(reservation)
         return reservation
 
     def get_by_id(self, reservation_id: str) -> Optional[Reservation]:
@@ -24,11 +35,13 @@ class InMemoryReservationRepository(ReservationRepositoryInterface):
         if reservation.oid not in self.reservations:
             raise ReservationNotFoundException(reservation_id=reservation.oid)
         self.reservations[reservation.oid] = reservation
+        self._reindex(reservation)
 
     def delete(self, reservation_id: str) -> None:
         if reservation_id not in self.reservations:
             raise ReservationNotFoundException(reservation_id=reservation_id)
-        del self.reservations[reservation_id]
+        self._unindex(self.reservations.pop(reservation_id))
+        self.closed_ids.pop(reservation_id, None)
 
     def get_all(self) -> List[Reservation]:
         return list(self.reservations.values())
@@ -41,6 +54,51 @@ class InMemoryReservationRepository(ReservationRepositoryInterface):
 
     def get_active_reservations(self) -> List[Reservation]:
         return [
-            reservation for reservation in self.reservations.values()
-            if reservation.status == "reserved"
+            reservation
+            for reservations in self.active_by_product.values()
+            for reservation in reservations.values()
         ]
+
+    def get_active_by_product_id(self, product_id: str) -> List[Reservation]:
+        return list(self.active_by_product.get(product_id, {}).values())
+
+    def get_reserved_quantities(self, product_ids: List[str]) -> Dict[str, int]:
+        return {product_id: self.reserved_totals.get(product_id, 0) for product_id in product_ids}
+
+    def purge_closed_before(self, cutoff: datetime, limit: int) -> int:
+        purged = 0
+        while self.closed_ids and purged < limit:
+            reservation_id = next(iter(self.closed_ids))
+            if self.reservations[reservation_id].closed_at > cutoff:
+                break
+            self.delete(reservation_id)
+            purged += 1
+        return purged
+
+    def _reindex(self, reservation: Reservation) -> None:
+        self._unindex(reservation)
+        if reservation.closed_at is None:
+            self.closed_ids.pop(reservation.oid, None)
+        elif reservation.oid not in self.closed_ids:
+            self.closed_ids[reservation.oid] = None
+        if reservation.is_active():
+            self.active_by_product.setdefault(reservation.product_id, {})[reservation.oid] = reservation
+            self.indexed_quantities[reservation.oid] = reservation.quantity
+            self.reserved_totals[reservation.product_id] = (
+                self.reserved_totals.get(reservation.product_id, 0) + reservation.quantity
+            )
+
+    def _unindex(self, reservation: Reservation) -> None:
+        quantity = self.indexed_quantities.pop(reservation.oid, None)
+        if quantity is None:
+            return
+        # the product id of a reservation does not change, so the old entry is under the current one
+        product_id = reservation.product_id
+        del self.active_by_product[product_id][reservation.oid]
+        if not self.active_by_product[product_id]:
+            del self.active_by_product[product_id]
+        total = self.reserved_totals[product_id] - quantity
+        if total:
+            self.reserved_totals[product_id] = total
+        else:
+            del self.reserved_totals[product_id]
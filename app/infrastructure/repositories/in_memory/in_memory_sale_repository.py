@@ -1,51 +1,245 @@
 # app/infrastructure/repositories/in_memory/in_memory_sale_repository.py
 
-from typing import List, Optional
-from datetime import datetime
+import bisect
+from typing import Dict, Iterable, List, Optional
+from datetime import date, datetime, timedelta
 from domain.entities.sale import Sale
+from domain.entities.sale_rollup import SaleRollup
 from application.interfaces.sale_repository_interface import SaleRepositoryInterface
+from application.interfaces.sale_archive_interface import SaleArchiveInterface
+from infrastructure.archive.columnar_sale_archive import ColumnarSaleArchive
 from domain.exceptions.sale_exceptions import SaleNotFoundException
+from domain.values.sale_totals import SaleTotals
+from domain.values.sale_period import get_period_start, get_period_end
+from infrastructure.repositories.in_memory.sale_partition import SalePartition
+
+# sales of a partition compacted as a whole are written to the archive in blocks of this size
+ARCHIVE_BLOCK_SIZE = 1000
+MICROSECOND = timedelta(microseconds=1)
 
 
 class InMemorySaleRepository(SaleRepositoryInterface):
-    def __init__(self):
-        self.sales = {}
+    """
+    Hot tier of sales in memory with an optional archive tier on disk: compacted sales are written
+    to the archive, and product and date range reads merge both tiers. get_by_id and get_all
+    only see sales that are still in memory.
+
+    Hot sales are partitioned by calendar month (or day) of sale_date. Date range reads only
+    visit the partitions overlapping the range and skip per-sale date checks for the ones it
+    fully covers; a partition that is entirely past the retention cutoff is folded into rollups
+    and dropped as a whole. Without the archive, totals include the rollups of compacted days.
+    """
+
+    def __init__(self, archive: SaleArchiveInterface = None, partition_interval: str = "month"):
+        self.partition_interval = partition_interval
+        self.partitions: Dict[datetime, SalePartition] = {}
+        # partition starts kept sorted for range reads
+        self.partition_starts: List[datetime] = []
+        # sale_id -> start of the partition holding the sale, for lookups by id
+        self.sale_partitions: Dict[str, datetime] = {}
+        # day -> {product_id: rollup} of compacted sales, days kept sorted for range reads
+        self.rollups: Dict[date, Dict[str, SaleRollup]] = {}
+        self.rollup_days: List[date] = []
+        # without a configured archive compacted sales survive only as rollups
+        self.archive = archive or ColumnarSaleArchive()
 
     async def add(self, sale: Sale) -> Sale:
-        self.sales[sale.oid] = sale
+        start = get_period_start(sale.sale_date, self.partition_interval)
+        previous_start = self.sale_partitions.get(sale.oid)
+        if previous_start is not None and previous_start != start:
+            # the sale date changed, the old version leaves its partition
+            self._remove_from_partitions([self.partitions[previous_start].sales[sale.oid]])
+        partition = self.partitions.get(start)
+        if partition is None:
+            partition = self.partitions[start] = SalePartition(start, get_period_end(start, self.partition_interval))
+            bisect.insort(self.partition_starts, start)
+        partition.add(sale)
+        self.sale_partitions[sale.oid] = start
         return sale
 
+    async def add_many(self, sales: List[Sale]) -> List[Sale]:
+        for sale in sales:
+            await self.add(sale)
+        return sales
+
     async def get_by_id(self, sale_id: str) -> Optional[Sale]:
-        sale = self.sales.get(sale_id)
-        if not sale:
+        start = self.sale_partitions.get(sale_id)
+        if start is None:
             raise SaleNotFoundException(sale_id=sale_id)
-        return sale
+        return self.partitions[start].sales[sale_id]
 
     async def delete(self, sale_id: str) -> None:
-        if sale_id not in self.sales:
-            raise SaleNotFoundException(sale_id=sale_id)
-        del self.sales[sale_id]
+        sale = await self.get_by_id(sale_id)
+        self._remove_from_partitions([sale])
 
     async def get_all(self) -> List[Sale]:
-        return list(self.sales.values())
+        return [sale for start in self.partition_starts for sale in self.partitions[start].sales.values()]
 
     async def get_by_product_id(self, product_id: str) -> List[Sale]:
-        return [
-            sale for sale in self.sales.values()
+        sales = [
+            sale for sale in await self.get_all()
             if sale.product_id == product_id
         ]
+        if not self.archive.enabled:
+            return sales
+        return self._merge(await self.archive.read(product_id=str(product_id)), sales)
 
     async def get_sales_between_dates(
             self, start_date: Optional[datetime],
             end_date: Optional[datetime],
             category_id: Optional[str] = None
     ) -> List[Sale]:
-        sales = self.sales.values()
-        if start_date:
-            sales = filter(lambda s: s.sale_date >= start_date, sales)
-        if end_date:
-            sales = filter(lambda s: s.sale_date <= end_date, sales)
-        if category_id:
-            sales = filter(lambda s: s.category_id == category_id, sales)
-        return list(sales)
+        sales = []
+        for partition in self._get_partitions(start_date, end_date):
+            partition_sales = partition.get_sales(category_id)
+            if start_date and start_date > partition.start:
+                partition_sales = filter(lambda s: s.sale_date >= start_date, partition_sales)
+            if end_date and end_date < partition.end:
+                partition_sales = filter(lambda s: s.sale_date <= end_date, partition_sales)
+            sales.extend(partition_sales)
+        if not self.archive.enabled:
+            return sales
+        return self._merge(await self.archive.read(start_date, end_date, category_id), sales)
+
+    async def get_sales_totals(
+            self,
+            start_date: Optional[datetime],
+            end_date: Optional[datetime],
+            category_id: Optional[str] = None,
+    ) -> SaleTotals:
+        now = datetime.now()
+        totals = SaleTotals()
+        for partition in self._get_partitions(start_date, end_date):
+            if (start_date and start_date > partition.start) or (end_date and end_date < partition.end):
+                # a partially covered partition is read through its date index, e.g. one day of a month
+                for sale_id in partition.sales_by_date.range(start_date, end_date):
+                    sale = partition.sales[sale_id]
+                    if not category_id or sale.category_id == category_id:
+                        totals.add(sale)
+            else:
+                totals.merge(partition.get_totals(category_id, now))
+        if self.archive.enabled:
+            for sale in await self.archive.read(start_date, end_date, category_id):
+                # a sale being compacted is briefly in both tiers
+                if sale.oid not in self.sale_partitions:
+                    totals.add(sale)
+            return totals
+        # compacted sales are kept only as daily rollups, which count for the days the range fully covers
+        first_day = None if start_date is None else (start_date - MICROSECOND).date() + timedelta(days=1)
+        last_day = None if end_date is None else (end_date + MICROSECOND).date() - timedelta(days=1)
+        if first_day is None or last_day is None or first_day <= last_day:
+            for rollup in await self.get_daily_rollups(first_day, last_day, category_id=category_id):
+                totals.merge(SaleTotals(rollup.quantity, rollup.revenue, rollup.sales_count))
+        return totals
+
+    async def get_sales_before(self, cutoff: datetime, limit: int) -> List[Sale]:
+        sales = []
+        for partition in self._get_partitions(None, cutoff):
+            if len(sales) >= limit:
+                break
+            sale_ids = partition.sales_by_date.range(max_key=cutoff, limit=limit - len(sales))
+            sales.extend(partition.sales[sale_id] for sale_id in sale_ids)
+        return sales
+
+    async def compact(self, sales: List[Sale]) -> None:
+        if self.archive.enabled:
+            await self.archive.write(self._get_stored(sales))
+        self._add_to_rollups(self._remove_from_partitions(sales))
+
+    async def compact_partitions_before(self, cutoff: datetime) -> int:
+        compacted = 0
+        while self.partition_starts:
+            start = self.partition_starts[0]
+            partition = self.partitions[start]
+            if partition.end > cutoff:
+                break
+            sales = list(partition.sales.values())
+            if self.archive.enabled:
+                for block_start in range(0, len(sales), ARCHIVE_BLOCK_SIZE):
+                    await self.archive.write(sales[block_start:block_start + ARCHIVE_BLOCK_SIZE])
+            if self.partitions.get(start) is not partition or len(partition) != len(sales):
+                # the partition changed while it was archived: remove the archived sales one by one,
+                # without archiving them again
+                self._add_to_rollups(self._remove_from_partitions(sales))
+            else:
+                self._add_to_rollups(sales)
+                del self.partitions[start]
+                del self.partition_starts[0]
+                for sale_id in partition.sales:
+                    del self.sale_partitions[sale_id]
+            compacted += len(sales)
+        return compacted
+
+    async def get_daily_rollups(
+            self,
+            start_date: Optional[date],
+            end_date: Optional[date],
+            product_id: Optional[str] = None,
+            category_id: Optional[str] = None,
+    ) -> List[SaleRollup]:
+        start = 0 if start_date is None else bisect.bisect_left(self.rollup_days, start_date)
+        end = len(self.rollup_days) if end_date is None else bisect.bisect_right(self.rollup_days, end_date)
+        rollups = []
+        for day in self.rollup_days[start:end]:
+            day_rollups = self.rollups[day]
+            if product_id is not None:
+                candidates = [day_rollups[product_id]] if product_id in day_rollups else []
+            else:
+                candidates = day_rollups.values()
+            rollups.extend(
+                rollup for rollup in candidates
+                if category_id is None or rollup.category_id == category_id
+            )
+        return rollups
+
+    def _add_to_rollups(self, sales: Iterable[Sale]) -> None:
+        for sale in sales:
+            day = sale.sale_date.date()
+            if day not in self.rollups:
+                self.rollups[day] = {}
+                bisect.insort(self.rollup_days, day)
+            product_id = str(sale.product_id)
+            rollup = self.rollups[day].get(product_id)
+            if rollup is None:
+                rollup = self.rollups[day][product_id] = SaleRollup(day=day, product_id=product_id)
+            rollup.add(sale)
+
+    def _get_partitions(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> List[SalePartition]:
+        """Partitions overlapping [start_date, end_date] in date order."""
+        first = 0
+        if start_date is not None:
+            first = max(bisect.bisect_right(self.partition_starts, start_date) - 1, 0)
+        last = len(self.partition_starts)
+        if end_date is not None:
+            last = bisect.bisect_right(self.partition_starts, end_date)
+        return [self.partitions[start] for start in self.partition_starts[first:last]]
+
+    def _get_stored(self, sales: List[Sale]) -> List[Sale]:
+        return [sale for sale in sales if sale.oid in self.sale_partitions]
+
+    def _remove_from_partitions(self, sales: List[Sale]) -> List[Sale]:
+        """Removes the stored ones of the sales and drops the partitions left empty."""
+        sales_by_partition: Dict[datetime, List[Sale]] = {}
+        for sale in sales:
+            start = get_period_start(sale.sale_date, self.partition_interval)
+            sales_by_partition.setdefault(start, []).append(sale)
+        removed = []
+        for start, partition_sales in sales_by_partition.items():
+            partition = self.partitions.get(start)
+            if partition is None:
+                continue
+            partition_removed = partition.remove_many(partition_sales)
+            for sale in partition_removed:
+                del self.sale_partitions[sale.oid]
+            removed.extend(partition_removed)
+            if not partition:
+                del self.partitions[start]
+                del self.partition_starts[bisect.bisect_left(self.partition_starts, start)]
+        return removed
 
+    @staticmethod
+    def _merge(archived_sales: List[Sale], hot_sales: Iterable[Sale]) -> List[Sale]:
+        """Archived sales first, a sale present in both tiers (replayed compaction) is returned once."""
+        merged = {sale.oid: sale for sale in archived_sales}
+        merged.update((sale.oid, sale) for sale in hot_sales)
+        return list(merged.values())
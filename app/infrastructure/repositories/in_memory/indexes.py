@@ -0,0 +1,270 @@
+# app/infrastructure/repositories/in_memory/indexes.py
+
+import bisect
+import re
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+_MISSING = object()
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    Token -> document ids index used for full-text search.
+
+    Distinct tokens are also kept in a sorted list, so a prefix query (typeahead) is a
+    binary search for the range of tokens starting with the prefix. Query tokens shorter
+    than MIN_PREFIX_LENGTH only match whole words, otherwise one or two typed letters
+    would expand to most of the catalog.
+    """
+
+    EXACT_MATCH_SCORE = 2
+    PREFIX_MATCH_SCORE = 1
+    MIN_PREFIX_LENGTH = 3
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = {}
+        self.sorted_tokens: List[str] = []
+        self.document_tokens: Dict[str, Tuple[str, ...]] = {}
+
+    def add(self, document_id: str, text: str) -> None:
+        tokens = tuple(dict.fromkeys(tokenize(text)))
+        self.document_tokens[document_id] = tokens
+        for token in tokens:
+            documents = self.postings.get(token)
+            if documents is None:
+                documents = self.postings[token] = set()
+                bisect.insort(self.sorted_tokens, token)
+            documents.add(document_id)
+
+    def remove(self, document_id: str) -> None:
+        for token in self.document_tokens.pop(document_id, ()):
+            documents = self.postings[token]
+            documents.discard(document_id)
+            if not documents:
+                del self.postings[token]
+                del self.sorted_tokens[bisect.bisect_left(self.sorted_tokens, token)]
+
+    def _tokens_with_prefix(self, prefix: str) -> Iterable[str]:
+        if len(prefix) < self.MIN_PREFIX_LENGTH:
+            if prefix in self.postings:
+                yield prefix
+            return
+        start = bisect.bisect_left(self.sorted_tokens, prefix)
+        for position in range(start, len(self.sorted_tokens)):
+            token = self.sorted_tokens[position]
+            if not token.startswith(prefix):
+                break
+            yield token
+
+    def search(self, query: str) -> Dict[str, int]:
+        """
+        Returns relevance scores of documents matching every query token.
+        A token matches a document word exactly or as its prefix; exact matches score higher.
+        """
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return {}
+
+        # start from the most selective query token and only verify the rest on its candidates
+        expansions = {query_token: list(self._tokens_with_prefix(query_token)) for query_token in query_tokens}
+        query_tokens.sort(key=lambda query_token: sum(len(self.postings[token]) for token in expansions[query_token]))
+
+        first_token = query_tokens[0]
+        scores: Dict[str, int] = {}
+        for token in expansions[first_token]:
+            score = self.EXACT_MATCH_SCORE if token == first_token else self.PREFIX_MATCH_SCORE
+            for document_id in self.postings[token]:
+                if scores.get(document_id, 0) < score:
+                    scores[document_id] = score
+
+        for query_token in query_tokens[1:]:
+            if not scores:
+                break
+            next_scores = {}
+            for document_id, score in scores.items():
+                token_score = self._match_score(query_token, self.document_tokens[document_id])
+                if token_score:
+                    next_scores[document_id] = score + token_score
+            scores = next_scores
+        return scores
+
+    def _match_score(self, query_token: str, document_tokens: Tuple[str, ...]) -> int:
+        best = 0
+        for token in document_tokens:
+            if token == query_token:
+                return self.EXACT_MATCH_SCORE
+            if len(query_token) >= self.MIN_PREFIX_LENGTH and token.startswith(query_token):
+                best = self.PREFIX_MATCH_SCORE
+        return best
+
+
+class SortedIndex:
+    """
+    Ordered (key, document id) pairs kept sorted with binary insertion.
+
+    Range queries are two binary searches plus a slice, i.e. O(log n + k), and an ordered
+    scan needs no sorting. Inserts and removals shift the underlying list, which is a fast
+    memmove for catalogs of this size.
+    """
+
+    def __init__(self):
+        self.entries: List[Tuple[Any, str]] = []
+        self.keys: Dict[str, Any] = {}
+
+    def add(self, document_id: str, key: Any) -> None:
+        bisect.insort(self.entries, (key, document_id))
+        self.keys[document_id] = key
+
+    def remove(self, document_id: str) -> None:
+        if document_id not in self.keys:
+            return
+        key = self.keys.pop(document_id)
+        del self.entries[bisect.bisect_left(self.entries, (key, document_id))]
+
+    def remove_many(self, document_ids: Iterable[str]) -> None:
+        """
+        Removes several documents, deleting runs of neighbouring entries with one slice each,
+        so dropping the oldest k entries costs a single shift of the list.
+        """
+        positions = sorted(
+            bisect.bisect_left(self.entries, (self.keys.pop(document_id), document_id))
+            for document_id in document_ids if document_id in self.keys
+        )
+        while positions:
+            end = positions.pop() + 1
+            start = end - 1
+            while positions and positions[-1] == start - 1:
+                start = positions.pop()
+            del self.entries[start:end]
+
+    def update(self, document_id: str, key: Any) -> None:
+        if self.keys.get(document_id, _MISSING) == key:
+            return
+        self.remove(document_id)
+        self.add(document_id, key)
+
+    def range(
+            self,
+            min_key: Any = None,
+            max_key: Any = None,
+            descending: bool = False,
+            limit: Optional[int] = None,
+    ) -> List[str]:
+        """Returns ids of documents with min_key <= key <= max_key in key order (the first `limit` of them)."""
+        start = 0 if min_key is None else bisect.bisect_left(self.entries, min_key, key=itemgetter(0))
+        end = len(self.entries) if max_key is None else bisect.bisect_right(self.entries, max_key, key=itemgetter(0))
+        if limit is not None:
+            if descending:
+                start = max(start, end - limit)
+            else:
+                end = min(end, start + limit)
+        document_ids = [document_id for _, document_id in self.entries[start:end]]
+        if descending:
+            document_ids.reverse()
+        return document_ids
+
+
+class BitmapIndex:
+    """
+    Attribute value -> bitmap index over dense document ordinals.
+
+    Every document gets the next ordinal on insertion and each (attribute, value) pair is a
+    Python int used as a bitset, so combining predicates is a bitwise AND/OR and counting
+    matches is `int.bit_count()`, both running over machine words instead of Python objects.
+    Ordinals are not reused after removal, which keeps ordinal order equal to insertion order.
+    """
+
+    def __init__(self):
+        self.ordinals: Dict[str, int] = {}
+        self.document_ids: List[Optional[str]] = []
+        self.bitmaps: Dict[str, Dict[Any, int]] = {}
+        self.document_values: Dict[str, Dict[str, Any]] = {}
+        self.all_documents = 0
+
+    def add(self, document_id: str, values: Dict[str, Any]) -> None:
+        ordinal = len(self.document_ids)
+        self.ordinals[document_id] = ordinal
+        self.document_ids.append(document_id)
+        self.all_documents |= 1 << ordinal
+        self.document_values[document_id] = dict(values)
+        for attribute, value in values.items():
+            self._set(attribute, value, ordinal)
+
+    def update(self, document_id: str, values: Dict[str, Any]) -> None:
+        ordinal = self.ordinals[document_id]
+        current_values = self.document_values[document_id]
+        for attribute, value in values.items():
+            current_value = current_values.get(attribute, _MISSING)
+            if current_value == value:
+                continue
+            if current_value is not _MISSING:
+                self._clear(attribute, current_value, ordinal)
+            self._set(attribute, value, ordinal)
+            current_values[attribute] = value
+
+    def remove(self, document_id: str) -> None:
+        if document_id not in self.ordinals:
+            return
+        ordinal = self.ordinals.pop(document_id)
+        self.document_ids[ordinal] = None
+        self.all_documents &= ~(1 << ordinal)
+        for attribute, value in self.document_values.pop(document_id).items():
+            self._clear(attribute, value, ordinal)
+
+    def get(self, attribute: str, value: Any) -> int:
+        """Returns the bitmap of documents whose attribute equals value."""
+        return self.bitmaps.get(attribute, {}).get(value, 0)
+
+    def any_of(self, attribute: str, values: Iterable[Any]) -> int:
+        """Returns the bitmap of documents whose attribute equals any of values (OR)."""
+        bits = 0
+        for value in values:
+            bits |= self.get(attribute, value)
+        return bits
+
+    def match(self, predicates: Dict[str, Any]) -> int:
+        """Returns the bitmap of documents matching all attribute == value predicates (AND)."""
+        bits = self.all_documents
+        for attribute, value in predicates.items():
+            bits &= self.get(attribute, value)
+        return bits
+
+    def counts(self, attribute: str, bits: int) -> Dict[Any, int]:
+        """Counts documents of the bitmap per value of the attribute, skipping empty values."""
+        counts = {}
+        for value, value_bits in self.bitmaps.get(attribute, {}).items():
+            count = (value_bits & bits).bit_count()
+            if count:
+                counts[value] = count
+        return counts
+
+    def to_document_ids(self, bits: int) -> List[str]:
+        """Returns ids of the documents set in the bitmap in ordinal order."""
+        # scanning the binary string is linear in the bitmap size, while peeling the lowest
+        # set bit one by one would copy the whole int for every match
+        binary = bin(bits)[:1:-1]
+        document_ids = []
+        ordinal = binary.find('1')
+        while ordinal != -1:
+            document_ids.append(self.document_ids[ordinal])
+            ordinal = binary.find('1', ordinal + 1)
+        return document_ids
+
+    def _set(self, attribute: str, value: Any, ordinal: int) -> None:
+        attribute_bitmaps = self.bitmaps.setdefault(attribute, {})
+        attribute_bitmaps[value] = attribute_bitmaps.get(value, 0) | (1 << ordinal)
+
+    def _clear(self, attribute: str, value: Any, ordinal: int) -> None:
+        attribute_bitmaps = self.bitmaps[attribute]
+        bits = attribute_bitmaps[value] & ~(1 << ordinal)
+        if bits:
+            attribute_bitmaps[value] = bits
+        else:
+            del attribute_bitmaps[value]
@@ -0,0 +1,67 @@
+# app/infrastructure/repositories/in_memory/sale_partition.py
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from domain.entities.sale import Sale
+from domain.values.sale_totals import SaleTotals
+from infrastructure.repositories.in_memory.indexes import SortedIndex
+
+
+class SalePartition:
+    """
+    Sales whose sale_date falls into [start, end).
+
+    Once the period is over the partition is closed: new sales normally go to the newest
+    partition, so totals of a closed partition are computed once and cached. A late sale
+    (a replayed journal record) clears the cache.
+    """
+
+    def __init__(self, start: datetime, end: datetime):
+        self.start = start
+        self.end = end
+        self.sales: Dict[str, Sale] = {}
+        # category_id -> {sale_id: sale}, category-filtered reports read only their own bucket
+        self.sales_by_category: Dict[str, Dict[str, Sale]] = {}
+        # sales ordered by date, retention takes the oldest ones from its head
+        self.sales_by_date = SortedIndex()
+        # category_id (None for all categories) -> totals of the closed partition
+        self.cached_totals: Dict[Optional[str], SaleTotals] = {}
+
+    def __len__(self) -> int:
+        return len(self.sales)
+
+    def is_closed(self, now: datetime) -> bool:
+        return self.end <= now
+
+    def add(self, sale: Sale) -> None:
+        self.sales[sale.oid] = sale
+        if sale.category_id is not None:
+            self.sales_by_category.setdefault(sale.category_id, {})[sale.oid] = sale
+        self.sales_by_date.update(sale.oid, sale.sale_date)
+        self.cached_totals.clear()
+
+    def remove_many(self, sales: Iterable[Sale]) -> List[Sale]:
+        """Removes the sales that are in the partition and returns them."""
+        removed = [stored for stored in (self.sales.pop(sale.oid, None) for sale in sales) if stored is not None]
+        for sale in removed:
+            if sale.category_id is not None:
+                self.sales_by_category[sale.category_id].pop(sale.oid, None)
+        self.sales_by_date.remove_many(sale.oid for sale in removed)
+        if removed:
+            self.cached_totals.clear()
+        return removed
+
+    def get_sales(self, category_id: Optional[str] = None) -> Iterable[Sale]:
+        if category_id:
+            return self.sales_by_category.get(category_id, {}).values()
+        return self.sales.values()
+
+    def get_totals(self, category_id: Optional[str], now: datetime) -> SaleTotals:
+        totals = self.cached_totals.get(category_id)
+        if totals is None:
+            totals = SaleTotals()
+            for sale in self.get_sales(category_id):
+                totals.add(sale)
+            if self.is_closed(now):
+                self.cached_totals[category_id] = totals
+        return totals
@@ -1,14 +1,26 @@
 # # app/infrastructure/repositories/sql/sql_product_repository.py
 #
+# from types import MappingProxyType
 # from typing import List, Optional
+# from sqlalchemy import text
 # from sqlalchemy.orm import Session
 # from domain.entities.product import Product
 # from application.interfaces.product_repository_interface import ProductRepositoryInterface
-# from domain.exceptions.product_exceptions import ProductNotFoundException
+# from domain.exceptions.product_exceptions import ProductNotFoundException, ProductVersionConflictException
 # from infrastructure.database.models import ProductModel
 # from domain.values.price import Price
 # from domain.values.quantity import Quantity
 # from domain.values.discount import Discount
+# from domain.values.catalog_snapshot import CatalogSnapshot
+#
+# # entity field -> (model column, value getter), used to write only the fields changed since the read
+# COLUMN_GETTERS = {
+#     'name': (ProductModel.name, lambda product: product.name),
+#     'category_id': (ProductModel.category_id, lambda product: product.category_id),
+#     'price': (ProductModel.price, lambda product: product.price.value),
+#     'stock': (ProductModel.stock, lambda product: product.stock.value),
+#     'discount': (ProductModel.discount, lambda product: product.discount.value if product.discount else 0.0),
+# }
 #
 # class SQLProductRepository(ProductRepositoryInterface):
 #     def __init__(self, session: Session):
@@ -22,10 +34,12 @@
 #             price=product.price.value,
 #             stock=product.stock.value,
 #             discount=product.discount.value if product.discount else 0.0,
-#             created_at=product.created_at
+#             created_at=product.created_at,
+#             version=product.version
 #         )
 #         self.session.add(product_model)
 #         self.session.commit()
+#         product.mark_clean()
 #         return product
 #
 #     def get_by_id(self, product_id: str) -> Optional[Product]:
@@ -34,18 +48,55 @@
 #             raise ProductNotFoundException(product_id=product_id)
 #         return self._model_to_entity(product_model)
 #
-#     def update(self, product: Product) -> Product:
-#         product_model = self.session.query(ProductModel).filter_by(oid=product.oid).first()
-#         if not product_model:
-#             raise ProductNotFoundException(product_id=product.oid)
-#         product_model.name = product.name
-#         product_model.category_id = product.category_id
-#         product_model.price = product.price.value
-#         product_model.stock = product.stock.value
-#         product_model.discount = product.discount.value if product.discount else 0.0
+#     def get_many(self, product_ids: List[str]) -> List[Product]:
+#         product_models = self.session.query(ProductModel).filter(ProductModel.oid.in_(product_ids)).all()
+#         models_by_id = {model.oid: model for model in product_models}
+#         return [
+#             self._model_to_entity(models_by_id[product_id])
+#             for product_id in dict.fromkeys(product_ids)
+#             if product_id in models_by_id
+#         ]
+#
+#     def update(self, product: Product, expected_version: Optional[int] = None) -> Product:
+#         if expected_version is None:
+#             expected_version = product.version
+#         # compare-and-swap: the row is only written if nobody bumped its version since it was read
+#         updated_rows = (
+#             self.session.query(ProductModel)
+#             .filter_by(oid=product.oid, version=expected_version)
+#             .update({**self._changed_columns(product), ProductModel.version: expected_version + 1})
+#         )
+#         if not updated_rows:
+#             self.session.rollback()
+#             product_model = self.session.query(ProductModel).filter_by(oid=product.oid).first()
+#             if not product_model:
+#                 raise ProductNotFoundException(product_id=product.oid)
+#             raise ProductVersionConflictException(
+#                 product_id=product.oid,
+#                 expected_version=expected_version,
+#                 actual_version=product_model.version,
+#             )
 #         self.session.commit()
+#         product.version = expected_version + 1
+#         product.mark_clean()
 #         return product
 #
+#     def update_many(self, products: List[Product]) -> List[Product]:
+#         # one transaction for the whole batch, rows bumped by someone else are skipped
+#         written = []
+#         for product in products:
+#             updated_rows = (
+#                 self.session.query(ProductModel)
+#                 .filter_by(oid=product.oid, version=product.version)
+#                 .update({**self._changed_columns(product), ProductModel.version: product.version + 1})
+#             )
+#             if updated_rows:
+#                 product.version += 1
+#                 product.mark_clean()
+#                 written.append(product)
+#         self.session.commit()
+#         return written
+#
 #     def delete(self, product_id: str) -> None:
 #         product_model = self.session.query(ProductModel).filter_by(oid=product_id).first()
 #         if not product_model:
@@ -57,6 +108,25 @@
 #         product_models = self.session.query(ProductModel).all()
 #         return [self._model_to_entity(pm) for pm in product_models]
 #
+#     def get_snapshot(self) -> CatalogSnapshot:
+#         # one REPEATABLE READ transaction gives the consistent view, readers take no row locks (MVCC)
+#         with self.session.connection(execution_options={"isolation_level": "REPEATABLE READ"}):
+#             products = {pm.oid: self._model_to_entity(pm) for pm in self.session.query(ProductModel).all()}
+#             # PostgreSQL: the transaction snapshot horizon serves as the catalog version
+#             version = self.session.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())")).scalar()
+#         for product in products.values():
+#             product.freeze()
+#         return CatalogSnapshot(version=version, products=MappingProxyType(products))
+#
+#     @staticmethod
+#     def _changed_columns(product: Product) -> dict:
+#         # UPDATE ... SET only the dirty columns instead of the whole row
+#         return {
+#             column: get(product)
+#             for field, (column, get) in COLUMN_GETTERS.items()
+#             if field in product.dirty_fields
+#         }
+#
 #     def _model_to_entity(self, model: ProductModel) -> Product:
 #         return Product(
 #             oid=model.oid,
@@ -65,5 +135,6 @@
 #             price=Price(model.price),
 #             stock=Quantity(model.stock),
 #             discount=Discount(model.discount) if model.discount else None,
-#             created_at=model.created_at
+#             created_at=model.created_at,
+#             version=model.version
 #         )
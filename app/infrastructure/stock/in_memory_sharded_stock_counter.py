@@ -0,0 +1,61 @@
+# app/infrastructure/stock/in_memory_sharded_stock_counter.py
+
+import random
+from typing import Dict, List, Optional
+from application.interfaces.stock_counter_interface import StockCounterInterface
+
+
+class InMemoryShardedStockCounter(StockCounterInterface):
+    """
+    Stock of hot products split across independent sub-counters.
+
+    Every take or put touches a single randomly chosen shard, so concurrent sales of one
+    product do not contend on the same counter (in a database every shard is its own row).
+    When the chosen shard cannot cover a request, the remaining stock is collected from all
+    shards and spread evenly again, which is the only operation touching every shard.
+    """
+
+    def __init__(self):
+        self.shards: Dict[str, List[int]] = {}
+
+    def enable(self, product_id: str, stock: int, shards: int) -> None:
+        if shards < 1:
+            raise ValueError("A sharded product needs at least one shard.")
+        if product_id in self.shards:
+            stock = sum(self.shards[product_id])
+        self.shards[product_id] = self._split(stock, shards)
+
+    def disable(self, product_id: str) -> Optional[int]:
+        shards = self.shards.pop(product_id, None)
+        return sum(shards) if shards is not None else None
+
+    def get_total(self, product_id: str) -> Optional[int]:
+        shards = self.shards.get(product_id)
+        return sum(shards) if shards is not None else None
+
+    def get_sharded_product_ids(self) -> List[str]:
+        return list(self.shards)
+
+    def get_shard_count(self, product_id: str) -> int:
+        return len(self.shards.get(product_id, ()))
+
+    def take(self, product_id: str, quantity: int) -> bool:
+        shards = self.shards[product_id]
+        index = random.randrange(len(shards))
+        if shards[index] >= quantity:
+            shards[index] -= quantity
+            return True
+        total = sum(shards)
+        if total < quantity:
+            return False
+        shards[:] = self._split(total - quantity, len(shards))
+        return True
+
+    def put(self, product_id: str, quantity: int) -> None:
+        shards = self.shards[product_id]
+        shards[random.randrange(len(shards))] += quantity
+
+    @staticmethod
+    def _split(stock: int, shards: int) -> List[int]:
+        base, remainder = divmod(stock, shards)
+        return [base + (1 if index < remainder else 0) for index in range(shards)]
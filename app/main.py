@@ -1,31 +1,72 @@
 # app/main.py
 
+import asyncio
+import contextlib
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
 from containers import init_container
 from domain.exceptions.base_exception import ApplicationException
+from domain.services.product_service import ProductService
+from domain.services.promotion_service import PromotionService
+from domain.services.sale_service import SaleService
+from domain.services.retention_service import RetentionService
+
+logger = logging.getLogger(__name__)
 
 
 def create_app(container=None) -> FastAPI:
+    # If no container is provided, use the default one
+    if container is None:
+        container = init_container()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # background scheduler that starts and ends scheduled promotions
+        scheduler = asyncio.create_task(container.resolve(PromotionService).run_scheduler())
+        # write-behind worker moving journaled sales to the sale repository
+        sale_service = container.resolve(SaleService)
+        journal_worker = None
+        if sale_service.sale_journal.enabled:
+            journal_worker = asyncio.create_task(sale_service.run_sale_journal_worker())
+        # purges closed reservations and compacts old sales into daily rollups
+        retention_worker = asyncio.create_task(container.resolve(RetentionService).run_retention_worker())
+        # writes the counter stock of sharded products into the products, so listings and the change feed follow it
+        stock_publisher = asyncio.create_task(container.resolve(ProductService).run_sharded_stock_publisher())
+        yield
+        for task in (scheduler, journal_worker, retention_worker, stock_publisher):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        if sale_service.sale_journal.enabled:
+            # drain on shutdown, whatever is left (e.g. the repository is down) stays in the journal for the next start
+            try:
+                await sale_service.drain_sale_journal()
+            except Exception:
+                logger.exception("Failed to drain the sale journal on shutdown")
+            finally:
+                sale_service.sale_journal.close()
+
     app = FastAPI(
         title='Graintrack DDD project',
         docs_url='/api/docs',
         description="API for managing products, categories, reservations, and sales within a Domain-Driven Design (DDD) architecture.",
         debug=True,
+        lifespan=lifespan,
     )
 
-    # If no container is provided, use the default one
-    if container is None:
-        container = init_container()
-
     app.state.container = container
 
-    from presentation.api.v1.endpoints import products, reservations, sales, categories
+    from presentation.api.v1.endpoints import products, reservations, sales, categories, promotions
     app.include_router(products.router, prefix="/api/v1")
     app.include_router(reservations.router, prefix="/api/v1")
     app.include_router(sales.router, prefix="/api/v1")
     app.include_router(categories.router, prefix="/api/v1")
+    app.include_router(promotions.router, prefix="/api/v1")
 
     @app.exception_handler(ApplicationException)
     async def application_exception_handler(request: Request, exc: ApplicationException):
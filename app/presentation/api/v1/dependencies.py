@@ -1,12 +1,13 @@
 # app/presentation/api/v1/dependencies.py
 import uuid
-from typing import Union
+from typing import List, Optional, Union
 
-from fastapi import Request, Depends
+from fastapi import Request, Depends, Header, HTTPException
 from domain.services.product_service import ProductService
 from domain.services.category_service import CategoryService
 from domain.services.reservation_service import ReservationService
 from domain.services.sale_service import SaleService
+from domain.services.promotion_service import PromotionService
 from application.utils.id_converter import validate_and_convert_product_id
 
 
@@ -30,5 +31,32 @@ def get_sale_service(container=Depends(get_container)) -> SaleService:
     return container.resolve(SaleService)
 
 
+def get_promotion_service(container=Depends(get_container)) -> PromotionService:
+    return container.resolve(PromotionService)
+
+
 def get_validated_product_id(product_id: Union[str, uuid.UUID]) -> str:
     return validate_and_convert_product_id(product_id)
+
+
+def get_requested_fields(fields: Optional[str] = None) -> Optional[List[str]]:
+    """
+    Parses the `fields` query parameter (comma separated field names) used for sparse fieldsets.
+    Returns None when all fields are requested.
+    """
+    if not fields:
+        return None
+    return list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip())) or None
+
+
+def get_if_match_version(if_match: Optional[str] = Header(None)) -> Optional[int]:
+    """
+    Parses the entity version from an `If-Match` header (`"3"`, `W/"3"` or `3`).
+    `*` and a missing header mean that any version may be overwritten.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip().removeprefix("W/").strip('"')
+    if not tag.isdigit():
+        raise HTTPException(status_code=400, detail=f"Invalid If-Match header: {if_match}")
+    return int(tag)
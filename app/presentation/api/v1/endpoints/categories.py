@@ -71,10 +71,12 @@ async def get_category(
 
 @router.get("/", response_model=List[CategoryResponse])
 async def list_categories(
+    include_counts: bool = False,
     category_service: CategoryService = Depends(get_category_service)
 ):
     try:
         categories = await category_service.get_all_categories()
-        return convert_categories_to_responses(categories)
+        counts = await category_service.get_available_product_counts(categories) if include_counts else None
+        return convert_categories_to_responses(categories, counts)
     except ApplicationException as e:
         raise HTTPException(status_code=400, detail=e.message)
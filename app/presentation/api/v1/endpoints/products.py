@@ -1,20 +1,40 @@
 # app/presentation/api/v1/endpoints/products.py
 
-from typing import List, Optional, Union
+from typing import AsyncIterator, List, Optional, Union
 import uuid
 
-from infrastructure.converters.product_converters import convert_products_to_responses
+from infrastructure.converters.product_converters import (
+    convert_products_to_responses,
+    convert_products_to_partial_responses,
+    convert_change_to_response,
+)
 from presentation.schemas.product_schema import (
     ProductCreateRequest,
     ProductUpdateRequest,
-    ProductResponse
+    ProductResponse,
+    ProductChangesResponse,
+    ProductBatchGetRequest,
+    ProductBatchResponse,
+    ProductFacetsResponse,
+    ProductBulkPromotionRequest,
+    ProductBulkRepriceRequest,
+    ProductBulkUpdateResponse,
+    ProductStockAdjustmentRequest,
+    ProductStockShardsRequest,
 )
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from domain.services.product_service import ProductService
-from presentation.api.v1.dependencies import get_product_service, get_validated_product_id
-from domain.exceptions.product_exceptions import ApplicationException
+from presentation.api.v1.dependencies import (
+    get_product_service,
+    get_validated_product_id,
+    get_if_match_version,
+    get_requested_fields,
+)
+from domain.exceptions.product_exceptions import ApplicationException, ProductVersionConflictException
 
 
 router = APIRouter(
@@ -22,25 +42,164 @@ router = APIRouter(
     tags=["Products"]
 )
 
+STREAM_KEEPALIVE_SECONDS = 15
+
 
 @router.get("/", response_model=List[ProductResponse])
 async def get_products(
     category_id: Optional[uuid.UUID] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    on_promotion: Optional[bool] = None,
+    price_bucket: Optional[str] = Query(None, description="Price bucket, e.g. `10-50`"),
+    sort_by: Optional[str] = Query(None, pattern="^(price|price_after_discount|name|created_at)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    fields: Optional[List[str]] = Depends(get_requested_fields),
     product_service: ProductService = Depends(get_product_service)
 ):
-    products = await product_service.get_available_products(category_id)
+    products = await product_service.get_available_products(
+        category_id,
+        min_price=min_price,
+        max_price=max_price,
+        sort_by=sort_by,
+        descending=order == "desc",
+        on_promotion=on_promotion,
+        price_bucket=price_bucket,
+    )
     if not products:
         return []
+    if fields:
+        # partial rows do not match ProductResponse, so they bypass response_model validation
+        return JSONResponse(content=jsonable_encoder(convert_products_to_partial_responses(products, fields)))
+    return convert_products_to_responses(products)
+
+
+@router.get("/facets/", response_model=ProductFacetsResponse)
+async def get_product_facets(
+    category_id: Optional[uuid.UUID] = None,
+    on_promotion: Optional[bool] = None,
+    price_bucket: Optional[str] = Query(None, description="Price bucket, e.g. `10-50`"),
+    product_service: ProductService = Depends(get_product_service)
+):
+    return await product_service.get_product_facets(category_id, on_promotion, price_bucket)
+
+
+@router.get("/search/", response_model=List[ProductResponse])
+async def search_products(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, gt=0, le=100),
+    product_service: ProductService = Depends(get_product_service)
+):
+    products = await product_service.search_products(q, limit)
     return convert_products_to_responses(products)
 
 
+@router.post("/batch-get/", response_model=ProductBatchResponse)
+async def get_products_batch(
+    batch_request: ProductBatchGetRequest,
+    product_service: ProductService = Depends(get_product_service)
+):
+    return await product_service.get_products_by_ids(batch_request.ids)
+
+
+@router.post("/bulk-promotion/", response_model=ProductBulkUpdateResponse)
+async def bulk_start_promotion(
+    promotion_request: ProductBulkPromotionRequest,
+    product_service: ProductService = Depends(get_product_service)
+):
+    try:
+        return await product_service.bulk_start_promotion(promotion_request.discount_percentage, promotion_request)
+    except ApplicationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
+
+@router.post("/bulk-reprice/", response_model=ProductBulkUpdateResponse)
+async def bulk_update_price(
+    reprice_request: ProductBulkRepriceRequest,
+    product_service: ProductService = Depends(get_product_service)
+):
+    try:
+        return await product_service.bulk_update_price(reprice_request.price_multiplier, reprice_request)
+    except ApplicationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
+
+@router.post("/stock-adjustments/", response_model=ProductBulkUpdateResponse)
+async def adjust_stock(
+    adjustment_request: ProductStockAdjustmentRequest,
+    product_service: ProductService = Depends(get_product_service)
+):
+    return await product_service.adjust_stock(adjustment_request.items)
+
+
+@router.get("/changes/", response_model=ProductChangesResponse)
+async def get_product_changes(
+    since: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, gt=0),
+    product_service: ProductService = Depends(get_product_service)
+):
+    return await product_service.get_changes_since(since, limit)
+
+
+@router.get("/stream/")
+async def stream_product_changes(
+    request: Request,
+    last_event_id: Optional[int] = Header(None),
+    product_service: ProductService = Depends(get_product_service)
+):
+    """
+    Server-Sent Events stream of product stock and price changes.
+    Every `product` event carries the change feed version as its id; a `resync` event means
+    updates were dropped for this connection and the client should catch up via /products/changes/.
+    """
+    return StreamingResponse(
+        _product_event_stream(request, product_service, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def _product_event_stream(
+    request: Request,
+    product_service: ProductService,
+    last_event_id: Optional[int],
+) -> AsyncIterator[str]:
+    subscription = product_service.subscribe_to_changes()
+    last_sent_version = 0
+    try:
+        if last_event_id is not None:
+            # reconnect: replay what was missed from the change feed before switching to live updates
+            missed = await product_service.get_changes_since(last_event_id)
+            if missed.resync_required:
+                yield "event: resync\ndata: {}\n\n"
+            for change in missed.changes:
+                yield f"id: {change.version}\nevent: product\ndata: {change.json(by_alias=True)}\n\n"
+            last_sent_version = missed.version
+
+        while not await request.is_disconnected():
+            changes, resync_required = await subscription.get_batch(timeout=STREAM_KEEPALIVE_SECONDS)
+            if resync_required:
+                yield "event: resync\ndata: {}\n\n"
+            for change in changes:
+                if change.sequence <= last_sent_version:
+                    continue
+                response = convert_change_to_response(change)
+                yield f"id: {response.version}\nevent: product\ndata: {response.json(by_alias=True)}\n\n"
+            if not changes and not resync_required:
+                yield ": keep-alive\n\n"
+    finally:
+        product_service.unsubscribe_from_changes(subscription)
+
+
 @router.get("/{product_id}/", response_model=ProductResponse)
 async def get_product(
+    response: Response,
     product_id: str = Depends(get_validated_product_id),
     product_service: ProductService = Depends(get_product_service)
 ):
     try:
         product = await product_service.get_product_by_id(product_id)
+        response.headers["ETag"] = f'"{product.version}"'
         return product
     except ApplicationException as e:
         raise HTTPException(status_code=404, detail=e.message)
@@ -61,13 +220,19 @@ async def create_product(
 @router.put("/{product_id}/", response_model=ProductResponse)
 async def update_product(
     product_update: Union[dict | ProductUpdateRequest],
+    response: Response,
     product_id: str = Depends(get_validated_product_id),
+    expected_version: Optional[int] = Depends(get_if_match_version),
     product_service: ProductService = Depends(get_product_service)
 ):
     try:
         processed_update = product_service._process_product_input(product_update)
-        updated_product = await product_service.update_product(product_id, processed_update)
+        updated_product = await product_service.update_product(product_id, processed_update, expected_version)
+        response.headers["ETag"] = f'"{updated_product.version}"'
         return updated_product
+    except ProductVersionConflictException as e:
+        status_code = 412 if expected_version is not None else 409
+        raise HTTPException(status_code=status_code, detail=e.message)
     except ApplicationException as e:
         raise HTTPException(status_code=400, detail=e.message)
 
@@ -85,12 +250,14 @@ async def delete_product(
 
 @router.post("/{product_id}/reserve/", status_code=204)
 async def reserve_product(
-    quantity: int,
+    quantity: int = Query(..., gt=0),
     product_id: str = Depends(get_validated_product_id),
     product_service: ProductService = Depends(get_product_service)
 ):
     try:
         await product_service.reserve_product(product_id, quantity)
+    except ProductVersionConflictException as e:
+        raise HTTPException(status_code=409, detail=e.message)
     except ApplicationException as e:
         raise HTTPException(status_code=400, detail=e.message)
 
@@ -102,19 +269,49 @@ async def cancel_reservation(
 ):
     try:
         await product_service.cancel_reservation(reservation_id)
+    except ProductVersionConflictException as e:
+        raise HTTPException(status_code=409, detail=e.message)
     except ApplicationException as e:
         raise HTTPException(status_code=400, detail=e.message)
 
 
 @router.post("/{product_id}/sell/", status_code=204)
 async def sell_product(
-    quantity: int,
+    quantity: int = Query(..., gt=0),
     product_id: str = Depends(get_validated_product_id),
     product_service: ProductService = Depends(get_product_service)
 ):
     try:
         await product_service.sell_product(product_id, quantity)
+    except ProductVersionConflictException as e:
+        raise HTTPException(status_code=409, detail=e.message)
     except ApplicationException as e:
         raise HTTPException(status_code=400, detail=e.message)
 
 
+@router.put("/{product_id}/stock-shards/", response_model=ProductResponse)
+async def enable_sharded_stock(
+    shards_request: ProductStockShardsRequest,
+    product_id: str = Depends(get_validated_product_id),
+    product_service: ProductService = Depends(get_product_service)
+):
+    """
+    Splits the stock of a hot product across independent counters for flash sales.
+    """
+    try:
+        return await product_service.enable_sharded_stock(product_id, shards_request.shards)
+    except ApplicationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
+
+@router.delete("/{product_id}/stock-shards/", response_model=ProductResponse)
+async def disable_sharded_stock(
+    product_id: str = Depends(get_validated_product_id),
+    product_service: ProductService = Depends(get_product_service)
+):
+    try:
+        return await product_service.disable_sharded_stock(product_id)
+    except ProductVersionConflictException as e:
+        raise HTTPException(status_code=409, detail=e.message)
+    except ApplicationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
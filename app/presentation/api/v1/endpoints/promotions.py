@@ -0,0 +1,65 @@
+# app/presentation/api/v1/endpoints/promotions.py
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from domain.services.promotion_service import PromotionService
+from infrastructure.converters.promotion_converters import (
+    convert_promotion_to_response,
+    convert_promotions_to_responses,
+)
+from presentation.schemas.promotion_schema import PromotionCreateRequest, PromotionResponse
+from domain.exceptions.promotion_exceptions import ApplicationException, PromotionNotFoundException
+from presentation.api.v1.dependencies import get_promotion_service
+
+router = APIRouter(
+    prefix="/promotions",
+    tags=["Promotions"]
+)
+
+
+@router.post("/", response_model=PromotionResponse, status_code=201)
+async def create_promotion(
+    promotion_create: PromotionCreateRequest,
+    promotion_service: PromotionService = Depends(get_promotion_service)
+):
+    try:
+        promotion = await promotion_service.create_promotion(promotion_create)
+        return convert_promotion_to_response(promotion)
+    except ApplicationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
+
+@router.get("/", response_model=List[PromotionResponse])
+async def list_promotions(
+    promotion_service: PromotionService = Depends(get_promotion_service)
+):
+    promotions = await promotion_service.get_all_promotions()
+    return convert_promotions_to_responses(promotions)
+
+
+@router.get("/{promotion_id}/", response_model=PromotionResponse)
+async def get_promotion(
+    promotion_id: str,
+    promotion_service: PromotionService = Depends(get_promotion_service)
+):
+    try:
+        promotion = await promotion_service.get_promotion_by_id(promotion_id)
+        return convert_promotion_to_response(promotion)
+    except PromotionNotFoundException as e:
+        raise HTTPException(status_code=404, detail=e.message)
+
+
+@router.post("/{promotion_id}/cancel/", response_model=PromotionResponse)
+async def cancel_promotion(
+    promotion_id: str,
+    promotion_service: PromotionService = Depends(get_promotion_service)
+):
+    try:
+        promotion = await promotion_service.cancel_promotion(promotion_id)
+        return convert_promotion_to_response(promotion)
+    except PromotionNotFoundException as e:
+        raise HTTPException(status_code=404, detail=e.message)
+    except ApplicationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
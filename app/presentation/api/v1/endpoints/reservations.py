@@ -10,6 +10,7 @@ from presentation.schemas.reservation_schema import (
     ReservationCreateRequest,
     ReservationResponse
 )
+from presentation.schemas.sale_schema import SaleResponse
 from domain.exceptions.reservation_exceptions import ApplicationException
 from presentation.api.v1.dependencies import get_reservation_service
 
@@ -40,3 +41,17 @@ async def cancel_reservation(
         await reservation_service.cancel_reservation(reservation_id)
     except ApplicationException as e:
         raise HTTPException(status_code=400, detail=e.message)
+
+
+@router.post("/{reservation_id}/checkout/", response_model=SaleResponse, status_code=201)
+async def checkout_reservation(
+    reservation_id: str,
+    reservation_service: ReservationService = Depends(get_reservation_service)
+):
+    """
+    Converts an active reservation into a sale without taking the product stock again.
+    """
+    try:
+        return await reservation_service.checkout_reservation(reservation_id)
+    except ApplicationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
@@ -1,18 +1,23 @@
 # app/presentation/api/v1/endpoints/sales.py
 
 from typing import List, Optional, Union
-from datetime import datetime
+from datetime import date, datetime
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException
-from domain.services.sale_service import SaleService
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from domain.services.sale_service import SaleService, SALES_SUMMARY_CACHE_SECONDS
 from presentation.schemas.sale_schema import (
     SaleCreateRequest,
-    SaleResponse
+    SaleResponse,
+    BestSellerResponse,
+    SaleDailyRollupResponse,
+    SaleSummaryResponse,
 )
 from infrastructure.converters.sale_converters import convert_sales_to_responses
 from domain.exceptions.sale_exceptions import ApplicationException
-from presentation.api.v1.dependencies import get_sale_service
+from presentation.api.v1.dependencies import get_sale_service, get_requested_fields
 
 router = APIRouter(
     prefix="/sales",
@@ -31,15 +36,78 @@ async def register_sale(
         raise HTTPException(status_code=400, detail=e.message)
 
 
+def _get_report_cache_control(closed: bool) -> str:
+    # a report over a closed period does not change and the client may keep it; revenue data
+    # must not be stored by shared proxies
+    return f"private, max-age={SALES_SUMMARY_CACHE_SECONDS}" if closed else "no-cache"
+
+
 @router.get("/", response_model=List[SaleResponse])
 async def get_sales(
+    response: Response,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     category_id: Optional[str] = None,
+    fields: Optional[List[str]] = Depends(get_requested_fields),
     sale_service: SaleService = Depends(get_sale_service)
 ):
     try:
-        sales = await sale_service.get_sales_report(start_date, end_date, category_id)
+        sales = await sale_service.get_sales_report(start_date, end_date, category_id, fields)
+        cache_control = _get_report_cache_control(sale_service.is_period_closed(end_date))
+        if fields:
+            # partial rows do not match SaleResponse, so they bypass response_model validation
+            return JSONResponse(content=jsonable_encoder(sales), headers={"Cache-Control": cache_control})
+        response.headers["Cache-Control"] = cache_control
         return convert_sales_to_responses(sales)
     except ApplicationException as e:
         raise HTTPException(status_code=400, detail=e.message)
+
+
+@router.get("/top/", response_model=List[BestSellerResponse])
+async def get_best_sellers(
+    window: str = Query("hour", pattern="^(hour|day)$"),
+    limit: int = Query(10, gt=0, le=100),
+    category_id: Optional[str] = None,
+    sale_service: SaleService = Depends(get_sale_service)
+):
+    try:
+        return await sale_service.get_best_sellers(window, limit, category_id)
+    except ApplicationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
+
+@router.get("/summary/", response_model=SaleSummaryResponse)
+async def get_sales_summary(
+    response: Response,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    granularity: Optional[str] = Query(None, pattern="^(day|month)$"),
+    sale_service: SaleService = Depends(get_sale_service)
+):
+    """
+    Total quantity, revenue and number of sales in the period, per day or month with `granularity`.
+    """
+    try:
+        summary = await sale_service.get_sales_summary(start_date, end_date, category_id, granularity)
+        response.headers["Cache-Control"] = _get_report_cache_control(summary.closed)
+        return summary
+    except ApplicationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
+
+@router.get("/daily/", response_model=List[SaleDailyRollupResponse])
+async def get_daily_sales(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    product_id: Optional[str] = None,
+    category_id: Optional[str] = None,
+    sale_service: SaleService = Depends(get_sale_service)
+):
+    """
+    Daily per-product totals of sales older than the retention period.
+    """
+    try:
+        return await sale_service.get_daily_sales(start_date, end_date, product_id, category_id)
+    except ApplicationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
@@ -23,6 +23,12 @@ class CategoryResponse(CategoryBase):
     created_at: Optional[datetime] = Field(
         None, description="The date and time the category was created"
     )
+    available_products: Optional[int] = Field(
+        None, description="Products in stock in this category, returned with include_counts"
+    )
+    subtree_available_products: Optional[int] = Field(
+        None, description="Products in stock in this category and all its subcategories, returned with include_counts"
+    )
 
     class Config:
         orm_mode = True
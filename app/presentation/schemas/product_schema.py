@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import Optional, Union
+from typing import Dict, List, Optional, Union
 import uuid
 
 
@@ -31,7 +31,84 @@ class ProductResponse(ProductBase):
     description: Optional[str] = Field(None, example="Full description of the product")
     created_at: Optional[datetime] = Field(None, description="The date and time the product was created")
     price_after_discount: Optional[float] = None
+    version: int = Field(0, description="Entity version, send it back in If-Match to update safely")
+    promotion_id: Optional[str] = Field(None, description="Scheduled promotion currently applied to the product")
+    reserved_quantity: Optional[int] = Field(
+        None, description="Quantity held by active reservations (single product and batch reads)"
+    )
 
     class Config:
         orm_mode = True
         allow_population_by_field_name = True
+
+
+class ProductBatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=500, example=["123e4567-e89b-12d3-a456-426614174000"])
+
+
+class ProductBatchResponse(BaseModel):
+    items: List[ProductResponse] = []
+    missing_ids: List[str] = []
+
+
+class ProductChangeResponse(BaseModel):
+    version: int = Field(..., description="Position of the change in the feed")
+    product_id: str
+    operation: str = Field(..., example="upsert")  # "upsert" or "delete"
+    product: Optional[ProductResponse] = None
+    changed_at: datetime
+
+
+class ProductChangesResponse(BaseModel):
+    version: int = Field(..., description="Version to pass as `since` on the next request")
+    resync_required: bool = Field(
+        False, description="The requested version is no longer available, reload the full catalog"
+    )
+    changes: List[ProductChangeResponse] = []
+
+
+class ProductFacetsResponse(BaseModel):
+    total: int = Field(..., description="Number of available products matching all filters")
+    categories: Dict[str, int] = Field({}, description="Available products per category id")
+    price_buckets: Dict[str, int] = Field({}, example={"0-10": 3, "10-50": 12})
+    on_promotion: int = Field(0, description="Available products with a discount")
+    regular: int = Field(0, description="Available products without a discount")
+
+
+class ProductBulkSelection(BaseModel):
+    category_id: Optional[uuid.UUID] = Field(None, description="Category whose products (and subcategories' products) are changed")
+    include_subcategories: bool = True
+    min_price: Optional[float] = Field(None, ge=0, description="Lower bound on the price after discount")
+    max_price: Optional[float] = Field(None, ge=0, description="Upper bound on the price after discount")
+    on_promotion: Optional[bool] = None
+    price_bucket: Optional[str] = Field(None, example="10-50")
+
+
+class ProductBulkPromotionRequest(ProductBulkSelection):
+    discount_percentage: float = Field(..., ge=0, le=100, example=15)
+
+
+class ProductBulkRepriceRequest(ProductBulkSelection):
+    price_multiplier: float = Field(..., gt=0, example=1.1)
+
+
+class ProductBulkUpdateResponse(BaseModel):
+    matched: int = Field(..., description="Products selected by the filters or listed in the request")
+    updated: int = Field(..., description="Products changed and saved")
+    skipped: int = Field(0, description="Products that already had the requested values and were not written")
+    failed_ids: List[str] = Field([], description="Products that were not updated")
+    errors: Dict[str, str] = Field({}, description="Reason per failed product")
+
+
+class ProductStockAdjustment(BaseModel):
+    product_id: str
+    quantity: int = Field(..., example=25)
+    mode: str = Field("absolute", pattern="^(absolute|delta)$", description="`absolute` stock level or `delta` change")
+
+
+class ProductStockAdjustmentRequest(BaseModel):
+    items: List[ProductStockAdjustment] = Field(..., min_length=1, max_length=250_000)
+
+
+class ProductStockShardsRequest(BaseModel):
+    shards: int = Field(..., ge=1, le=256, example=16, description="Number of independent stock counters")
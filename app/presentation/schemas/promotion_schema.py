@@ -0,0 +1,30 @@
+# app/presentation/schemas/promotion_schema.py
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import uuid
+from datetime import datetime
+
+
+class PromotionBase(BaseModel):
+    discount_percentage: float = Field(..., ge=0, le=100, example=20)
+    starts_at: datetime
+    ends_at: datetime
+    product_ids: List[str] = Field([], description="Products the promotion applies to")
+    category_id: Optional[uuid.UUID] = Field(
+        None, description="Apply to all products of the category and its subcategories at start time"
+    )
+
+
+class PromotionCreateRequest(PromotionBase):
+    pass
+
+
+class PromotionResponse(PromotionBase):
+    oid: str = Field(..., alias='id')
+    status: str = Field(..., example="scheduled")  # "scheduled", "active", "finished" or "cancelled"
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+        allow_population_by_field_name = True
@@ -1,9 +1,9 @@
 # app/presentation/schemas/sale_schema.py
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
 class SaleBase(BaseModel):
     product_id: str
@@ -15,7 +15,45 @@ class SaleCreateRequest(SaleBase):
 class SaleResponse(SaleBase):
     oid: uuid.UUID = Field(..., alias='id')
     sale_date: datetime = Field(..., description="The date and time the sale was recorded")
+    category_id: Optional[str] = Field(None, description="Category of the product at the time of sale")
+    unit_price: Optional[float] = Field(None, description="Price after discount at the time of sale")
 
     class Config:
         orm_mode = True
         allow_population_by_field_name = True
+
+
+class BestSellerResponse(BaseModel):
+    product_id: str
+    quantity: int = Field(..., example=42)
+    exact: bool = Field(True, description="False if the quantity is an upper-bound estimate")
+
+
+class SaleDailyRollupResponse(BaseModel):
+    day: date
+    product_id: str
+    category_id: Optional[str] = None
+    quantity: int = Field(..., example=42)
+    revenue: float = Field(..., description="Sum of quantity * price after discount")
+    sales_count: int = Field(..., description="Number of individual sales folded into the rollup")
+
+
+class SaleSummaryBucketResponse(BaseModel):
+    start_date: datetime
+    end_date: datetime = Field(..., description="Last moment of the bucket, inclusive")
+    quantity: int = Field(..., example=42)
+    revenue: float = Field(..., description="Sum of quantity * price after discount")
+    sales_count: int = Field(..., description="Number of sales in the bucket")
+    closed: bool = Field(..., description="True if the bucket is in the past and will not change")
+
+
+class SaleSummaryResponse(BaseModel):
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    category_id: Optional[str] = None
+    granularity: Optional[str] = None
+    quantity: int = Field(..., example=420)
+    revenue: float = Field(..., description="Sum of quantity * price after discount")
+    sales_count: int = Field(..., description="Number of sales in the period")
+    closed: bool = Field(..., description="True if the whole period is in the past")
+    buckets: List[SaleSummaryBucketResponse] = Field(default_factory=list)
@@ -8,18 +8,34 @@ from application.interfaces.product_repository_interface import ProductRepositor
 from application.interfaces.category_repository_interface import CategoryRepositoryInterface
 from application.interfaces.reservation_repository_interface import ReservationRepositoryInterface
 from application.interfaces.sale_repository_interface import SaleRepositoryInterface
+from application.interfaces.product_change_log_interface import ProductChangeLogInterface
+from application.interfaces.product_event_broker_interface import ProductEventBrokerInterface
+from application.interfaces.best_seller_tracker_interface import BestSellerTrackerInterface
+from application.interfaces.promotion_repository_interface import PromotionRepositoryInterface
+from application.interfaces.stock_counter_interface import StockCounterInterface
+from application.interfaces.sale_journal_interface import SaleJournalInterface
+from application.interfaces.sale_archive_interface import SaleArchiveInterface
 
 # Impservices
 from domain.services.product_service import ProductService
 from domain.services.category_service import CategoryService
 from domain.services.reservation_service import ReservationService
 from domain.services.sale_service import SaleService
+from domain.services.promotion_service import PromotionService
+from domain.services.retention_service import RetentionService, RetentionPolicy
 
 # Impin-memory repositories
 from infrastructure.repositories.in_memory.in_memory_product_repository import InMemoryProductRepository
 from infrastructure.repositories.in_memory.in_memory_category_repository import InMemoryCategoryRepository
 from infrastructure.repositories.in_memory.in_memory_reservation_repository import InMemoryReservationRepository
 from infrastructure.repositories.in_memory.in_memory_sale_repository import InMemorySaleRepository
+from infrastructure.repositories.in_memory.in_memory_product_change_log import InMemoryProductChangeLog
+from infrastructure.events.in_memory_product_event_broker import InMemoryProductEventBroker
+from infrastructure.analytics.in_memory_best_seller_tracker import InMemoryBestSellerTracker
+from infrastructure.repositories.in_memory.in_memory_promotion_repository import InMemoryPromotionRepository
+from infrastructure.stock.in_memory_sharded_stock_counter import InMemoryShardedStockCounter
+from infrastructure.journal.file_sale_journal import FileSaleJournal
+from infrastructure.archive.columnar_sale_archive import ColumnarSaleArchive
 from main import create_app
 
 
@@ -31,14 +47,27 @@ def test_container():
     container.register(CategoryRepositoryInterface, InMemoryCategoryRepository, scope=Scope.singleton)
     container.register(ReservationRepositoryInterface, InMemoryReservationRepository, scope=Scope.singleton)
     container.register(SaleRepositoryInterface, InMemorySaleRepository, scope=Scope.singleton)
+    container.register(ProductChangeLogInterface, InMemoryProductChangeLog, scope=Scope.singleton)
+    container.register(ProductEventBrokerInterface, InMemoryProductEventBroker, scope=Scope.singleton)
+    container.register(BestSellerTrackerInterface, InMemoryBestSellerTracker, scope=Scope.singleton)
+    container.register(PromotionRepositoryInterface, InMemoryPromotionRepository, scope=Scope.singleton)
+    container.register(StockCounterInterface, InMemoryShardedStockCounter, scope=Scope.singleton)
+    container.register(SaleJournalInterface, instance=FileSaleJournal())
+    container.register(SaleArchiveInterface, instance=ColumnarSaleArchive())
+    container.register(RetentionPolicy, instance=RetentionPolicy())
 
     # Регистрация сервисов с их зависимостями через интерфейсы
     container.register(ProductService, product_repository=ProductRepositoryInterface, scope=Scope.singleton)
-    container.register(CategoryService, category_repository=CategoryRepositoryInterface, scope=Scope.singleton)
-    container.register(ReservationService, reservation_repository=ReservationRepositoryInterface,
+    container.register(CategoryService, category_repository=CategoryRepositoryInterface,
                        product_repository=ProductRepositoryInterface, scope=Scope.singleton)
+    container.register(ReservationService, reservation_repository=ReservationRepositoryInterface,
+                       sale_service=SaleService, scope=Scope.singleton)
     container.register(SaleService, sale_repository=SaleRepositoryInterface,
                        product_repository=ProductRepositoryInterface, scope=Scope.singleton)
+    container.register(PromotionService, promotion_repository=PromotionRepositoryInterface,
+                       product_service=ProductService, scope=Scope.singleton)
+    container.register(RetentionService, reservation_repository=ReservationRepositoryInterface,
+                       sale_repository=SaleRepositoryInterface, scope=Scope.singleton)
 
     return container
 
@@ -49,8 +78,8 @@ def product_service(test_container):
     return test_container.resolve(ProductService)
 
 @pytest.fixture(scope='function')
-def category_service(category_repository):
-    return CategoryService(category_repository=category_repository)
+def category_service(category_repository, product_repository):
+    return CategoryService(category_repository=category_repository, product_repository=product_repository)
 
 @pytest.fixture
 def reservation_service(test_container):
@@ -60,6 +89,10 @@ def reservation_service(test_container):
 def sale_service(test_container):
     return test_container.resolve(SaleService)
 
+@pytest.fixture
+def promotion_service(test_container):
+    return test_container.resolve(PromotionService)
+
 @pytest.fixture(scope='session')
 def product_repository(test_container):
     return test_container.resolve(ProductRepositoryInterface)
@@ -79,6 +112,10 @@ def reservation_repository(test_container):
 def sale_repository(test_container):
     return test_container.resolve(SaleRepositoryInterface)
 
+@pytest.fixture
+def product_change_log(test_container):
+    return test_container.resolve(ProductChangeLogInterface)
+
 
 @pytest_asyncio.fixture(scope='session')
 async def async_client(test_container):
@@ -4,6 +4,9 @@ import pytest
 from httpx import AsyncClient
 
 from domain.entities.category import Category
+from domain.entities.product import Product
+from domain.values.price import Price
+from domain.values.quantity import Quantity
 from domain.exceptions.category_exceptions import CategoryNotFoundException
 import uuid
 
@@ -67,3 +70,33 @@ async def test_get_all_categories(category_service):
     categories = await category_service.get_all_categories()
     assert len(categories) == 2
     assert category1 in categories and category2 in categories
+
+
+@pytest.mark.asyncio
+async def test_get_available_product_counts(category_service, product_service):
+    """
+    Verifies that own and subtree counts of available products follow product creation,
+    sales of the last unit and deletions.
+    """
+    parent = await category_service.create_category(Category(name="Furniture"))
+    child = await category_service.create_category(Category(name="Chairs", parent_category_id=parent.oid))
+    grandchild = await category_service.create_category(Category(name="Stools", parent_category_id=child.oid))
+
+    table = Product(name="Table", category_id=parent.oid, price=Price(100.0), stock=Quantity(2))
+    chair = Product(name="Chair", category_id=child.oid, price=Price(40.0), stock=Quantity(1))
+    stool = Product(name="Stool", category_id=grandchild.oid, price=Price(20.0), stock=Quantity(5))
+    for product in (table, chair, stool):
+        await product_service.create_product(product)
+
+    categories = await category_service.get_all_categories()
+    counts = await category_service.get_available_product_counts(categories)
+    assert counts[parent.oid] == (1, 3)
+    assert counts[child.oid] == (1, 2)
+    assert counts[grandchild.oid] == (1, 1)
+
+    await product_service.sell_product(chair.oid, 1)
+    await product_service.delete_product(stool.oid)
+    counts = await category_service.get_available_product_counts(categories)
+    assert counts[parent.oid] == (1, 1)
+    assert counts[child.oid] == (0, 0)
+    assert counts[grandchild.oid] == (0, 0)
@@ -1,13 +1,21 @@
 # tests/domain/services/test_product_service.py
 
 import pytest
+from domain.entities.category import Category
 from domain.entities.product import Product
 from domain.values.price import Price
 from domain.values.quantity import Quantity
 from domain.exceptions.product_exceptions import ProductNotFoundException, InvalidDiscountException, InsufficientStockException
+from domain.exceptions.product_exceptions import ChangeLogCompactedException, ProductVersionConflictException
+from domain.exceptions.product_exceptions import InvalidStockQuantityException
+import asyncio
 import uuid
 
 from infrastructure.converters.product_converters import convert_product_to_dto
+from presentation.schemas.product_schema import ProductUpdateRequest, ProductBulkSelection, ProductStockAdjustment
+from domain.services import product_service as product_service_module
+from infrastructure.repositories.in_memory.in_memory_product_change_log import InMemoryProductChangeLog
+from infrastructure.events.in_memory_product_event_broker import InMemoryProductEventBroker
 
 
 @pytest.mark.asyncio
@@ -137,3 +145,513 @@ async def test_sell_product_insufficient_stock(product_service):
     await product_service.create_product(product)
     with pytest.raises(InsufficientStockException):
         await product_service.sell_product(product_id=product.oid, quantity=5)
+
+
+@pytest.mark.asyncio
+async def test_get_changes_since_tracks_stock_and_price_changes(product_service):
+    """
+    Checks that creating, promoting, reserving and selling a product are all published to
+    the change feed, and that a consumer only receives the changes after its version.
+    """
+    since = (await product_service.get_changes_since(0)).version
+    product = Product(
+        name="Feed Product",
+        category_id=str(uuid.uuid4()),
+        price=Price(100.0),
+        stock=Quantity(10)
+    )
+    await product_service.create_product(product)
+    await product_service.start_promotion(product_id=product.oid, discount_percentage=20.0)
+    await product_service.reserve_product(product_id=product.oid, quantity=2)
+    await product_service.sell_product(product_id=product.oid, quantity=3)
+
+    feed = await product_service.get_changes_since(since)
+    changes = [change for change in feed.changes if change.product_id == product.oid]
+    assert not feed.resync_required
+    assert [change.operation for change in changes] == ["upsert"] * 4
+    assert changes[1].product.discount == 20.0
+    assert changes[-1].product.stock == 5
+    assert feed.version == feed.changes[-1].version
+
+    await product_service.delete_product(product.oid)
+    tail = await product_service.get_changes_since(feed.version)
+    assert [(c.product_id, c.operation) for c in tail.changes] == [(product.oid, "delete")]
+
+
+def test_change_log_signals_resync_after_compaction():
+    """
+    Ensures that the bounded change log refuses to serve a version that has already been
+    evicted, so the consumer knows it has to reload the full catalog.
+    """
+    change_log = InMemoryProductChangeLog(max_entries=2)
+    for _ in range(3):
+        change_log.append(str(uuid.uuid4()), "delete")
+
+    assert [change.sequence for change in change_log.get_changes_since(1)] == [2, 3]
+    with pytest.raises(ChangeLogCompactedException):
+        change_log.get_changes_since(0)
+    with pytest.raises(ChangeLogCompactedException):
+        change_log.get_changes_since(10)
+
+
+@pytest.mark.asyncio
+async def test_subscription_coalesces_updates_per_product(product_service):
+    """
+    Verifies that a subscriber receives stock and price changes, with several updates of
+    the same product coalesced into a single event carrying the latest state.
+    """
+    subscription = product_service.subscribe_to_changes()
+    try:
+        product = Product(
+            name="Streamed Product",
+            category_id=str(uuid.uuid4()),
+            price=Price(100.0),
+            stock=Quantity(10)
+        )
+        await product_service.create_product(product)
+        await product_service.reserve_product(product_id=product.oid, quantity=1)
+        await product_service.start_promotion(product_id=product.oid, discount_percentage=50.0)
+
+        changes, resync_required = await subscription.get_batch(timeout=1)
+        assert not resync_required
+        assert [change.product_id for change in changes] == [product.oid]
+        assert changes[0].product.stock_value == 9
+        assert changes[0].product.discount_value == 50.0
+    finally:
+        product_service.unsubscribe_from_changes(subscription)
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped_to_resync():
+    """
+    Ensures that a subscriber whose queue overflows loses its pending updates and is asked
+    to resync, while a timed out wait returns an empty batch.
+    """
+    broker = InMemoryProductEventBroker(max_pending_per_subscriber=2)
+    subscription = broker.subscribe()
+    change_log = InMemoryProductChangeLog()
+    for _ in range(3):
+        broker.publish(change_log.append(str(uuid.uuid4()), "delete"))
+
+    changes, resync_required = await subscription.get_batch(timeout=1)
+    assert changes == []
+    assert resync_required
+    assert await subscription.get_batch(timeout=0.01) == ([], False)
+
+
+@pytest.mark.asyncio
+async def test_update_with_stale_version_is_rejected(product_service, product_repository):
+    """
+    Checks that the repository applies compare-and-swap semantics: a writer holding an
+    outdated copy of a product cannot overwrite a newer version.
+    """
+    product = Product(
+        name="Versioned Product",
+        category_id=str(uuid.uuid4()),
+        price=Price(10.0),
+        stock=Quantity(5)
+    )
+    await product_service.create_product(product)
+    first_copy = await product_repository.get_by_id(product.oid)
+    second_copy = await product_repository.get_by_id(product.oid)
+
+    first_copy.price = Price(11.0)
+    await product_repository.update(first_copy)
+    assert first_copy.version == 1
+
+    second_copy.price = Price(12.0)
+    with pytest.raises(ProductVersionConflictException):
+        await product_repository.update(second_copy)
+    with pytest.raises(ProductVersionConflictException):
+        await product_service.update_product(
+            product.oid, ProductUpdateRequest(name="Stale"), expected_version=0
+        )
+    assert (await product_repository.get_by_id(product.oid)).price_value == 11.0
+
+
+@pytest.mark.asyncio
+async def test_stock_operation_retries_on_concurrent_update(product_service, product_repository, monkeypatch):
+    """
+    Verifies that a stock operation racing with another writer re-reads the product and
+    applies its change on top of the concurrent one instead of losing it.
+    """
+    product = Product(
+        name="Contended Product",
+        category_id=str(uuid.uuid4()),
+        price=Price(10.0),
+        stock=Quantity(10)
+    )
+    await product_service.create_product(product)
+
+    get_by_id = product_repository.get_by_id
+    raced = False
+
+    async def get_by_id_with_concurrent_writer(product_id):
+        nonlocal raced
+        snapshot = await get_by_id(product_id)
+        if not raced:
+            raced = True
+            concurrent = await get_by_id(product_id)
+            concurrent.stock = Quantity(concurrent.stock_value - 3)
+            await product_repository.update(concurrent)
+        return snapshot
+
+    monkeypatch.setattr(product_repository, "get_by_id", get_by_id_with_concurrent_writer)
+    await product_service.sell_product(product_id=product.oid, quantity=2)
+    monkeypatch.undo()
+
+    stored = await product_repository.get_by_id(product.oid)
+    assert stored.stock_value == 5
+    assert stored.version == 2
+
+
+@pytest.mark.asyncio
+async def test_get_products_by_ids(product_service):
+    """
+    Ensures that a batch lookup returns the found products in request order and reports
+    unknown identifiers instead of raising ProductNotFoundException.
+    """
+    category_id = str(uuid.uuid4())
+    first = Product(name="Batch 1", category_id=category_id, price=Price(1.0), stock=Quantity(1))
+    second = Product(name="Batch 2", category_id=category_id, price=Price(2.0), stock=Quantity(2))
+    await product_service.create_product(first)
+    await product_service.create_product(second)
+    missing_id = str(uuid.uuid4())
+
+    batch = await product_service.get_products_by_ids([second.oid, missing_id, first.oid, second.oid])
+    assert [str(item.oid) for item in batch.items] == [second.oid, first.oid]
+    assert batch.missing_ids == [missing_id]
+
+
+@pytest.mark.asyncio
+async def test_search_products(product_service):
+    """
+    Verifies that search matches whole words and word prefixes, ranks exact matches
+    first, skips out-of-stock products and follows renames and deletions.
+    """
+    marker = uuid.uuid4().hex[:8]
+    exact = Product(name=f"{marker} Lamp", category_id=str(uuid.uuid4()), price=Price(1.0), stock=Quantity(1))
+    prefix = Product(name=f"{marker} Lampshade", category_id=str(uuid.uuid4()), price=Price(1.0), stock=Quantity(1))
+    other = Product(name=f"{marker} Chair", category_id=str(uuid.uuid4()), price=Price(1.0), stock=Quantity(1))
+    for product in (exact, prefix, other):
+        await product_service.create_product(product)
+
+    results = await product_service.search_products(f"{marker} lamp")
+    assert [product.oid for product in results] == [exact.oid, prefix.oid]
+
+    await product_service.update_product(other.oid, ProductUpdateRequest(name=f"{marker} Lamp Stand"))
+    await product_service.delete_product(exact.oid)
+    results = await product_service.search_products(f"{marker} lam")
+    assert {product.oid for product in results} == {prefix.oid, other.oid}
+    assert await product_service.search_products(f"{marker} chair") == []
+
+
+@pytest.mark.asyncio
+async def test_get_available_products_price_range_and_sort(product_service):
+    """
+    Checks that available products can be filtered by a price range (after discount)
+    and sorted by indexed fields, and that the indexes follow price updates.
+    """
+    category_id = str(uuid.uuid4())
+    cheap = Product(name="B cheap", category_id=category_id, price=Price(5.0), stock=Quantity(1))
+    middle = Product(name="A middle", category_id=category_id, price=Price(20.0), stock=Quantity(1))
+    pricey = Product(name="C pricey", category_id=category_id, price=Price(50.0), stock=Quantity(1))
+    for product in (cheap, middle, pricey):
+        await product_service.create_product(product)
+
+    in_range = await product_service.get_available_products(category_id, min_price=5.0, max_price=20.0)
+    assert [product.oid for product in in_range] == [cheap.oid, middle.oid]
+
+    by_name = await product_service.get_available_products(category_id, sort_by="name", descending=True)
+    assert [product.oid for product in by_name] == [pricey.oid, cheap.oid, middle.oid]
+
+    await product_service.update_price(pricey.oid, Price(10.0))
+    in_range = await product_service.get_available_products(
+        category_id, max_price=15.0, sort_by="price", descending=True
+    )
+    assert [product.oid for product in in_range] == [pricey.oid, cheap.oid]
+
+
+@pytest.mark.asyncio
+async def test_get_available_products_combined_filters_and_facets(product_service):
+    """
+    Verifies that category, promotion and price bucket filters combine, and that facet
+    counts follow promotions and stock changes.
+    """
+    category_id = str(uuid.uuid4())
+    cheap = Product(name="Facet cheap", category_id=category_id, price=Price(5.0), stock=Quantity(2))
+    promoted = Product(name="Facet promoted", category_id=category_id, price=Price(40.0), stock=Quantity(1))
+    regular = Product(name="Facet regular", category_id=category_id, price=Price(30.0), stock=Quantity(1))
+    for product in (cheap, promoted, regular):
+        await product_service.create_product(product)
+    await product_service.start_promotion(50, promoted.oid)
+
+    results = await product_service.get_available_products(category_id, on_promotion=True, price_bucket="10-50")
+    assert [product.oid for product in results] == [promoted.oid]
+
+    facets = await product_service.get_product_facets(category_id)
+    assert facets.total == 3
+    assert facets.categories[category_id] == 3
+    assert facets.price_buckets == {"0-10": 1, "10-50": 2}
+    assert (facets.on_promotion, facets.regular) == (1, 2)
+
+    facets = await product_service.get_product_facets(category_id, price_bucket="10-50")
+    assert facets.total == 2
+    assert facets.price_buckets == {"0-10": 1, "10-50": 2}
+
+    await product_service.sell_product(promoted.oid, 1)
+    facets = await product_service.get_product_facets(category_id, on_promotion=True)
+    assert facets.total == 0
+    assert (facets.on_promotion, facets.regular) == (0, 2)
+
+
+@pytest.mark.asyncio
+async def test_bulk_promotion_and_reprice_category_subtree(product_service, category_service, monkeypatch):
+    """
+    Verifies that bulk operations change every product of a category subtree, including
+    out-of-stock ones, in chunks, and leave other categories untouched.
+    """
+    monkeypatch.setattr(product_service_module, "BULK_UPDATE_CHUNK_SIZE", 2)
+    parent = await category_service.create_category(Category(name="Seasonal"))
+    child = await category_service.create_category(Category(name="Seasonal decor", parent_category_id=parent.oid))
+    in_parent = Product(name="Bulk 1", category_id=parent.oid, price=Price(10.0), stock=Quantity(1))
+    in_child = Product(name="Bulk 2", category_id=child.oid, price=Price(20.0), stock=Quantity(0))
+    in_child_2 = Product(name="Bulk 3", category_id=child.oid, price=Price(30.0), stock=Quantity(3))
+    elsewhere = Product(name="Bulk 4", category_id=str(uuid.uuid4()), price=Price(40.0), stock=Quantity(1))
+    for product in (in_parent, in_child, in_child_2, elsewhere):
+        await product_service.create_product(product)
+
+    selection = ProductBulkSelection(category_id=parent.oid)
+    summary = await product_service.bulk_start_promotion(25, selection)
+    assert (summary.matched, summary.updated, summary.failed_ids) == (3, 3, [])
+
+    summary = await product_service.bulk_update_price(1.5, ProductBulkSelection(category_id=child.oid, max_price=20))
+    assert (summary.matched, summary.updated) == (1, 1)
+
+    products = await product_service.get_products_by_ids([in_parent.oid, in_child.oid, in_child_2.oid, elsewhere.oid])
+    assert [(item.price, item.discount) for item in products.items] == [
+        (10.0, 25.0), (30.0, 25.0), (30.0, 25.0), (40.0, 0.0)
+    ]
+
+    with pytest.raises(InvalidDiscountException):
+        await product_service.bulk_start_promotion(150, selection)
+
+
+@pytest.mark.asyncio
+async def test_adjust_stock_applies_skips_and_fails(product_service, product_change_log):
+    """
+    Verifies that bulk stock adjustment applies absolute and delta rows in order, skips rows
+    that do not change the stock without writing them, and reports unknown products and
+    negative results as failures.
+    """
+    category_id = str(uuid.uuid4())
+    restocked = Product(name="Sync 1", category_id=category_id, price=Price(1.0), stock=Quantity(5))
+    unchanged = Product(name="Sync 2", category_id=category_id, price=Price(1.0), stock=Quantity(7))
+    oversold = Product(name="Sync 3", category_id=category_id, price=Price(1.0), stock=Quantity(1))
+    for product in (restocked, unchanged, oversold):
+        await product_service.create_product(product)
+    missing_id = str(uuid.uuid4())
+    version_before = product_change_log.get_latest_sequence()
+
+    summary = await product_service.adjust_stock([
+        ProductStockAdjustment(product_id=restocked.oid, quantity=20),
+        ProductStockAdjustment(product_id=restocked.oid, quantity=-3, mode="delta"),
+        ProductStockAdjustment(product_id=unchanged.oid, quantity=7),
+        ProductStockAdjustment(product_id=oversold.oid, quantity=-2, mode="delta"),
+        ProductStockAdjustment(product_id=missing_id, quantity=1),
+    ])
+    assert (summary.matched, summary.updated, summary.skipped) == (4, 1, 1)
+    assert set(summary.failed_ids) == {oversold.oid, missing_id}
+    assert "not found" in summary.errors[missing_id]
+
+    batch = await product_service.get_products_by_ids([restocked.oid, unchanged.oid, oversold.oid])
+    assert [item.stock for item in batch.items] == [17, 7, 1]
+    assert [item.version for item in batch.items] == [1, 0, 0]
+    assert product_change_log.get_latest_sequence() == version_before + 1
+
+
+@pytest.mark.asyncio
+async def test_update_without_changes_is_not_written(product_service, product_repository, product_change_log):
+    """
+    Checks that updates which change nothing skip the repository write and the change feed,
+    while a real change marks only the changed fields and bumps the version once.
+    """
+    product = Product(name="Unchanged", category_id=str(uuid.uuid4()), price=Price(9.0), stock=Quantity(3))
+    await product_service.create_product(product)
+    version_before = product_change_log.get_latest_sequence()
+
+    resent = ProductUpdateRequest(name="Unchanged", category_id=product.category_id, price=9.0, stock=3)
+    result = await product_service.update_product(product.oid, resent)
+    await product_service.update_price(product.oid, Price(9.0))
+    assert result.version == 0
+    assert product_change_log.get_latest_sequence() == version_before
+
+    stored = await product_repository.get_by_id(product.oid)
+    stored.name = "Unchanged"
+    stored.price = Price(12.0)
+    assert stored.dirty_fields == {"price"}
+    await product_repository.update(stored)
+    assert stored.dirty_fields == frozenset()
+
+    result = await product_service.update_product(product.oid, ProductUpdateRequest(price=15.0, stock=3))
+    assert result.version == 2
+    assert product_change_log.get_latest_sequence() == version_before + 1
+
+
+@pytest.mark.asyncio
+async def test_sharded_stock_for_hot_product(product_service, product_repository):
+    """
+    Checks that concurrent sales of a sharded product are taken from the counters without writing
+    the product, that stock changes made through regular updates reach the counters, and that the
+    product is written once it sells out and gets its stock back when sharding is turned off.
+    """
+    product = Product(name="Flash sale", category_id=str(uuid.uuid4()), price=Price(5.0), stock=Quantity(50))
+    await product_service.create_product(product)
+    result = await product_service.enable_sharded_stock(product.oid, 4)
+    assert (result.stock, product_service.stock_counter.get_shard_count(product.oid)) == (50, 4)
+
+    await asyncio.gather(*(product_service.sell_product(product.oid, 1) for _ in range(40)))
+    assert (await product_repository.get_by_id(product.oid)).version == 0
+    assert (await product_service.get_product_by_id(product.oid)).stock == 10
+
+    result = await product_service.update_product(product.oid, ProductUpdateRequest(stock=30))
+    assert (result.stock, product_service.stock_counter.get_total(product.oid)) == (30, 30)
+    with pytest.raises(InsufficientStockException):
+        await product_service.sell_product(product.oid, 31)
+
+    await product_service.sell_product(product.oid, 30)
+    stored = await product_repository.get_by_id(product.oid)
+    assert (stored.stock.value, stored.version) == (0, 2)
+
+    await product_service.adjust_stock([ProductStockAdjustment(product_id=product.oid, quantity=7, mode="delta")])
+    result = await product_service.disable_sharded_stock(product.oid)
+    assert (result.stock, product_service.stock_counter.get_total(product.oid)) == (7, None)
+    await product_service.sell_product(product.oid, 2)
+    assert (await product_repository.get_by_id(product.oid)).stock.value == 5
+
+
+@pytest.mark.asyncio
+async def test_sharded_stock_is_published_to_listings_and_change_feed(product_service):
+    """
+    Checks that sales of a sharded product reach the product list and the
+    change feed once the sharded stock is published, and that unchanged stock is not written again.
+    """
+    category_id = str(uuid.uuid4())
+    hot = Product(name="Hot listing", category_id=category_id, price=Price(5.0), stock=Quantity(50))
+    regular = Product(name="Regular listing", category_id=category_id, price=Price(5.0), stock=Quantity(30))
+    for product in (hot, regular):
+        await product_service.create_product(product)
+    await product_service.enable_sharded_stock(hot.oid, 4)
+    await asyncio.gather(*(product_service.sell_product(hot.oid, 1) for _ in range(25)))
+    since = (await product_service.get_changes_since(0)).version
+
+    assert await product_service.publish_sharded_stock() >= 1
+    listed = await product_service.get_available_products(category_id=category_id, sort_by="name")
+    assert [(product.oid, product.stock.value) for product in listed] == [(hot.oid, 25), (regular.oid, 30)]
+    feed = await product_service.get_changes_since(since)
+    assert [(change.product_id, change.product.stock) for change in feed.changes] == [(hot.oid, 25)]
+
+    await product_service.publish_sharded_stock()
+    assert (await product_service.get_changes_since(feed.version)).changes == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sales_are_group_committed(product_service, product_repository, sale_repository, monkeypatch):
+    """
+    Checks that reservations and sales of one product arriving together are taken from the stock with a
+    single product write in arrival order, rejecting only the requests the remaining stock cannot cover,
+    and that the accepted sales are stored with one batch write.
+    """
+    product = Product(name="Burst", category_id=str(uuid.uuid4()), price=Price(4.0), stock=Quantity(10))
+    await product_service.create_product(product)
+    batch_writes = []
+    add_many = sale_repository.add_many
+
+    async def counting_add_many(sales):
+        batch_writes.append(len(sales))
+        return await add_many(sales)
+
+    monkeypatch.setattr(sale_repository, "add_many", counting_add_many)
+
+    results = await asyncio.gather(
+        product_service.sell_product(product.oid, 4),
+        product_service.reserve_product(product.oid, 3),
+        product_service.sell_product(product.oid, 5),
+        product_service.sell_product(product.oid, 2),
+        product_service.sell_product(product.oid, 1),
+        return_exceptions=True,
+    )
+    assert isinstance(results[2], InsufficientStockException)
+    assert results[2].available_stock == 3
+    assert [result for index, result in enumerate(results) if index != 2] == [None] * 4
+
+    stored = await product_repository.get_by_id(product.oid)
+    assert (stored.stock.value, stored.version) == (0, 1)
+    assert batch_writes == [3]
+    assert sorted(sale.quantity for sale in await sale_repository.get_by_product_id(product.oid)) == [1, 2, 4]
+
+
+
+@pytest.mark.asyncio
+async def test_group_commit_fails_only_bad_requests_and_returns_stock(
+        product_service, product_repository, sale_repository, monkeypatch,
+):
+    """
+    Checks that a non-positive quantity is rejected before any stock is taken without failing the
+    other requests of its batch, and that stock taken for sales that could not be stored is returned.
+    """
+    product = Product(name="Burst", category_id=str(uuid.uuid4()), price=Price(4.0), stock=Quantity(10))
+    await product_service.create_product(product)
+
+    results = await asyncio.gather(
+        product_service.sell_product(product.oid, 3),
+        product_service.sell_product(product.oid, 0),
+        product_service.sell_product(product.oid, 2),
+        product_service.reserve_product(product.oid, -4),
+        return_exceptions=True,
+    )
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], InvalidStockQuantityException)
+    assert isinstance(results[3], InvalidStockQuantityException)
+    assert (await product_repository.get_by_id(product.oid)).stock.value == 5
+    assert sorted(sale.quantity for sale in await sale_repository.get_by_product_id(product.oid)) == [2, 3]
+
+    async def failing_add_many(sales):
+        raise RuntimeError("sale storage is unavailable")
+
+    monkeypatch.setattr(sale_repository, "add_many", failing_add_many)
+    results = await asyncio.gather(
+        product_service.sell_product(product.oid, 1),
+        product_service.reserve_product(product.oid, 2),
+        return_exceptions=True,
+    )
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] is None
+    assert (await product_repository.get_by_id(product.oid)).stock.value == 3
+
+
+@pytest.mark.asyncio
+async def test_catalog_snapshot_is_immutable(product_service, product_repository):
+    """
+    Checks that a catalog snapshot keeps showing the versions it was taken at while writers publish
+    new ones, that published versions cannot be modified in place, and that readers share one
+    snapshot until the next write.
+    """
+    product = Product(name="Snapshot", category_id=str(uuid.uuid4()), price=Price(8.0), stock=Quantity(4))
+    await product_service.create_product(product)
+    snapshot = product_repository.get_snapshot()
+    assert product_repository.get_snapshot() is snapshot
+
+    await product_service.sell_product(product.oid, 1)
+    assert snapshot.products[product.oid].stock_value == 4
+    latest = product_repository.get_snapshot()
+    assert latest.version > snapshot.version
+    assert latest.products[product.oid].stock_value == 3
+
+    with pytest.raises(AttributeError):
+        latest.products[product.oid].stock = Quantity(0)
+    with pytest.raises(TypeError):
+        latest.products[product.oid] = product
+    editable = await product_repository.get_by_id(product.oid)
+    editable.stock = Quantity(0)
+    assert editable.dirty_fields == {"stock"}
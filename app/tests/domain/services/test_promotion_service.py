@@ -0,0 +1,177 @@
+# tests/domain/services/test_promotion_service.py
+
+import pytest
+from domain.entities.category import Category
+from domain.entities.product import Product
+from domain.values.price import Price
+from domain.values.quantity import Quantity
+from domain.exceptions.promotion_exceptions import InvalidPromotionPeriodException, PromotionAlreadyEndedException
+from domain.exceptions.promotion_exceptions import PromotionProductsNotUpdatedException
+from presentation.schemas.promotion_schema import PromotionCreateRequest
+from datetime import datetime, timedelta
+import uuid
+
+
+@pytest.mark.asyncio
+async def test_scheduled_promotion_is_activated_and_expired(promotion_service, product_service, category_service):
+    """
+    Verifies that the scheduler applies a promotion to its products and category subtree
+    when it starts, that prices after discount follow it, and that it is removed when it ends.
+    """
+    parent = await category_service.create_category(Category(name="Holiday"))
+    child = await category_service.create_category(Category(name="Holiday lights", parent_category_id=parent.oid))
+    listed = Product(name="Promo listed", category_id=str(uuid.uuid4()), price=Price(100.0), stock=Quantity(1))
+    in_category = Product(name="Promo lights", category_id=child.oid, price=Price(50.0), stock=Quantity(1))
+    untouched = Product(name="Promo other", category_id=str(uuid.uuid4()), price=Price(10.0), stock=Quantity(1))
+    for product in (listed, in_category, untouched):
+        await product_service.create_product(product)
+
+    starts_at = datetime.now() + timedelta(hours=1)
+    promotion = await promotion_service.create_promotion(PromotionCreateRequest(
+        discount_percentage=20,
+        starts_at=starts_at,
+        ends_at=starts_at + timedelta(hours=2),
+        product_ids=[listed.oid],
+        category_id=parent.oid,
+    ))
+    assert promotion.status == "scheduled"
+    assert await promotion_service.process_due_promotions(datetime.now()) == 0
+
+    assert await promotion_service.process_due_promotions(starts_at) == 1
+    assert promotion.status == "active"
+    batch = await product_service.get_products_by_ids([listed.oid, in_category.oid, untouched.oid])
+    assert [item.price_after_discount for item in batch.items] == [80.0, 40.0, 10.0]
+    assert [item.promotion_id for item in batch.items] == [promotion.oid, promotion.oid, None]
+
+    assert await promotion_service.process_due_promotions(starts_at + timedelta(hours=2)) == 1
+    assert promotion.status == "finished"
+    batch = await product_service.get_products_by_ids([listed.oid, in_category.oid])
+    assert [item.price_after_discount for item in batch.items] == [100.0, 50.0]
+
+
+@pytest.mark.asyncio
+async def test_cancel_and_validate_promotion(promotion_service, product_service):
+    """
+    Checks that a running promotion can be cancelled, which removes it from its products,
+    and that invalid periods and repeated cancellation are rejected.
+    """
+    product = Product(name="Promo cancel", category_id=str(uuid.uuid4()), price=Price(30.0), stock=Quantity(1))
+    await product_service.create_product(product)
+
+    now = datetime.now()
+    with pytest.raises(InvalidPromotionPeriodException):
+        await promotion_service.create_promotion(PromotionCreateRequest(
+            discount_percentage=10, starts_at=now, ends_at=now - timedelta(minutes=1), product_ids=[product.oid]
+        ))
+
+    promotion = await promotion_service.create_promotion(PromotionCreateRequest(
+        discount_percentage=50, starts_at=now, ends_at=now + timedelta(days=1), product_ids=[product.oid]
+    ))
+    assert promotion.status == "active"
+    assert (await product_service.get_products_by_ids([product.oid])).items[0].price_after_discount == 15.0
+
+    await promotion_service.cancel_promotion(promotion.oid)
+    assert promotion.status == "cancelled"
+    assert (await product_service.get_products_by_ids([product.oid])).items[0].price_after_discount == 30.0
+    with pytest.raises(PromotionAlreadyEndedException):
+        await promotion_service.cancel_promotion(promotion.oid)
+    await promotion_service.process_due_promotions(now + timedelta(days=2))
+    assert promotion.status == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_nested_and_overlapping_promotions(promotion_service, product_service):
+    """
+    Checks that a product is discounted by the latest started running promotion and falls back to
+    the promotion still running on it when a nested or overlapping one ends, and that cancelling
+    the current promotion does the same.
+    """
+    product = Product(name="Promo nested", category_id=str(uuid.uuid4()), price=Price(100.0), stock=Quantity(1))
+    await product_service.create_product(product)
+
+    async def current_promotion_id():
+        return (await product_service.get_products_by_ids([product.oid])).items[0].promotion_id
+
+    base = datetime.now() + timedelta(days=1)
+    outer, nested, overlapping, cancelled = [
+        await promotion_service.create_promotion(PromotionCreateRequest(
+            discount_percentage=discount, starts_at=base + timedelta(days=start), ends_at=base + timedelta(days=end),
+            product_ids=[product.oid],
+        ))
+        for discount, start, end in ((10, 0, 30), (30, 9, 14), (20, 12, 20), (50, 22, 24))
+    ]
+
+    await promotion_service.process_due_promotions(base)
+    assert await current_promotion_id() == outer.oid
+    await promotion_service.process_due_promotions(base + timedelta(days=12))
+    assert (nested.status, overlapping.status) == ("active", "active")
+    assert await current_promotion_id() == overlapping.oid
+    await promotion_service.process_due_promotions(base + timedelta(days=14))
+    assert nested.status == "finished"
+    assert await current_promotion_id() == overlapping.oid
+    await promotion_service.process_due_promotions(base + timedelta(days=20))
+    assert await current_promotion_id() == outer.oid
+    assert (await product_service.get_products_by_ids([product.oid])).items[0].price_after_discount == 90.0
+
+    await promotion_service.process_due_promotions(base + timedelta(days=22))
+    assert await current_promotion_id() == cancelled.oid
+    await promotion_service.cancel_promotion(cancelled.oid)
+    assert await current_promotion_id() == outer.oid
+    await promotion_service.process_due_promotions(base + timedelta(days=30))
+    assert await current_promotion_id() is None
+
+
+@pytest.mark.asyncio
+async def test_promotion_is_retried_when_products_are_not_updated(promotion_service, product_service, monkeypatch):
+    """
+    Checks that a promotion whose products could not be written (version conflicts on every attempt)
+    stays scheduled and is applied by the next scheduler run.
+    """
+    product = Product(name="Promo retried", category_id=str(uuid.uuid4()), price=Price(40.0), stock=Quantity(1))
+    await product_service.create_product(product)
+    starts_at = datetime.now() + timedelta(hours=1)
+    promotion = await promotion_service.create_promotion(PromotionCreateRequest(
+        discount_percentage=25, starts_at=starts_at, ends_at=starts_at + timedelta(hours=1), product_ids=[product.oid]
+    ))
+
+    async def conflicting_update_many(products):
+        return []
+
+    with monkeypatch.context() as patch:
+        patch.setattr(product_service.product_repository, "update_many", conflicting_update_many)
+        await promotion_service.process_due_promotions(starts_at)
+    assert promotion.status == "scheduled"
+    assert (await product_service.get_products_by_ids([product.oid])).items[0].promotion_id is None
+
+    await promotion_service.process_due_promotions(starts_at)
+    assert promotion.status == "active"
+    assert (await product_service.get_products_by_ids([product.oid])).items[0].price_after_discount == 30.0
+
+
+@pytest.mark.asyncio
+async def test_cancel_is_retried_when_products_are_not_updated(promotion_service, product_service, monkeypatch):
+    """
+    Checks that cancelling a running promotion whose products could not be written keeps it active
+    with its discount, and that cancelling again removes it.
+    """
+    product = Product(name="Promo cancel retried", category_id=str(uuid.uuid4()), price=Price(40.0), stock=Quantity(1))
+    await product_service.create_product(product)
+    promotion = await promotion_service.create_promotion(PromotionCreateRequest(
+        discount_percentage=25, starts_at=datetime.now(), ends_at=datetime.now() + timedelta(hours=1),
+        product_ids=[product.oid],
+    ))
+    assert promotion.status == "active"
+
+    async def conflicting_update_many(products):
+        return []
+
+    with monkeypatch.context() as patch:
+        patch.setattr(product_service.product_repository, "update_many", conflicting_update_many)
+        with pytest.raises(PromotionProductsNotUpdatedException):
+            await promotion_service.cancel_promotion(promotion.oid)
+    assert promotion.status == "active"
+    assert (await product_service.get_products_by_ids([product.oid])).items[0].promotion_id == promotion.oid
+
+    await promotion_service.cancel_promotion(promotion.oid)
+    assert promotion.status == "cancelled"
+    assert (await product_service.get_products_by_ids([product.oid])).items[0].price_after_discount == 40.0
@@ -1,7 +1,14 @@
 # tests/domain/services/test_reservation_service.py
 
 import pytest
-from domain.exceptions.reservation_exceptions import ReservationNotFoundException
+from domain.exceptions.reservation_exceptions import (
+    ReservationNotFoundException,
+    CannotCancelReservationException,
+    CannotCheckoutReservationException,
+)
+from domain.entities.product import Product
+from domain.values.price import Price
+from domain.values.quantity import Quantity
 import uuid
 
 from infrastructure.converters.reservation_converters import convert_reservation_to_response
@@ -48,3 +55,49 @@ async def test_get_nonexistent_reservation(reservation_service):
     non_existent_reservation_id = str(uuid.uuid4())
     with pytest.raises(ReservationNotFoundException):
         await reservation_service.get_reservation_by_id(non_existent_reservation_id)
+
+
+@pytest.mark.asyncio
+async def test_checkout_reservation(reservation_service, product_service, product_repository, reservation_repository):
+    """
+    Checks that checking out a reservation records a sale at the product's price without taking the
+    stock again, and that a completed reservation can neither be checked out again nor cancelled.
+    """
+    product = Product(name="Checkout", category_id=str(uuid.uuid4()), price=Price(20.0), stock=Quantity(5))
+    await product_service.create_product(product)
+    await product_service.reserve_product(product.oid, 3)
+    reservation = reservation_repository.get_by_product_id(product.oid)[0]
+
+    sale = await reservation_service.checkout_reservation(reservation.oid)
+    assert (sale.product_id, sale.quantity, sale.unit_price) == (product.oid, 3, 20.0)
+    assert (await reservation_service.get_reservation_by_id(reservation.oid)).status == "completed"
+    assert (await product_repository.get_by_id(product.oid)).stock.value == 2
+
+    with pytest.raises(CannotCheckoutReservationException):
+        await reservation_service.checkout_reservation(reservation.oid)
+    with pytest.raises(CannotCancelReservationException):
+        await product_service.cancel_reservation(reservation.oid)
+    assert (await product_repository.get_by_id(product.oid)).stock.value == 2
+
+
+@pytest.mark.asyncio
+async def test_reserved_quantities_follow_reservations(reservation_service, product_service, reservation_repository):
+    """
+    Checks that the per-product reserved total and the index of active reservations are updated
+    when reservations are created, checked out and cancelled, and that the product reports the total.
+    """
+    product = Product(name="Reserved", category_id=str(uuid.uuid4()), price=Price(3.0), stock=Quantity(10))
+    await product_service.create_product(product)
+    await product_service.reserve_product(product.oid, 2)
+    await product_service.reserve_product(product.oid, 3)
+    assert await reservation_service.get_reserved_quantities([product.oid]) == {product.oid: 5}
+    assert (await product_service.get_product_by_id(product.oid)).reserved_quantity == 5
+
+    first, second = reservation_repository.get_active_by_product_id(product.oid)
+    await reservation_service.checkout_reservation(first.oid)
+    assert [reservation.oid for reservation in reservation_repository.get_active_by_product_id(product.oid)] == [second.oid]
+    await product_service.cancel_reservation(second.oid)
+
+    batch = await product_service.get_products_by_ids([product.oid])
+    assert (batch.items[0].stock, batch.items[0].reserved_quantity) == (8, 0)
+    assert await reservation_service.get_active_reservations_by_product(product.oid) == []
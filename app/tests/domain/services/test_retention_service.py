@@ -0,0 +1,207 @@
+# tests/domain/services/test_retention_service.py
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from domain.entities.sale import Sale
+from domain.exceptions.sale_exceptions import SaleNotFoundException
+from domain.services.retention_service import RetentionService, RetentionPolicy
+from infrastructure.archive.columnar_sale_archive import ColumnarSaleArchive
+from infrastructure.repositories.in_memory.in_memory_sale_repository import InMemorySaleRepository
+from infrastructure.repositories.in_memory.in_memory_reservation_repository import InMemoryReservationRepository
+
+
+@pytest.mark.asyncio
+async def test_closed_reservations_are_purged_after_grace_period(reservation_service, reservation_repository):
+    """
+    Checks that cancelled reservations are kept during the grace period and purged after it,
+    while active reservations stay.
+    """
+    product_id = str(uuid.uuid4())
+    cancelled = await reservation_service.create_reservation({"product_id": product_id, "quantity": 1})
+    active = await reservation_service.create_reservation({"product_id": product_id, "quantity": 2})
+    await reservation_service.cancel_reservation(cancelled.oid)
+    retention_service = RetentionService(
+        reservation_repository, InMemorySaleRepository(), RetentionPolicy(batch_size=2)
+    )
+
+    await retention_service.apply_retention(now=datetime.now() + timedelta(hours=1))
+    assert cancelled.oid in reservation_repository.reservations
+
+    purged, _ = await retention_service.apply_retention(now=datetime.now() + timedelta(days=2))
+    assert purged >= 1
+    assert cancelled.oid not in reservation_repository.reservations
+    assert reservation_repository.get_by_id(active.oid).status == "reserved"
+
+
+@pytest.mark.asyncio
+async def test_old_sales_are_archived_and_compacted_into_daily_rollups(tmp_path):
+    """
+    Checks that sales older than the retention period are written to the archive, removed from
+    memory and folded into daily per-product rollups, in batches, while recent sales are kept as
+    they are and date range reads still return the archived ones.
+    """
+    sale_repository = InMemorySaleRepository(ColumnarSaleArchive(str(tmp_path)))
+    retention_service = RetentionService(
+        InMemoryReservationRepository(),
+        sale_repository,
+        RetentionPolicy(sale_retention_period=timedelta(days=90), batch_size=2),
+    )
+    old_day = datetime.now() - timedelta(days=100)
+    first_id, second_id = str(uuid.uuid4()), str(uuid.uuid4())
+    for product_id, quantity, unit_price in ((first_id, 2, 5.0), (first_id, 3, 4.0), (second_id, 1, 10.0)):
+        await sale_repository.add(Sale(product_id=product_id, quantity=quantity, sale_date=old_day,
+                                       category_id="food", unit_price=unit_price))
+    recent = await sale_repository.add(Sale(product_id=first_id, quantity=7))
+
+    _, compacted = await retention_service.apply_retention()
+    assert compacted == 3
+    assert await sale_repository.get_all() == [recent]
+    assert await sale_repository.get_sales_before(datetime.now(), 10) == [recent]
+
+    rollups = await sale_repository.get_daily_rollups(old_day.date(), old_day.date(), product_id=first_id)
+    assert [(rollup.quantity, rollup.revenue, rollup.sales_count) for rollup in rollups] == [(5, 22.0, 2)]
+    assert len(await sale_repository.get_daily_rollups(None, None, category_id="food")) == 2
+
+    sales = await sale_repository.get_sales_between_dates(old_day - timedelta(days=1), None, "food")
+    assert sorted(sale.quantity for sale in sales) == [1, 2, 3]
+    assert sorted(sale.quantity for sale in await sale_repository.get_by_product_id(first_id)) == [2, 3, 7]
+
+
+@pytest.mark.asyncio
+async def test_archive_reads_skip_blocks_by_zone_maps(tmp_path):
+    """
+    Checks that every compaction batch becomes one archived block, that reads decompress only
+    the blocks whose date range, categories and product ids may match, and that a new archive
+    opened on the same directory sees the same blocks.
+    """
+    archive = ColumnarSaleArchive(str(tmp_path))
+    sale_repository = InMemorySaleRepository(archive)
+    retention_service = RetentionService(
+        InMemoryReservationRepository(),
+        sale_repository,
+        RetentionPolicy(sale_retention_period=timedelta(days=90), batch_size=10),
+    )
+    first_day, second_day = datetime(2024, 1, 10, 12, 30), datetime(2024, 3, 5, 9, 15)
+    first_id, second_id = str(uuid.uuid4()), str(uuid.uuid4())
+    await sale_repository.add(Sale(product_id=first_id, quantity=1, sale_date=first_day, category_id="food"))
+    await retention_service.apply_retention()
+    await sale_repository.add(Sale(product_id=second_id, quantity=2, sale_date=second_day, category_id="drinks"))
+    await retention_service.apply_retention()
+
+    assert [zone_map.rows for zone_map in archive.zone_maps] == [1, 1]
+    january = (datetime(2024, 1, 1), datetime(2024, 1, 31))
+    assert [zone_map.may_match(*january, None, None) for zone_map in archive.zone_maps] == [True, False]
+    assert [zone_map.may_match(None, None, "drinks", None) for zone_map in archive.zone_maps] == [False, True]
+    assert [zone_map.may_match(None, None, None, second_id) for zone_map in archive.zone_maps] == [False, True]
+
+    sales = await sale_repository.get_sales_between_dates(*january)
+    assert [(sale.product_id, sale.quantity, sale.sale_date) for sale in sales] == [(first_id, 1, first_day)]
+    reopened = await ColumnarSaleArchive(str(tmp_path)).read(category_id="drinks")
+    assert [(sale.product_id, sale.sale_date) for sale in reopened] == [(second_id, second_day)]
+
+
+@pytest.mark.asyncio
+async def test_sales_are_not_compacted_by_default():
+    """
+    Checks that without a sale retention period old sales stay in the sales report.
+    """
+    sale_repository = InMemorySaleRepository()
+    retention_service = RetentionService(InMemoryReservationRepository(), sale_repository, RetentionPolicy())
+    old = await sale_repository.add(Sale(product_id=str(uuid.uuid4()), quantity=1,
+                                         sale_date=datetime.now() - timedelta(days=400)))
+
+    assert await retention_service.apply_retention() == (0, 0)
+    assert await sale_repository.get_sales_between_dates(None, None) == [old]
+
+
+@pytest.mark.asyncio
+async def test_partitions_behind_cutoff_are_dropped_whole_and_totals_keep_rollups():
+    """
+    Checks that a partition entirely behind the retention cutoff is dropped as a whole, that
+    lookups by id follow the sales left in memory, and that without the archive sales totals
+    still count the compacted days through their rollups.
+    """
+    sale_repository = InMemorySaleRepository()
+    retention_service = RetentionService(
+        InMemoryReservationRepository(),
+        sale_repository,
+        RetentionPolicy(sale_retention_period=timedelta(days=90), batch_size=1),
+    )
+    product_id = str(uuid.uuid4())
+    january, february = datetime(2024, 1, 10, 12), datetime(2024, 2, 20, 9)
+    old = [
+        await sale_repository.add(Sale(product_id=product_id, quantity=quantity, sale_date=january,
+                                       category_id="food", unit_price=2.0))
+        for quantity in (1, 2, 3)
+    ]
+    recent = await sale_repository.add(Sale(product_id=product_id, quantity=4, sale_date=february,
+                                            category_id="food", unit_price=2.0))
+
+    compacted = await sale_repository.compact_partitions_before(datetime(2024, 2, 1))
+    assert compacted == 3
+    assert sale_repository.partition_starts == [datetime(2024, 2, 1)]
+    assert await sale_repository.get_by_id(recent.oid) is recent
+    with pytest.raises(SaleNotFoundException):
+        await sale_repository.get_by_id(old[0].oid)
+
+    totals = await sale_repository.get_sales_totals(datetime(2024, 1, 1), datetime(2024, 2, 29, 23, 59), "food")
+    assert (totals.quantity, totals.revenue, totals.sales_count) == (10, 20.0, 4)
+    # a range covering only part of a compacted day cannot use its rollup
+    partial = await sale_repository.get_sales_totals(datetime(2024, 1, 10, 13), None, "food")
+    assert (partial.quantity, partial.sales_count) == (4, 1)
+
+    _, compacted = await retention_service.apply_retention(now=datetime(2024, 6, 1))
+    assert compacted == 1
+    assert await sale_repository.get_all() == []
+
+
+@pytest.mark.asyncio
+async def test_partition_changed_while_archived_is_not_archived_twice(tmp_path):
+    """
+    Checks that when a sale lands in a partition while the partition is being archived, the
+    archived sales are removed one by one without being written to the archive again, so
+    totals match the report, and that the late sale is compacted on the next pass.
+    """
+    archive = ColumnarSaleArchive(str(tmp_path))
+    sale_repository = InMemorySaleRepository(archive)
+    product_id = str(uuid.uuid4())
+    january = datetime(2024, 1, 10, 12)
+    for quantity in (1, 2, 3):
+        await sale_repository.add(Sale(product_id=product_id, quantity=quantity, sale_date=january))
+    late = Sale(product_id=product_id, quantity=1, sale_date=january)
+    write = archive.write
+
+    async def write_while_a_sale_arrives(sales):
+        await write(sales)
+        await sale_repository.add(late)
+
+    archive.write = write_while_a_sale_arrives
+    # the late sale is behind the cutoff as well and is archived on the next pass
+    assert await sale_repository.compact_partitions_before(datetime(2024, 2, 1)) == 4
+    archive.write = write
+
+    assert [zone_map.rows for zone_map in archive.zone_maps] == [3, 1]
+    assert await sale_repository.get_all() == []
+    report = await sale_repository.get_sales_between_dates(None, None)
+    totals = await sale_repository.get_sales_totals(None, None)
+    assert (totals.quantity, totals.sales_count) == (sum(sale.quantity for sale in report), len(report)) == (7, 4)
+
+
+@pytest.mark.asyncio
+async def test_torn_zone_map_record_is_cut_off(tmp_path):
+    """
+    Checks that a torn last zone map record left by a crash is cut off when the archive is opened,
+    so blocks written afterwards stay readable after a restart.
+    """
+    product_id = str(uuid.uuid4())
+    sale_date = datetime(2024, 1, 10, 12)
+    await ColumnarSaleArchive(str(tmp_path)).write([Sale(product_id=product_id, quantity=1, sale_date=sale_date)])
+    with open(tmp_path / "sales.zones", "a") as zones_file:
+        zones_file.write('{"offset": 12')
+
+    archive = ColumnarSaleArchive(str(tmp_path))
+    await archive.write([Sale(product_id=product_id, quantity=2, sale_date=sale_date)])
+    reopened = await ColumnarSaleArchive(str(tmp_path)).read(product_id=product_id)
+    assert sorted(sale.quantity for sale in reopened) == [1, 2]
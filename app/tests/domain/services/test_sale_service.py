@@ -1,10 +1,19 @@
 # tests/domain/services/test_sale_service.py
 
 import pytest
-from domain.services.sale_service import SaleService
+from domain.services.sale_service import SaleService, SALES_REPORT_CLOSE_GRACE
 from domain.entities.sale import Sale
-from domain.exceptions.sale_exceptions import SaleNotFoundException
-from datetime import datetime, timedelta
+from domain.entities.product import Product
+from domain.values.price import Price
+from domain.values.quantity import Quantity
+from infrastructure.analytics.in_memory_best_seller_tracker import InMemoryBestSellerTracker
+from infrastructure.journal import file_sale_journal
+from infrastructure.journal.file_sale_journal import FileSaleJournal
+from infrastructure.repositories.in_memory.in_memory_sale_repository import InMemorySaleRepository
+from domain.exceptions.sale_exceptions import SaleNotFoundException, InvalidSalesReportPeriodException
+from datetime import datetime, timedelta, timezone
+import asyncio
+import os
 import uuid
 
 
@@ -57,3 +66,227 @@ async def test_get_nonexistent_sale(sale_service):
     non_existent_sale_id = str(uuid.uuid4())
     with pytest.raises(SaleNotFoundException):
         await sale_service.get_by_id(non_existent_sale_id)
+
+
+@pytest.mark.asyncio
+async def test_sales_report_by_category(sale_service, product_service):
+    """
+    Verifies that a sale captures the product's category and discounted price, so a
+    category report returns it without looking the product up again.
+    """
+    category_id = str(uuid.uuid4())
+    product = Product(
+        name="Categorized Product",
+        category_id=category_id,
+        price=Price(50.0),
+        stock=Quantity(10)
+    )
+    await product_service.create_product(product)
+    await product_service.start_promotion(product_id=product.oid, discount_percentage=10.0)
+    await product_service.sell_product(product_id=product.oid, quantity=2)
+    await sale_service.record_sale({"product_id": product.oid, "quantity": 1})
+    await sale_service.record_sale({"product_id": str(uuid.uuid4()), "quantity": 1})
+
+    sales = await sale_service.get_sales_report(category_id=category_id)
+    assert [sale.quantity for sale in sales] == [2, 1]
+    assert all(sale.category_id == category_id for sale in sales)
+    assert all(sale.unit_price == 45.0 for sale in sales)
+
+
+@pytest.mark.asyncio
+async def test_get_best_sellers(sale_service, product_service):
+    """
+    Checks that best sellers are ranked by sold quantity, overall and per category,
+    from counters updated when sales are recorded.
+    """
+    category_id = str(uuid.uuid4())
+    products = []
+    for index in range(3):
+        product = Product(
+            name=f"Best Seller {index}",
+            category_id=category_id,
+            price=Price(10.0),
+            stock=Quantity(100)
+        )
+        await product_service.create_product(product)
+        products.append(product)
+
+    for product, quantity in zip(products, [5, 50, 20]):
+        await product_service.sell_product(product_id=product.oid, quantity=quantity)
+
+    top = await sale_service.get_best_sellers(window="day", limit=2, category_id=category_id)
+    assert [(item.product_id, item.quantity) for item in top] == [(products[1].oid, 50), (products[2].oid, 20)]
+    assert all(item.exact for item in top)
+
+
+def test_best_seller_tracker_window_and_bounded_memory():
+    """
+    Ensures that sales older than the window are not counted and that the per-bucket
+    counters stay bounded while still keeping the heavy hitters.
+    """
+    tracker = InMemoryBestSellerTracker(capacity_per_bucket=3)
+    now = datetime(2024, 5, 1, 12, 30)
+    tracker.record(Sale(product_id="old", quantity=1000, sale_date=now - timedelta(hours=2)))
+    tracker.record(Sale(product_id="hot", quantity=100, sale_date=now))
+    for index in range(10):
+        tracker.record(Sale(product_id=f"tail-{index}", quantity=1, sale_date=now))
+
+    top = tracker.get_top("hour", limit=1, now=now)
+    assert top == [("hot", 100, True)]
+    assert all(product_id != "old" for product_id, _, _ in tracker.get_top("hour", limit=10, now=now))
+    bucket = tracker.windows["hour"].overall[(int(now.timestamp()) // 60) % 60]
+    assert len(bucket.counts) == 3
+
+
+@pytest.mark.asyncio
+async def test_write_behind_sales_survive_restart(product_repository, tmp_path):
+    """
+    Checks that with the sale journal enabled sales are acknowledged once journaled, are loaded
+    again by a reopened journal (a torn last record is dropped), and reach the repository and the
+    best seller counters when the journal is drained.
+    """
+    path = str(tmp_path / "sales.journal")
+    sale_repository = InMemorySaleRepository()
+    tracker = InMemoryBestSellerTracker()
+    journal = FileSaleJournal(path)
+    sale_service = SaleService(sale_repository, product_repository, tracker, journal)
+    product_id = str(uuid.uuid4())
+
+    sales = await asyncio.gather(*(
+        sale_service.record_sale({"product_id": product_id, "quantity": quantity}) for quantity in (1, 2, 3)
+    ))
+    assert await sale_repository.get_all() == []
+    assert journal.get_pending_count() == 3
+    journal.close()
+    with open(path, "ab") as journal_file:
+        journal_file.write(b'{"id": "torn')
+
+    journal = FileSaleJournal(path)
+    sale_service = SaleService(sale_repository, product_repository, tracker, journal)
+    assert [sale.oid for sale in journal.peek(10)] == [str(sale.oid) for sale in sales]
+    assert await sale_service.drain_sale_journal(batch_size=2) == 3
+    assert sorted(sale.quantity for sale in await sale_repository.get_by_product_id(product_id)) == [1, 2, 3]
+    assert tracker.get_top("hour", 1)[0][:2] == (product_id, 6)
+    journal.close()
+
+    journal = FileSaleJournal(path)
+    assert journal.get_pending_count() == 0
+    journal.close()
+
+
+@pytest.mark.asyncio
+async def test_journal_is_not_truncated_under_waiting_append(tmp_path, monkeypatch):
+    """
+    Checks that a drain running after an fsync but before the appender waiting for it resumes
+    does not truncate the journal under that appender, and that the journal is truncated later.
+    """
+    monkeypatch.setattr(file_sale_journal, "JOURNAL_COMPACTION_BYTES", 1)
+    journal = FileSaleJournal(str(tmp_path / "sales.journal"))
+    sync = journal._sync
+
+    async def sync_then_drain():
+        await sync()
+        journal.acknowledge(len(journal.peek(100)))
+
+    monkeypatch.setattr(journal, "_sync", sync_then_drain)
+    await asyncio.wait_for(journal.append([Sale(product_id=str(uuid.uuid4()), quantity=1)]), timeout=1)
+    assert journal.get_pending_count() == 0
+    assert os.path.getsize(journal.path) > 0
+
+    monkeypatch.setattr(journal, "_sync", sync)
+    await journal.append([Sale(product_id=str(uuid.uuid4()), quantity=2)])
+    journal.acknowledge(len(journal.peek(100)))
+    assert os.path.getsize(journal.path) == 0
+    journal.close()
+
+
+@pytest.mark.asyncio
+async def test_sales_are_partitioned_by_month(product_repository):
+    """
+    Checks that sales are stored in month partitions, that date range reads and totals only visit
+    the overlapping partitions, that totals of a closed partition are cached and invalidated by a
+    late sale, and that a partition emptied by retention is dropped.
+    """
+    sale_repository = InMemorySaleRepository()
+    sale_service = SaleService(sale_repository, product_repository, InMemoryBestSellerTracker(), FileSaleJournal())
+    for sale_date, quantity in ((datetime(2024, 1, 31, 23, 0), 1), (datetime(2024, 2, 1), 2), (datetime(2024, 3, 15), 4)):
+        await sale_repository.add(Sale(product_id=str(uuid.uuid4()), quantity=quantity, sale_date=sale_date,
+                                       category_id="food", unit_price=2.5))
+    assert sale_repository.partition_starts == [datetime(2024, 1, 1), datetime(2024, 2, 1), datetime(2024, 3, 1)]
+
+    february = (datetime(2024, 2, 1), datetime(2024, 2, 29, 23, 59))
+    assert [sale.quantity for sale in await sale_repository.get_sales_between_dates(*february)] == [2]
+    assert [partition.start for partition in sale_repository._get_partitions(*february)] == [datetime(2024, 2, 1)]
+
+    summary = await sale_service.get_sales_summary(datetime(2024, 1, 1), None, "food")
+    assert (summary.quantity, summary.revenue, summary.sales_count) == (7, 17.5, 3)
+    assert "food" in sale_repository.partitions[datetime(2024, 2, 1)].cached_totals
+    await sale_repository.add(Sale(product_id=str(uuid.uuid4()), quantity=8, sale_date=datetime(2024, 2, 10),
+                                   category_id="food"))
+    assert not sale_repository.partitions[datetime(2024, 2, 1)].cached_totals
+    summary = await sale_service.get_sales_summary(*february, "food")
+    assert (summary.quantity, summary.sales_count) == (10, 2)
+
+    await sale_repository.compact(await sale_repository.get_sales_before(datetime(2024, 2, 29), 10))
+    assert sale_repository.partition_starts == [datetime(2024, 3, 1)]
+    assert [sale.quantity for sale in await sale_repository.get_all()] == [4]
+
+
+@pytest.mark.asyncio
+async def test_closed_summary_buckets_are_cached(product_repository, tmp_path):
+    """
+    Checks that a summary with granularity returns one bucket per day, that totals of past buckets
+    are cached while the open bucket is recomputed, and that a late journaled sale drops the cached
+    bucket it falls into.
+    """
+    sale_repository = InMemorySaleRepository()
+    journal = FileSaleJournal(str(tmp_path / "sales.journal"))
+    sale_service = SaleService(sale_repository, product_repository, InMemoryBestSellerTracker(), journal)
+    yesterday = datetime.now() - timedelta(days=1)
+    await sale_repository.add(Sale(product_id=str(uuid.uuid4()), quantity=2, sale_date=yesterday))
+
+    summary = await sale_service.get_sales_summary(yesterday - timedelta(hours=1), granularity="day")
+    assert [bucket.closed for bucket in summary.buckets][-1] is False
+    assert all(bucket.closed for bucket in summary.buckets[:-1])
+    assert (summary.quantity, summary.closed) == (2, False)
+
+    # sales written past the service are not seen in closed buckets until the cache is invalidated,
+    # but the open bucket is always recomputed
+    await sale_repository.add(Sale(product_id=str(uuid.uuid4()), quantity=3, sale_date=yesterday))
+    await sale_repository.add(Sale(product_id=str(uuid.uuid4()), quantity=4))
+    summary = await sale_service.get_sales_summary(yesterday - timedelta(hours=1), granularity="day")
+    assert summary.quantity == 6
+
+    await journal.append([Sale(product_id=str(uuid.uuid4()), quantity=5, sale_date=yesterday)])
+    await sale_service.drain_sale_journal()
+    summary = await sale_service.get_sales_summary(yesterday - timedelta(hours=1), granularity="day")
+    assert summary.quantity == 14
+    journal.close()
+
+    with pytest.raises(InvalidSalesReportPeriodException):
+        await sale_service.get_sales_summary(granularity="month")
+
+
+@pytest.mark.asyncio
+async def test_period_is_closed_after_grace_and_journal_drain(product_repository, tmp_path):
+    """
+    Checks that a period counts as closed only once its grace window has passed and the sale
+    journal has no pending sales, and that dates with a UTC offset are accepted.
+    """
+    journal = FileSaleJournal(str(tmp_path / "sales.journal"))
+    sale_service = SaleService(InMemorySaleRepository(), product_repository, InMemoryBestSellerTracker(), journal)
+    now = datetime.now()
+
+    assert not sale_service.is_period_closed(None, now)
+    assert not sale_service.is_period_closed(now - SALES_REPORT_CLOSE_GRACE / 2, now)
+    assert sale_service.is_period_closed(now - SALES_REPORT_CLOSE_GRACE * 2, now)
+
+    await journal.append([Sale(product_id=str(uuid.uuid4()), quantity=1, sale_date=now - timedelta(days=1))])
+    assert not sale_service.is_period_closed(now - SALES_REPORT_CLOSE_GRACE * 2, now)
+    await sale_service.drain_sale_journal()
+    assert sale_service.is_period_closed(now - SALES_REPORT_CLOSE_GRACE * 2, now)
+
+    start = (now - timedelta(days=2)).astimezone(timezone.utc)
+    summary = await sale_service.get_sales_summary(start, granularity="day")
+    assert summary.quantity == 1
+    journal.close()
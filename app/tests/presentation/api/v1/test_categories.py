@@ -82,3 +82,29 @@ async def test_delete_category(async_client: AsyncClient):
     # Try to retrieve the deleted category
     get_response = await async_client.get(f"/api/v1/categories/{category_id}/")
     assert get_response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_list_categories_with_counts(async_client: AsyncClient):
+    """Test that include_counts adds own and subtree counts of available products."""
+    response = await async_client.post("/api/v1/categories/", json={"name": "Garden"})
+    parent_id = response.json()["id"]
+    response = await async_client.post(
+        "/api/v1/categories/", json={"name": "Tools", "parent_category_id": parent_id}
+    )
+    child_id = response.json()["id"]
+    await async_client.post(
+        "/api/v1/products/", json={"name": "Rake", "category_id": child_id, "price": 15.0, "stock": 4}
+    )
+
+    response = await async_client.get("/api/v1/categories/", params={"include_counts": "true"})
+    assert response.status_code == 200
+    counts = {
+        item["id"]: (item["available_products"], item["subtree_available_products"])
+        for item in response.json()
+    }
+    assert counts[parent_id] == (0, 1)
+    assert counts[child_id] == (1, 1)
+
+    response = await async_client.get("/api/v1/categories/")
+    assert all(item["available_products"] is None for item in response.json())
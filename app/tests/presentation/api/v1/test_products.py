@@ -1,7 +1,10 @@
 # app/tests/presentation/api/v1/test_products.py
 
+import json
 import pytest
 import uuid
+from fastapi import Request
+from presentation.api.v1.endpoints import products
 
 
 @pytest.mark.asyncio
@@ -110,3 +113,325 @@ async def test_delete_product(async_client):
 
     response = await async_client.get(f"/api/v1/products/{product_id}/")
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_product_changes(async_client):
+    """
+    Verifies that the change feed endpoint returns only the changes made after the
+    requested version and asks for a full resync when the version is unknown.
+    """
+    since = (await async_client.get("/api/v1/products/changes/")).json()["version"]
+    product_data = {
+        "name": "Feed Product",
+        "category_id": str(uuid.uuid4()),
+        "price": 10.0,
+        "stock": 5
+    }
+    create_response = await async_client.post("/api/v1/products/", json=product_data)
+    product_id = create_response.json()["id"]
+
+    response = await async_client.get("/api/v1/products/changes/", params={"since": since})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["resync_required"] is False
+    assert [change["product_id"] for change in data["changes"]] == [product_id]
+    assert data["changes"][0]["product"]["name"] == product_data["name"]
+
+    response = await async_client.get("/api/v1/products/changes/", params={"since": data["version"] + 100})
+    assert response.json()["resync_required"] is True
+
+
+@pytest.mark.asyncio
+async def test_update_product_with_if_match(async_client):
+    """
+    Ensures that the product ETag can be used as an If-Match precondition: an update with
+    the current version succeeds, while a stale version is rejected with 412.
+    """
+    product_data = {
+        "name": "Versioned Product",
+        "category_id": str(uuid.uuid4()),
+        "price": 100.0,
+        "stock": 10
+    }
+    create_response = await async_client.post("/api/v1/products/", json=product_data)
+    product_id = create_response.json()["id"]
+
+    get_response = await async_client.get(f"/api/v1/products/{product_id}/")
+    etag = get_response.headers["ETag"]
+    assert etag == '"0"'
+
+    response = await async_client.put(
+        f"/api/v1/products/{product_id}/", json={"price": 120.0}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["price"] == 120.0
+    assert response.headers["ETag"] == '"1"'
+
+    response = await async_client.put(
+        f"/api/v1/products/{product_id}/", json={"price": 130.0}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 412
+
+
+@pytest.mark.asyncio
+async def test_batch_get_products(async_client):
+    """
+    Verifies that several products can be fetched in one request and that unknown
+    identifiers are returned in `missing_ids`.
+    """
+    product_ids = []
+    for index in range(3):
+        product_data = {
+            "name": f"Batch Product {index}",
+            "category_id": str(uuid.uuid4()),
+            "price": 10.0,
+            "stock": 1
+        }
+        create_response = await async_client.post("/api/v1/products/", json=product_data)
+        product_ids.append(create_response.json()["id"])
+    missing_id = str(uuid.uuid4())
+
+    response = await async_client.post("/api/v1/products/batch-get/", json={"ids": product_ids + [missing_id]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == product_ids
+    assert data["missing_ids"] == [missing_id]
+
+
+@pytest.mark.asyncio
+async def test_get_products_with_sparse_fields(async_client):
+    """
+    Checks that the `fields` parameter restricts the listing to the requested fields and
+    that unknown field names are rejected.
+    """
+    product_data = {
+        "name": "Sparse Product",
+        "category_id": str(uuid.uuid4()),
+        "price": 10.0,
+        "stock": 3
+    }
+    await async_client.post("/api/v1/products/", json=product_data)
+
+    response = await async_client.get("/api/v1/products/", params={"fields": "id,name,price"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data
+    assert all(set(item) == {"id", "name", "price"} for item in data)
+    assert {"name": "Sparse Product", "price": 10.0} in [
+        {"name": item["name"], "price": item["price"]} for item in data
+    ]
+
+    response = await async_client.get("/api/v1/products/", params={"fields": "id,secret"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_products(async_client):
+    """
+    Ensures that the search endpoint returns products whose names match the query prefix.
+    """
+    marker = uuid.uuid4().hex[:8]
+    product_data = {
+        "name": f"Searchable {marker}",
+        "category_id": str(uuid.uuid4()),
+        "price": 10.0,
+        "stock": 1
+    }
+    create_response = await async_client.post("/api/v1/products/", json=product_data)
+    product_id = create_response.json()["id"]
+
+    response = await async_client.get("/api/v1/products/search/", params={"q": f"search {marker[:4]}"})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [product_id]
+
+
+@pytest.mark.asyncio
+async def test_get_products_price_range_sorted(async_client):
+    """
+    Ensures that the listing filters by category and price range and honours sort_by/order.
+    """
+    category_id = str(uuid.uuid4())
+    for name, price in (("Range A", 30.0), ("Range B", 10.0), ("Range C", 99.0)):
+        await async_client.post(
+            "/api/v1/products/",
+            json={"name": name, "category_id": category_id, "price": price, "stock": 1}
+        )
+
+    response = await async_client.get("/api/v1/products/", params={
+        "category_id": category_id, "min_price": 10, "max_price": 50, "sort_by": "price", "order": "desc"
+    })
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()] == ["Range A", "Range B"]
+
+    response = await async_client.get("/api/v1/products/", params={"sort_by": "stock"})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_product_facets(async_client):
+    """
+    Checks that the facets endpoint counts available products per price bucket and that
+    the listing accepts the same filters.
+    """
+    category_id = str(uuid.uuid4())
+    for name, price in (("Facet A", 8.0), ("Facet B", 75.0), ("Facet C", 60.0)):
+        await async_client.post(
+            "/api/v1/products/",
+            json={"name": name, "category_id": category_id, "price": price, "stock": 1}
+        )
+
+    response = await async_client.get("/api/v1/products/facets/", params={"category_id": category_id})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert data["price_buckets"] == {"0-10": 1, "50-100": 2}
+
+    response = await async_client.get("/api/v1/products/", params={
+        "category_id": category_id, "price_bucket": "50-100", "on_promotion": "false", "sort_by": "price"
+    })
+    assert [item["name"] for item in response.json()] == ["Facet C", "Facet B"]
+
+    response = await async_client.get("/api/v1/products/facets/", params={"price_bucket": "cheap"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_promotion_and_reprice(async_client):
+    """
+    Ensures that bulk endpoints update all products of a category in one request and
+    return a summary.
+    """
+    category_id = str(uuid.uuid4())
+    for name, price in (("Bulk A", 10.0), ("Bulk B", 200.0)):
+        await async_client.post(
+            "/api/v1/products/",
+            json={"name": name, "category_id": category_id, "price": price, "stock": 1}
+        )
+
+    response = await async_client.post(
+        "/api/v1/products/bulk-promotion/", json={"category_id": category_id, "discount_percentage": 10}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"matched": 2, "updated": 2, "skipped": 0, "failed_ids": [], "errors": {}}
+
+    response = await async_client.post(
+        "/api/v1/products/bulk-reprice/",
+        json={"category_id": category_id, "min_price": 100, "price_multiplier": 0.5}
+    )
+    assert response.json()["updated"] == 1
+
+    response = await async_client.get("/api/v1/products/", params={"category_id": category_id, "sort_by": "name"})
+    assert [(item["price"], item["discount"]) for item in response.json()] == [(10.0, 10.0), (100.0, 10.0)]
+
+    response = await async_client.post(
+        "/api/v1/products/bulk-reprice/", json={"category_id": category_id, "price_multiplier": 0}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_adjust_stock(async_client):
+    """
+    Ensures that the stock adjustment endpoint applies changed rows and reports skipped and failed ones.
+    """
+    product_data = {"name": "Warehouse item", "category_id": str(uuid.uuid4()), "price": 5.0, "stock": 10}
+    product_id = (await async_client.post("/api/v1/products/", json=product_data)).json()["id"]
+    unchanged_id = (await async_client.post("/api/v1/products/", json=product_data)).json()["id"]
+
+    response = await async_client.post("/api/v1/products/stock-adjustments/", json={"items": [
+        {"product_id": product_id, "quantity": 4, "mode": "delta"},
+        {"product_id": unchanged_id, "quantity": 10},
+        {"product_id": str(uuid.uuid4()), "quantity": 1},
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["updated"], data["skipped"], len(data["failed_ids"])) == (1, 1, 1)
+
+    response = await async_client.get(f"/api/v1/products/{product_id}/")
+    assert response.json()["stock"] == 14
+
+    response = await async_client.post("/api/v1/products/stock-adjustments/", json={"items": [
+        {"product_id": product_id, "quantity": 1, "mode": "set"}
+    ]})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_update_product_without_changes_keeps_version(async_client):
+    """
+    Ensures that resending unchanged product data does not create a new version.
+    """
+    product_data = {"name": "Resent", "category_id": str(uuid.uuid4()), "price": 3.0, "stock": 2}
+    product_id = (await async_client.post("/api/v1/products/", json=product_data)).json()["id"]
+
+    response = await async_client.put(f"/api/v1/products/{product_id}/", json=product_data)
+    assert response.status_code == 200
+    assert response.json()["version"] == 0
+
+    response = await async_client.put(f"/api/v1/products/{product_id}/", json={**product_data, "stock": 5})
+    assert response.json()["version"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sharded_stock(async_client):
+    """
+    Ensures that a product can be switched to sharded stock, sold from it and switched back.
+    """
+    product_data = {"name": "Hot item", "category_id": str(uuid.uuid4()), "price": 2.0, "stock": 20}
+    product_id = (await async_client.post("/api/v1/products/", json=product_data)).json()["id"]
+
+    response = await async_client.put(f"/api/v1/products/{product_id}/stock-shards/", json={"shards": 8})
+    assert response.status_code == 200
+    assert response.json()["stock"] == 20
+
+    response = await async_client.post(f"/api/v1/products/{product_id}/sell/", params={"quantity": 15})
+    assert response.status_code == 204
+    response = await async_client.get(f"/api/v1/products/{product_id}/")
+    assert (response.json()["stock"], response.json()["version"]) == (5, 0)
+
+    response = await async_client.delete(f"/api/v1/products/{product_id}/stock-shards/")
+    assert response.status_code == 200
+    assert (response.json()["stock"], response.json()["version"]) == (5, 1)
+
+    response = await async_client.put(f"/api/v1/products/{product_id}/stock-shards/", json={"shards": 0})
+    assert response.status_code == 422
+
+    for action in ("sell", "reserve"):
+        response = await async_client.post(f"/api/v1/products/{product_id}/{action}/", params={"quantity": 0})
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_stream_product_changes(async_client, monkeypatch):
+    """
+    Reads the SSE stream and checks that a reconnect with Last-Event-ID replays the changes
+    made after that id before the live loop. The in-process transport returns the response only
+    when the stream ends, so the client is reported disconnected after one pass of the live loop.
+    """
+    checks = []
+
+    async def is_disconnected(self):
+        checks.append(True)
+        return len(checks) % 2 == 0
+
+    monkeypatch.setattr(Request, "is_disconnected", is_disconnected)
+    monkeypatch.setattr(products, "STREAM_KEEPALIVE_SECONDS", 0.01)
+
+    since = (await async_client.get("/api/v1/products/changes/")).json()["version"]
+    product_data = {"name": "Streamed Product", "category_id": str(uuid.uuid4()), "price": 3.0, "stock": 4}
+    product_id = (await async_client.post("/api/v1/products/", json=product_data)).json()["id"]
+
+    response = await async_client.get("/api/v1/products/stream/", headers={"Last-Event-ID": str(since)})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = response.text.split("\n\n")
+    replayed = [frame for frame in frames if frame.startswith("id: ")]
+    assert len(replayed) == 1
+    assert replayed[0].startswith(f"id: {since + 1}\nevent: product\ndata: ")
+    assert json.loads(replayed[0].split("data: ", 1)[1])["product_id"] == product_id
+    assert ": keep-alive" in frames
+
+    # without Last-Event-ID nothing is replayed, the stream starts with live updates
+    response = await async_client.get("/api/v1/products/stream/")
+    assert response.text == ": keep-alive\n\n"
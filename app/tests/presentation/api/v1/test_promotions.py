@@ -0,0 +1,45 @@
+# tests/presentation/api/v1/test_promotions.py
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_create_and_cancel_promotion(async_client: AsyncClient):
+    """Test that a promotion starting now is applied at once and removed when cancelled."""
+    response = await async_client.post("/api/v1/products/", json={
+        "name": "Promo API", "category_id": str(uuid.uuid4()), "price": 40.0, "stock": 1
+    })
+    product_id = response.json()["id"]
+
+    now = datetime.now()
+    response = await async_client.post("/api/v1/promotions/", json={
+        "discount_percentage": 25,
+        "starts_at": now.isoformat(),
+        "ends_at": (now + timedelta(hours=1)).isoformat(),
+        "product_ids": [product_id],
+    })
+    assert response.status_code == 201
+    promotion = response.json()
+    assert promotion["status"] == "active"
+
+    response = await async_client.get(f"/api/v1/products/{product_id}/")
+    assert response.json()["price_after_discount"] == 30.0
+    assert response.json()["promotion_id"] == promotion["id"]
+
+    response = await async_client.post(f"/api/v1/promotions/{promotion['id']}/cancel/")
+    assert response.json()["status"] == "cancelled"
+    response = await async_client.get(f"/api/v1/products/{product_id}/")
+    assert response.json()["price_after_discount"] == 40.0
+
+    response = await async_client.post("/api/v1/promotions/", json={
+        "discount_percentage": 25,
+        "starts_at": now.isoformat(),
+        "ends_at": (now + timedelta(hours=1)).isoformat(),
+        "product_ids": [str(uuid.uuid4())],
+    })
+    assert response.status_code == 400
+    response = await async_client.get(f"/api/v1/promotions/{uuid.uuid4()}/")
+    assert response.status_code == 404
@@ -33,3 +33,31 @@ async def test_cancel_reservation(async_client):
 
     # Verify cancellation by attempting to cancel again or fetching the reservation status
     # This part depends on your implementation
+
+
+@pytest.mark.asyncio
+async def test_checkout_reservation(async_client):
+    reservation_data = {
+        "product_id": str(uuid.uuid4()),
+        "quantity": 4
+    }
+    reservation_id = (await async_client.post("/api/v1/reservations/", json=reservation_data)).json()["id"]
+
+    response = await async_client.post(f"/api/v1/reservations/{reservation_id}/checkout/")
+    assert response.status_code == 201
+    assert (response.json()["product_id"], response.json()["quantity"]) == (reservation_data["product_id"], 4)
+
+    response = await async_client.post(f"/api/v1/reservations/{reservation_id}/checkout/")
+    assert response.status_code == 400
+    response = await async_client.delete(f"/api/v1/reservations/{reservation_id}/")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_product_reports_reserved_quantity(async_client):
+    product_data = {"name": "Reserved item", "category_id": str(uuid.uuid4()), "price": 6.0, "stock": 9}
+    product_id = (await async_client.post("/api/v1/products/", json=product_data)).json()["id"]
+    await async_client.post(f"/api/v1/products/{product_id}/reserve/", params={"quantity": 4})
+
+    response = await async_client.get(f"/api/v1/products/{product_id}/")
+    assert (response.json()["stock"], response.json()["reserved_quantity"]) == (5, 4)
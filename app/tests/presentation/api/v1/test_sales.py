@@ -30,3 +30,78 @@ async def test_get_sales(async_client):
     assert response.status_code == 200
     data = response.json()
     assert isinstance(data, list)
+
+
+@pytest.mark.asyncio
+async def test_get_sales_with_sparse_fields(async_client):
+    sale_data = {
+        "product_id": str(uuid.uuid4()),
+        "quantity": 1
+    }
+    await async_client.post("/api/v1/sales/", json=sale_data)
+
+    response = await async_client.get("/api/v1/sales/", params={"fields": "product_id,quantity"})
+    assert response.status_code == 200
+    data = response.json()
+    assert sale_data in data
+    assert all(set(item) == {"product_id", "quantity"} for item in data)
+
+
+@pytest.mark.asyncio
+async def test_get_best_sellers(async_client):
+    product_id = str(uuid.uuid4())
+    await async_client.post("/api/v1/sales/", json={"product_id": product_id, "quantity": 1000})
+
+    response = await async_client.get("/api/v1/sales/top/", params={"window": "hour", "limit": 1})
+    assert response.status_code == 200
+    assert response.json() == [{"product_id": product_id, "quantity": 1000, "exact": True}]
+
+    response = await async_client.get("/api/v1/sales/top/", params={"window": "week"})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_sales_summary(async_client):
+    start_date = datetime.now()
+    await async_client.post("/api/v1/sales/", json={"product_id": str(uuid.uuid4()), "quantity": 5})
+
+    response = await async_client.get("/api/v1/sales/summary/", params={
+        "start_date": start_date.isoformat(),
+        "end_date": (datetime.now() + timedelta(days=1)).isoformat(),
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["quantity"] >= 5
+    assert data["sales_count"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_sales_summary_cache_control(async_client):
+    past = {"start_date": "2024-01-01T00:00:00", "end_date": "2024-02-29T23:59:59", "granularity": "month"}
+    response = await async_client.get("/api/v1/sales/summary/", params=past)
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"].startswith("private, max-age=")
+    assert [bucket["closed"] for bucket in response.json()["buckets"]] == [True, True]
+
+    response = await async_client.get("/api/v1/sales/summary/", params={
+        "start_date": datetime.now().isoformat(), "granularity": "day",
+    })
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    response = await async_client.get("/api/v1/sales/summary/", params={"granularity": "day"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_sales_reports_accept_dates_with_utc_offset(async_client):
+    params = {"start_date": "2024-01-01T00:00:00Z", "end_date": "2024-01-31T23:59:59+02:00"}
+    response = await async_client.get("/api/v1/sales/summary/", params=params)
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"].startswith("private, max-age=")
+
+    response = await async_client.get("/api/v1/sales/summary/", params={**params, "granularity": "day"})
+    assert response.status_code == 200
+
+    response = await async_client.get("/api/v1/sales/", params=params)
+    assert response.status_code == 200